@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - JSON-lines API
+For bots and front ends: one command per line in, one JSON object per line
+out, carrying the typed events the command produced (see events.py) and the
+rider's state. The engine runs headless, so no prose is ever formatted -
+clients show what they like from the events. Input lines are plain commands
+or objects like {"command": "west"}; {"player": "name"} picks whose save
+slots 'save' and 'load' use, once - a session keeps the name it first
+gives. On a server sharing one save store, 'save' and 'load' wait until
+the session has a name of its own. The first line out is the opening view.
+With --compact each event is an array of its fields instead of an object,
+and a {"schema": ...} line first names the fields of every kind of event.
+Usage: python api.py --seed 7 < commands.txt
+       python server.py --api   (the same protocol over TCP)
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, Optional, Set, TextIO, Tuple
+
+import saves
+from events import SCHEMA, compact_record, event_record
+from game import WastelandEngine, World
+from metrics import Metrics
+
+# One encoder for every reply; json.dumps() with options builds a new one per call
+encode = json.JSONEncoder(ensure_ascii=False, check_circular=False).encode
+
+
+class ApiSession:
+    """One rider, spoken to in JSON lines"""
+
+    def __init__(self, world: World, seed: Optional[int] = None,
+                 save_backend: Optional[saves.SaveBackend] = None, metrics: Optional[Metrics] = None,
+                 compact: bool = False, riders: Optional[Set[str]] = None):
+        self.engine = WastelandEngine(seed=seed, headless=True, world=world, save_backend=save_backend,
+                                      metrics=metrics, record_events=True)
+        self.compact = compact
+        self.riders = riders  # Names taken by sessions sharing the save store; None if slots aren't shared
+        self.player: Optional[str] = None
+        self.record = compact_record if compact else event_record
+
+    def reply(self, command: Optional[str], going: bool = True) -> Dict[str, Any]:
+        engine, rider = self.engine, self.engine.rider
+        return {"command": command, "events": [self.record(event) for event in engine.take_events()],
+                "state": engine.state.value, "over": not going, "location": rider.current_location,
+                "fuel": rider.fuel, "bike": rider.bike_condition, "health": rider.health,
+                "miles": rider.miles_traveled, "ticks": rider.ticks}
+
+    def start(self) -> str:
+        """The opening view, as the console's intro shows it - after the schema, if compact"""
+        self.engine.display_location()
+        schema = encode({"schema": SCHEMA}) + "\n" if self.compact else ""
+        return schema + encode(self.reply(None)) + "\n"
+
+    def handle(self, line: str) -> Tuple[str, bool]:
+        """(reply line, whether the game goes on) for one line from the client"""
+        command = line.strip()
+        if command.startswith("{"):
+            try:
+                request = json.loads(command)
+                command = request.get("command", "")
+                player = request.get("player")
+                if not isinstance(command, str):
+                    raise ValueError("'command' must be a string")
+            except (ValueError, AttributeError) as e:
+                return encode({"error": f"bad request: {e}"}) + "\n", True
+            if player is not None:
+                if not isinstance(player, str) or not saves.SLOT_NAME.match(player.lower()):
+                    return encode({"error": "player names are letters, numbers, - and _"}) + "\n", True
+                player = player.lower()
+                if self.player is None:
+                    if self.riders is not None:
+                        if player == saves.DEFAULT_PLAYER:
+                            return encode({"error": f"'{player}' is kept for riders without a name"}) + "\n", True
+                        if player in self.riders:
+                            return encode({"error": f"someone is already riding as {player}"}) + "\n", True
+                        self.riders.add(player)
+                    self.player = self.engine.player = player
+                elif player != self.player:
+                    return encode({"error": f"this session rides as {self.player}"}) + "\n", True
+                if not command:
+                    return encode({"player": self.engine.player}) + "\n", True
+        if self.riders is not None and self.player is None and command.lower().split()[:1] in (["save"], ["load"]):
+            # Nameless sessions would all share the default player's slots
+            return encode({"error": 'send {"player": "name"} before saving or loading'}) + "\n", True
+        going = self.engine.process_command(command)
+        return encode(self.reply(command, going)) + "\n", going
+
+
+def run_api(lines: Iterable[str], out: TextIO, world: World, seed: Optional[int] = None,
+            save_backend: Optional[saves.SaveBackend] = None, compact: bool = False) -> int:
+    """Play commands from `lines` until they run out or the game ends; returns how many ran"""
+    session = ApiSession(world, seed, save_backend, compact=compact)
+    out.write(session.start())
+    ran = 0
+    for line in lines:
+        reply, going = session.handle(line)
+        out.write(reply)
+        out.flush()
+        ran += 1
+        if not going:
+            break
+    return ran
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Wasteland Rider as JSON lines on stdin/stdout")
+    parser.add_argument("--seed", type=int, help="Seed the wasteland's dice for a repeatable ride")
+    parser.add_argument("--world", help="World file (JSON or packed) to play instead of wasteland.json")
+    parser.add_argument("--compact", action="store_true", help="Events as arrays of fields, after a schema line")
+    args = parser.parse_args()
+    run_api(sys.stdin, sys.stdout, World.load(args.world), args.seed, compact=args.compact)
+
+
+if __name__ == "__main__":
+    main()
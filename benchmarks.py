@@ -0,0 +1,1367 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Benchmarks
+Timing harness for the engine's hot paths.
+Usage: python benchmarks.py [name ...]   (no names runs everything)
+"""
+
+import argparse
+import contextlib
+import gc
+import heapq
+import itertools
+import json
+import os
+import pickle
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import game as game_module
+import hotreload
+import saves
+import scripts
+import survival
+import worldgen
+import worldpack
+from api import ApiSession
+from clock import TICKS_PER_COMMAND
+from compact import CompactWorld
+from encounters import Encounter, EncounterTable
+from events import FuelChanged, GameOver, HealthChanged, ItemTaken, ItemUsed, LocationSeen, Won
+from game import COMMAND_VERBS, WORLD_FILE, GameState, Inventory, Item, ItemNameIndex, Location, WastelandEngine, World, compiled_world_path
+from geo import SpatialIndex, great_circle_miles
+from journal import Journal, replay
+from metrics import Metrics
+from output import BufferedSink
+from routes import RoutePlanner
+from simulate import random_policy
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], None]] = {}
+
+def benchmark(func: Callable[[argparse.Namespace], None]):
+    """Register a benchmark under its function name minus the bench_ prefix"""
+    BENCHMARKS[func.__name__[len("bench_"):]] = func
+    return func
+
+
+def timed(func: Callable[[], object], repeat: int = 5) -> float:
+    """Best wall time of `repeat` calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_items(count: int, seed: int = 0) -> Dict[str, Item]:
+    return {item_id: Item(**data) for item_id, data in worldgen.generate_items(count, seed).items()}
+
+
+def synthetic_world(location_count: int, item_count: int, seed: int = 0, branching: float = 0.0) -> World:
+    """A generated world (see worldgen.py) with no side roads unless asked for"""
+    return World.from_data(worldgen.generate_world(location_count, item_count, branching, seed=seed))
+
+
+def world_data(world: World) -> Dict[str, Any]:
+    """A World back in the wasteland.json schema"""
+    return {
+        "locations": {location_id: {"name": location.name, "description": location.description,
+                                    "exits": dict(location.exits), "items": list(location.items),
+                                    "visited": location.visited, "dangerous": location.dangerous,
+                                    "fuel_cost": location.fuel_cost, "encounters": location.encounters,
+                                    "coordinates": location.coordinates}
+                      for location_id, location in world.locations.items()},
+        "items": {item_id: {"name": item.name, "description": item.description,
+                            "takeable": item.takeable, "useable": item.useable,
+                            "use_message": item.use_message, "aliases": list(item.aliases),
+                            "fuel_value": item.fuel_value, "food_value": item.food_value,
+                            "repair_value": item.repair_value}
+                  for item_id, item in world.items.items()},
+        "encounters": world.encounter_data[0],
+        "encounter_tables": world.encounter_data[1],
+        "timed_events": world.timed_event_data,
+    }
+
+
+def linear_find_item_by_name(items: Dict[str, Item], name: str, item_list: List[str]) -> Optional[str]:
+    """The original scan-every-item lookup, kept as the reference implementation"""
+    name = name.lower()
+    for item_id in item_list:
+        item = items[item_id]
+        if (name in item.name.lower() or
+                name == item_id.lower() or
+                any(alias.lower() == name for alias in item.aliases)):
+            return item_id
+    return None
+
+
+@benchmark
+def bench_lookup(args: argparse.Namespace):
+    """find_item_by_name: linear scan vs precomputed alias/n-gram index"""
+    items = synthetic_items(args.items)
+    rng = random.Random(1)
+    pack = rng.sample(list(items), min(args.pack, len(items)))
+    queries = []
+    for _ in range(args.queries):
+        item_id = rng.choice(pack)
+        item = items[item_id]
+        queries.append(rng.choice([
+            item_id,
+            rng.choice(item.aliases),
+            item.name.lower().split()[rng.randrange(3)],
+            item.name[2:9],
+            "golden wrench",  # Miss
+        ]))
+
+    index = ItemNameIndex(items)
+
+    def indexed(name: str, item_list: List[str]) -> Optional[str]:
+        return index.first_match(name.lower(), item_list)
+
+    for query in queries:
+        assert linear_find_item_by_name(items, query, pack) == indexed(query, pack), query
+
+    old = timed(lambda: [linear_find_item_by_name(items, query, pack) for query in queries], args.repeat)
+    start = time.perf_counter()
+    ItemNameIndex(items)
+    build = time.perf_counter() - start
+    index._cache.clear()
+    cold = timed(lambda: (index._cache.clear(), [indexed(query, pack) for query in queries]), args.repeat)
+    new = timed(lambda: [indexed(query, pack) for query in queries], args.repeat)
+
+    print(f"lookup: {args.items} items, pack of {len(pack)}, {len(queries)} queries")
+    print(f"  linear scan   {len(queries) / old:>12,.0f} lookups/sec")
+    print(f"  index (cold)  {len(queries) / cold:>12,.0f} lookups/sec")
+    print(f"  index (warm)  {len(queries) / new:>12,.0f} lookups/sec")
+    print(f"  index build   {build * 1000:>12.1f} ms")
+
+
+@benchmark
+def bench_inventory(args: argparse.Namespace):
+    """A big pack: has/take/drop/lookup and save size, item list vs multiset Inventory"""
+    items = synthetic_items(args.items)
+    index = ItemNameIndex(items)
+    rng = random.Random(1)
+    units = [rng.choice(list(items)) for _ in range(args.pack_units)]  # Plenty of duplicates
+    probes = [rng.choice(units) for _ in range(args.queries)]
+    names = [rng.choice([item_id, items[item_id].aliases[0], items[item_id].name[2:9]]) for item_id in probes]
+    listed, counted = list(units), Inventory(units)
+    for name in names:
+        assert index.first_match(name.lower(), listed) == counted.first_match(index, name.lower()), name
+
+    def cycle(take: Callable[[str], Any], put: Callable[[str], Any]):
+        for item_id in probes:
+            take(item_id)
+            put(item_id)
+
+    results = {}
+    for label, pack, take, put, find, saved in (
+            ("item list", listed, listed.remove, listed.append,
+             lambda name: index.first_match(name, listed), lambda: list(listed)),
+            ("Inventory", counted, counted.remove, counted.add,
+             lambda name: counted.first_match(index, name), counted.state)):
+        results[label] = (
+            timed(lambda: [item_id in pack for item_id in probes], args.repeat),
+            timed(lambda: cycle(take, put), args.repeat),
+            timed(lambda: [find(name.lower()) for name in names], args.repeat),
+            len(pickle.dumps(saved(), protocol=4)),
+        )
+
+    print(f"inventory: {len(units):,} units of {len(counted.counts):,} distinct items, {len(probes):,} probes")
+    print(f"  {'':>10} {'has ops/s':>12} {'take+drop/s':>12} {'lookups/s':>12} {'save bytes':>11}")
+    for label, (has, cycled, found, size) in results.items():
+        print(f"  {label:>10} {len(probes) / has:>12,.0f} {len(probes) / cycled:>12,.0f} "
+              f"{len(names) / found:>12,.0f} {size:>11,}")
+
+
+def traced_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+class FullCopy(dict):
+    """Every location copied up front - how engines held the world before WorldState"""
+
+    def edit(self, location_id: str) -> Location:
+        return self[location_id]
+
+
+@benchmark
+def bench_memory(args: argparse.Namespace):
+    """Per-session memory: full private world copies vs copy-on-write WorldState"""
+    world = synthetic_world(args.locations, args.items)
+
+    def play(engine: WastelandEngine) -> WastelandEngine:
+        for command in ("look", "drop jerky", "west", "take jerky", "west", "look"):
+            engine.process_command(command)
+        return engine
+
+    def full_copies():
+        engines = []
+        for seed in range(args.engines):
+            engine = WastelandEngine(seed=seed, headless=True, world=world)
+            # What every engine held before: its own copy of each location
+            engine.locations = FullCopy((location_id, replace(location, items=list(location.items)))
+                                        for location_id, location in world.locations.items())
+            engines.append(play(engine))
+        return engines
+
+    def overlays():
+        return [play(WastelandEngine(seed=seed, headless=True, world=world)) for seed in range(args.engines)]
+
+    before = traced_bytes(full_copies)
+    after = traced_bytes(overlays)
+    print(f"memory: {args.engines} engines on a {args.locations}-location world")
+    print(f"  full copies   {before / 2**20:>10.1f} MiB  ({before / args.engines:>10,.0f} bytes/engine)")
+    print(f"  WorldState    {after / 2**20:>10.1f} MiB  ({after / args.engines:>10,.0f} bytes/engine)")
+
+
+@dataclass
+class PlainItem:
+    """Item as it was before slots and tuple aliases, for baseline measurements"""
+    name: str
+    description: str
+    takeable: bool = True
+    useable: bool = False
+    use_message: str = ""
+    aliases: List[str] = None
+    fuel_value: int = 0
+    food_value: int = 0
+    repair_value: int = 0
+
+
+@dataclass
+class PlainLocation:
+    """Location as it was before slots and interned ids"""
+    name: str
+    description: str
+    exits: Dict[str, str]
+    items: List[str]
+    visited: bool = False
+    dangerous: bool = False
+    fuel_cost: int = 1
+    encounters: Optional[str] = None
+    coordinates: Optional[List[float]] = None
+
+
+@benchmark
+def bench_compact(args: argparse.Namespace):
+    """World memory and graph walks: plain dataclasses vs slotted World vs CompactWorld"""
+    data = world_data(synthetic_world(args.locations, args.items))
+    text = json.dumps(data)
+
+    def plain():
+        parsed = json.loads(text)
+        return ({location_id: PlainLocation(**location) for location_id, location in parsed["locations"].items()},
+                {item_id: PlainItem(**item) for item_id, item in parsed["items"].items()})
+
+    plain_bytes = traced_bytes(plain)
+    slotted_bytes = traced_bytes(lambda: World.from_data(json.loads(text)))
+    world = World.from_data(data)
+    index_bytes = traced_bytes(lambda: world.item_index)
+    compact_bytes = traced_bytes(lambda: CompactWorld.from_world(world))
+    compact = world.compact
+
+    def walk_locations():
+        seen = {"dc_ruins"}
+        queue = deque(["dc_ruins"])
+        while queue:
+            for target in world.locations[queue.popleft()].exits.values():
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return len(seen)
+
+    def walk_compact():
+        seen = bytearray(len(compact))
+        start = compact.location_numbers["dc_ruins"]
+        seen[start] = 1
+        queue = deque([start])
+        adjacency = compact.adjacency
+        while queue:
+            for target in adjacency[queue.popleft()]:
+                if not seen[target]:
+                    seen[target] = 1
+                    queue.append(target)
+        return sum(seen)
+
+    assert walk_locations() == walk_compact()
+    dict_walk = timed(walk_locations, args.repeat)
+    compact_walk = timed(walk_compact, args.repeat)
+
+    print(f"compact: {args.locations} locations, {args.items} items")
+    print(f"  plain dataclasses  {plain_bytes / 2**20:>9.2f} MiB")
+    print(f"  slotted World      {slotted_bytes / 2**20:>9.2f} MiB (+{index_bytes / 2**20:.2f} MiB name index)")
+    print(f"  CompactWorld       {compact_bytes / 2**20:>9.2f} MiB extra ({compact.nbytes() / 2**20:.2f} MiB in arrays)")
+    print(f"  BFS over Location.exits   {dict_walk * 1000:>8.2f} ms")
+    print(f"  BFS over CompactWorld     {compact_walk * 1000:>8.2f} ms")
+
+
+@benchmark
+def bench_routes(args: argparse.Namespace):
+    """Route planning on a large world: cold shortest-path tree vs cached queries"""
+    world = synthetic_world(args.route_locations, args.items, branching=0.1)
+    rng = random.Random(1)
+    sources = rng.sample(list(world.locations), args.queries)
+    build = timed(lambda: RoutePlanner(world.compact), 1)
+    planner = RoutePlanner(world.compact)
+    cold = timed(lambda: planner.tree(planner.compact.location_numbers["los_angeles"]), 1)
+
+    def plan_all():
+        for source in sources:
+            planner.plan(source, "los_angeles", fuel=100, bike_condition=100, fuel_reserve=50)
+
+    def plan_fragile():
+        for source in sources[:args.queries // 20]:
+            planner.plan(source, "los_angeles", fuel=100, bike_condition=11)
+
+    warm = timed(plan_all, args.repeat)
+    fragile = timed(plan_fragile, args.repeat)
+    print(f"routes: {args.route_locations} locations, {args.queries} queries to los_angeles")
+    print(f"  reverse adjacency          {build * 1000:>8.2f} ms")
+    print(f"  shortest-path tree (cold)  {cold * 1000:>8.2f} ms")
+    print(f"  cached route queries       {warm / args.queries * 1e6:>8.2f} us/query")
+    print(f"  rough-terrain limited      {fragile / max(1, args.queries // 20) * 1000:>8.2f} ms/query")
+
+
+@benchmark
+def bench_geo(args: argparse.Namespace):
+    """Map geometry on a generated world: the grid index vs scanning every location for 'nearby',
+    and a first route question by A* - guided by map distance or not - vs a shortest-path tree"""
+    world = World.from_data(worldgen.generate_world(args.geo_locations, min(args.items, args.geo_locations),
+                                                    branching=0.1, seed=1, description_words=5))
+    compact = world.compact
+    count = len(compact)
+    build = timed(lambda: SpatialIndex.from_compact(compact), 1)
+    index = world.geo
+    rng = random.Random(1)
+    spots = [(compact.latitude[number], compact.longitude[number]) for number in rng.sample(range(count), args.queries)]
+    places = game_module.NEARBY_PLACES
+
+    def scan(spot):
+        return heapq.nsmallest(places, ((great_circle_miles(spot, there), number)
+                                        for number, there in enumerate(zip(compact.latitude, compact.longitude))))
+
+    scanned = spots[:3]
+    for spot in scanned:
+        assert [miles for miles, _ in index.nearest(spot, places)] == [miles for miles, _ in scan(spot)]
+    nearest = timed(lambda: [index.nearest(spot, places) for spot in spots], args.repeat) / len(spots)
+    within = timed(lambda: [index.nearest(spot, places, 50) for spot in spots], args.repeat) / len(spots)
+    linear = timed(lambda: [scan(spot) for spot in scanned], 1) / len(scanned)
+    segment = timed(lambda: [great_circle_miles(a, b) for a, b in zip(spots, spots[1:])], args.repeat) / len(spots)
+
+    # Generated stops are numbered in order along the main road, so these are 50-1000 stops apart
+    pairs = [(source, source + rng.randint(50, 1000)) for source in rng.sample(range(count - 1000), args.queries // 20)]
+    planner = RoutePlanner(compact)
+    bound = timed(planner.fuel_per_mile, 1)
+    per_mile = planner.fuel_per_mile()
+    source, destination = pairs[0]
+    tree = timed(lambda: planner.tree(destination), 1)
+    path = planner._search(source, destination, count)
+    assert sum(compact.fuel_cost[location] for location in path[:-1]) == planner.min_fuel(source, destination)
+    guided = timed(lambda: [planner._search(*pair, count) for pair in pairs], 1) / len(pairs)
+    planner._fuel_per_mile = 0.0
+    unguided = timed(lambda: [planner._search(*pair, count) for pair in pairs], 1) / len(pairs)
+
+    print(f"geo: {count:,} locations, grid of {len(index.cells):,} cells ({index.cell_degrees:.4f} degrees)")
+    print(f"  grid index build           {build * 1000:>10.2f} ms")
+    print(f"  nearest {places}                  {nearest * 1e6:>10.2f} us/query")
+    print(f"  nearest {places} within 50 miles  {within * 1e6:>10.2f} us/query")
+    print(f"  scanning every location    {linear * 1000:>10.2f} ms/query ({linear / nearest:,.0f}x slower)")
+    print(f"  segment miles              {segment * 1e6:>10.2f} us/ride")
+    print(f"routes: {len(pairs)} first questions, 50-1000 stops apart")
+    print(f"  fuel-per-mile bound        {bound * 1000:>10.2f} ms, once per world ({per_mile:.3g} fuel/mile)")
+    print(f"  shortest-path tree (cold)  {tree * 1000:>10.2f} ms")
+    print(f"  A* by map distance         {guided * 1000:>10.2f} ms/query")
+    print(f"  A* unguided (Dijkstra)     {unguided * 1000:>10.2f} ms/query")
+
+
+def legacy_screens(engine: WastelandEngine, say: Callable[..., None]) -> Dict[str, Callable[[], None]]:
+    """look/status/inventory as they were written before output sinks: a print() per line,
+    bars and name lists rebuilt every time"""
+    rider = engine.rider
+
+    def status():
+        fuel_bar = "█" * (rider.fuel // 10) + "░" * (10 - rider.fuel // 10)
+        bike_bar = "█" * (rider.bike_condition // 10) + "░" * (10 - rider.bike_condition // 10)
+        say(f"\n⛽ Fuel: [{fuel_bar}] {rider.fuel}%")
+        say(f"🔧 Bike: [{bike_bar}] {rider.bike_condition}%")
+        if rider.health < 100:
+            health_bar = "█" * (rider.health // 10) + "░" * (10 - rider.health // 10)
+            say(f"❤️  Health: [{health_bar}] {rider.health}%")
+
+    def look():
+        location = engine.get_current_location()
+        say("\n" + "=" * 60)
+        say(f"🏍️  {location.name}")
+        say("-" * len(location.name))
+        say(location.description)
+        if location.exits:
+            say(f"\n🛣️  Routes: {', '.join(location.exits.keys())}")
+        if location.items:
+            say(f"\n🎒 You spot: {', '.join([engine.items[item].name for item in location.items])}")
+        if location.dangerous:
+            say("⚠️  DANGER: This area looks hazardous!")
+        status()
+
+    def inventory():
+        say("\n🎒 SURVIVAL PACK:")
+        for item_id in rider.inventory:
+            item = engine.items[item_id]
+            say(f"  • {item.name}")
+            if item.fuel_value > 0 or item.food_value > 0 or item.repair_value > 0:
+                values = []
+                if item.fuel_value > 0:
+                    values.append(f"⛽{item.fuel_value}")
+                if item.food_value > 0:
+                    values.append(f"❤️{item.food_value}")
+                if item.repair_value > 0:
+                    values.append(f"🔧{item.repair_value}")
+                say(f"    ({' '.join(values)})")
+
+    return {"look": look, "status": status, "inventory": inventory}
+
+
+@benchmark
+def bench_output(args: argparse.Namespace):
+    """look/status/inventory per second: print() per line vs buffered sink vs null sink"""
+    world = World.load()
+    with open(os.devnull, "w") as devnull:
+        def engine_with(output) -> WastelandEngine:
+            engine = WastelandEngine(seed=1, world=world, output=output, headless=output is None)
+            engine.rider.inventory.extend(list(world.items)[:5])
+            engine.rider.health = 80
+            return engine
+
+        legacy_engine = engine_with(BufferedSink())
+        legacy = legacy_screens(legacy_engine, lambda *line: print(*line, file=devnull, flush=True))
+        buffered_sink = BufferedSink(devnull)
+        engines = {"buffered": engine_with(buffered_sink), "null": engine_with(None)}
+
+        print(f"output: {'command':>10} {'print/line':>12} {'buffered':>12} {'null sink':>12}   (commands/sec)")
+        for command in ("look", "status", "inventory"):
+            rates = [args.queries / timed(lambda: [legacy[command]() for _ in range(args.queries)], args.repeat)]
+            for name, engine in engines.items():
+                screen = {"look": engine.display_location, "status": engine.show_status_brief,
+                          "inventory": engine.show_inventory}[command]
+
+                def run():
+                    for _ in range(args.queries):
+                        screen()
+                        engine.say.flush()
+                rates.append(args.queries / timed(run, args.repeat))
+            print(f"        {command:>10} {rates[0]:>12,.0f} {rates[1]:>12,.0f} {rates[2]:>12,.0f}")
+
+
+@benchmark
+def bench_replay(args: argparse.Namespace):
+    """Journal a long random-policy session, then replay it from the start and from a checkpoint"""
+    commands = args.journal_commands
+    world = synthetic_world(args.locations, args.items, branching=0.2)
+
+    def session(journal_path: Optional[str]) -> WastelandEngine:
+        engine = WastelandEngine(seed=7, headless=True, world=world)
+        if journal_path:
+            Journal(journal_path).attach(engine)
+        policy_rng = random.Random(7)
+        for number in range(commands):
+            engine.process_command(random_policy(engine, policy_rng) if number % 7 else
+                                   policy_rng.choice(["look", "status", "rest", "inventory", "drop jerky"]))
+        if engine.journal:
+            engine.journal.close()
+        return engine
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        start = time.perf_counter()
+        session(None)
+        plain = time.perf_counter() - start
+        start = time.perf_counter()
+        recorded = session(path)
+        journaled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        replayed, _ = replay(path, world=world, from_start=True)
+        full = time.perf_counter() - start
+        assert replayed.snapshot_state()["rider"] == recorded.snapshot_state()["rider"]
+        assert replayed.rng.getstate() == recorded.rng.getstate()
+        start = time.perf_counter()
+        replay(path, world=world, from_start=True, verify=True)
+        verified = time.perf_counter() - start
+        start = time.perf_counter()
+        _, tail = replay(path, until=commands - 1, world=world)
+        nearest = time.perf_counter() - start
+
+        print(f"replay: {commands:,} commands, {args.locations} locations, "
+              f"journal {os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"  play, no journal      {commands / plain:>12,.0f} commands/sec")
+        print(f"  play, journaled       {commands / journaled:>12,.0f} commands/sec")
+        print(f"  replay from start     {commands / full:>12,.0f} commands/sec ({full * 1000:.0f} ms)")
+        print(f"  ... checking each checkpoint {commands / verified:>5,.0f} commands/sec")
+        print(f"  replay to #{commands - 1:,}  {nearest * 1000:>12.1f} ms ({tail:,} commands after the checkpoint)")
+
+
+@benchmark
+def bench_metrics(args: argparse.Namespace):
+    """process_command cost of instrumentation: no hook check vs metrics off vs metrics on"""
+    commands = (SCALING_COMMANDS * (args.queries // len(SCALING_COMMANDS) + 1))[:args.queries]
+    world = World.load()
+
+    def play(metrics: Optional[Metrics], bare: bool):
+        # A fresh engine each time, so every variant replays exactly the same game
+        engine = WastelandEngine(seed=1, headless=True, world=world, metrics=metrics)
+        for command in commands:
+            engine.rider.fuel = engine.rider.bike_condition = 100
+            engine.process_command(command, bare)
+
+    variants = {"bare": (None, True), "off": (None, False), "on": (Metrics(COMMAND_VERBS), False)}
+    best = {name: float("inf") for name in variants}
+    for _ in range(args.repeat):  # Interleaved, so drift in machine speed hits every variant alike
+        for name, (metrics, bare) in variants.items():
+            best[name] = min(best[name], timed(lambda: play(metrics, bare), 1))
+    bare, off, on = (len(commands) / best[name] for name in variants)
+    print(f"metrics: {len(commands):,} commands")
+    print(f"  hooks skipped            {bare:>12,.0f} commands/sec")
+    print(f"  metrics off              {off:>12,.0f} commands/sec ({(bare / off - 1) * 100:+.1f}%)")
+    print(f"  metrics on               {on:>12,.0f} commands/sec ({(bare / on - 1) * 100:+.1f}%)")
+
+
+def legacy_process_command(engine: WastelandEngine, command: str) -> bool:
+    """process_command as it was before the verb table: an if/elif chain of list tests"""
+    if engine.journal is not None or engine.metrics is not None:
+        return engine.observe_command(command)
+    command = command.lower().strip()
+    engine.advance(TICKS_PER_COMMAND)
+
+    if not command:
+        return True
+
+    parts = command.split()
+    verb = parts[0]
+
+    if verb in ['ride', 'go', 'move', 'drive'] and len(parts) > 1:
+        return engine.move_rider(parts[1])
+    elif verb in ['north', 'n', 'south', 's', 'east', 'e', 'west', 'w', 'up', 'down']:
+        return engine.move_rider(verb)
+    elif verb in ['take', 'get', 'pick', 'grab'] and len(parts) > 1:
+        return engine.take_item(' '.join(parts[1:]))
+    elif verb in ['drop', 'leave'] and len(parts) > 1:
+        return engine.drop_item(' '.join(parts[1:]))
+    elif verb in ['use', 'consume', 'drink', 'eat'] and len(parts) > 1:
+        return engine.use_item(' '.join(parts[1:]))
+    elif verb in ['refuel', 'fuel'] and len(parts) > 1:
+        return engine.refuel_bike(' '.join(parts[1:]))
+    elif verb in ['repair', 'fix'] and len(parts) > 1:
+        return engine.repair_bike_with(' '.join(parts[1:]))
+    elif verb in ['rest', 'sleep', 'camp']:
+        return engine.rest()
+    elif verb in ['look', 'l']:
+        engine.display_location()
+    elif verb in ['inventory', 'i', 'inv', 'pack']:
+        engine.show_inventory()
+    elif verb in ['examine', 'x', 'inspect'] and len(parts) > 1:
+        engine.examine_item(' '.join(parts[1:]))
+    elif verb in ['status', 'stats', 'condition']:
+        engine.show_full_status()
+    elif verb in ['route', 'plan']:
+        engine.show_route(' '.join(parts[1:]))
+    elif verb in ['help', 'h']:
+        engine.show_help()
+    elif verb in ['save']:
+        engine.save_game(*parts[1:2])
+    elif verb in ['load']:
+        engine.load_game(*parts[1:2])
+    elif verb in ['metrics']:
+        engine.show_metrics()
+    elif verb in ['quit', 'q', 'exit']:
+        return False
+    else:
+        responses = [
+            "Your bike's engine idles as you consider that command...",
+            "The wasteland wind carries away your words...",
+            "That doesn't seem possible in this harsh world.",
+            "Your survival instincts suggest trying something else."
+        ]
+        engine.say(engine.rng.choice(responses))
+        engine.say("Type 'help' for available commands.")
+
+    if engine.rider.fuel <= 0:
+        engine.say("\n💀 Your bike runs out of fuel in the middle of the wasteland...")
+        engine.say("Without transportation, you become another casualty of the apocalypse.")
+        engine.state = GameState.GAME_OVER
+        return False
+
+    if engine.rider.bike_condition <= 0:
+        engine.say("\n💀 Your motorcycle breaks down beyond repair...")
+        engine.say("Stranded in the wasteland, your journey ends here.")
+        engine.state = GameState.GAME_OVER
+        return False
+
+    return True
+
+
+# Every branch of the old chain, the late ones (load, quit, unknown input) included
+DISPATCH_COMMANDS = ["look", "west", "take fuel", "inventory", "status", "examine fuel", "drop fuel",
+                     "east", "take gear", "use gear", "help", "i", "go west", "n", "grab jerky", "eat jerky", "refuel can", "fix kit",
+                                        "camp", "x toolkit", "stats", "plan", "load", "metrics", "ride",
+                                        "dance", "", "  LOOK  ", "take", "quit"]
+
+
+@benchmark
+def bench_dispatch(args: argparse.Namespace):
+    """The whole command mix through the verb table vs the old if/elif chain"""
+    commands = (DISPATCH_COMMANDS * (args.queries // len(DISPATCH_COMMANDS) + 1))[:args.queries]
+    world = World.load()
+
+    def play(dispatch: Callable[[WastelandEngine, str], bool], output=None) -> Tuple[WastelandEngine, List[bool]]:
+        engine = WastelandEngine(seed=1, headless=output is None, world=world, output=output,
+                                 save_backend=saves.DiscardSaveBackend())
+        results = []
+        for command in commands:
+            engine.rider.fuel = engine.rider.bike_condition = 100
+            engine.state = GameState.PLAYING
+            results.append(dispatch(engine, command))
+        return engine, results
+
+    variants = {"if/elif chain": legacy_process_command, "verb table": WastelandEngine.process_command}
+    # Same game, same text, same dice
+    runs = [play(dispatch, BufferedSink()) for dispatch in variants.values()]
+    assert len({(engine.say.take(), repr(engine.snapshot_state()), engine.state, tuple(results),
+                 engine.rng.getstate()) for engine, results in runs}) == 1
+
+    best = {name: float("inf") for name in variants}
+    for _ in range(args.repeat):
+        for name, dispatch in variants.items():
+            best[name] = min(best[name], timed(lambda: play(dispatch), 1))
+    legacy, table = (len(commands) / best[name] for name in variants)
+    print(f"dispatch: {len(commands):,} commands ({len(DISPATCH_COMMANDS)} distinct)")
+    print(f"  if/elif chain            {legacy:>12,.0f} commands/sec")
+    print(f"  verb table               {table:>12,.0f} commands/sec ({(table / legacy - 1) * 100:+.1f}%)")
+
+
+class BotMind:
+    """A bot's picture of its ride and the command it picks next - the same whether
+    the picture comes from scraped text or from events, so both play the same games"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.exits: List[str] = []
+        self.ground: List[str] = []  # What it means to take, by whatever name the front end gives
+        self.pack: List[str] = []  # What it might refuel with
+        self.fuel = self.health = 100
+        self.over = False
+
+    def next_command(self) -> str:
+        if self.fuel < 30 and self.pack:
+            return f"refuel {self.pack[0]}"
+        if self.health < 60:
+            return "rest"
+        if self.ground:
+            return f"take {self.ground[0]}"
+        return self.rng.choice(self.exits) if self.exits else "look"
+
+    def acted(self, command: str, worked: bool):
+        """Whatever happened, a take or refuel isn't tried with the same thing twice"""
+        if command.startswith("take "):
+            taken = self.ground.pop(0)
+            if worked:
+                self.pack.append(taken)
+        elif command.startswith("refuel "):
+            self.pack.pop(0)
+
+
+# What a stdout-scraping bot has to pull out of the game's text
+SCRAPE_ROUTES = re.compile(r"🛣️  Routes: (.*)")
+SCRAPE_SPOTTED = re.compile(r"🎒 You spot: (.*)")
+SCRAPE_FUEL = re.compile(r"⛽ Fuel: \[[^\]]*\] (\d+)%|Current fuel: (\d+)%|Fuel increased by \d+% \(now (\d+)%\)")
+SCRAPE_FUEL_LOST = re.compile(r"\((-\d+) (?:⛽ )?fuel\)")
+SCRAPE_HEALTH = re.compile(r"❤️  Health: \[[^\]]*\] (\d+)%|Health increased by \d+% \(now (\d+)%\)")
+SCRAPE_HEALTH_CHANGED = re.compile(r"\(([-+]\d+) (?:❤️  )?health\)")
+SCRAPE_TAKEN = re.compile(r"📦 You secure the (.*) in your pack\.")
+
+
+def scrape_text(mind: BotMind, command: str, text: str):
+    routes = SCRAPE_ROUTES.search(text)
+    if routes:
+        mind.exits = routes.group(1).split(", ")
+        spotted = SCRAPE_SPOTTED.search(text)
+        mind.ground = spotted.group(1).lower().split(", ") if spotted else []
+        if not SCRAPE_HEALTH.search(text):
+            mind.health = 100  # The status lines leave health out when it's full
+    worked = (SCRAPE_TAKEN.search(text) is not None if command.startswith("take ")
+              else "You add fuel" in text)
+    fuel = [int(next(number for number in found if number)) for found in SCRAPE_FUEL.findall(text)]
+    if fuel:
+        mind.fuel = fuel[-1]
+    else:
+        mind.fuel += sum(int(lost) for lost in SCRAPE_FUEL_LOST.findall(text))
+    health = [int(next(number for number in found if number)) for found in SCRAPE_HEALTH.findall(text)]
+    if health:
+        mind.health = health[-1]
+    else:
+        mind.health = min(100, mind.health + sum(int(change) for change in SCRAPE_HEALTH_CHANGED.findall(text)))
+    mind.over = "💀" in text or "🎉" in text
+    mind.acted(command, worked)
+
+
+def read_events(mind: BotMind, command: str, events: List[Any]):
+    worked = False
+    for event in events:
+        kind = type(event)
+        if kind is LocationSeen:
+            mind.exits, mind.ground = list(event.exits), list(event.items)
+        elif kind is FuelChanged:
+            mind.fuel = event.fuel
+        elif kind is HealthChanged:
+            mind.health = event.health
+        elif kind is ItemTaken or kind is ItemUsed:
+            worked = True
+        elif kind is GameOver or kind is Won:
+            mind.over = True
+    mind.acted(command, worked)
+
+
+def read_records(mind: BotMind, command: str, reply: Dict[str, Any]):
+    """The JSON-lines client: the same events, as decoded dicts"""
+    worked = False
+    for event in reply["events"]:
+        kind = event["event"]
+        if kind == "LocationSeen":
+            mind.exits, mind.ground = event["exits"], event["items"]
+        elif kind == "FuelChanged":
+            mind.fuel = event["fuel"]
+        elif kind == "HealthChanged":
+            mind.health = event["health"]
+        elif kind == "ItemTaken" or kind == "ItemUsed":
+            worked = True
+    mind.over = reply["over"]
+    mind.acted(command, worked)
+
+
+def read_compact(mind: BotMind, command: str, reply: Dict[str, Any]):
+    """The compact JSON-lines client: events as [kind, fields...] in events.SCHEMA order"""
+    worked = False
+    for event in reply["events"]:
+        kind = event[0]
+        if kind == "LocationSeen":
+            mind.exits, mind.ground = event[2], event[3]
+        elif kind == "FuelChanged":
+            mind.fuel = event[2]
+        elif kind == "HealthChanged":
+            mind.health = event[2]
+        elif kind == "ItemTaken" or kind == "ItemUsed":
+            worked = True
+    mind.over = reply["over"]
+    mind.acted(command, worked)
+
+
+BOT_COMMAND_LIMIT = 300  # Per game, for bots that wander forever
+
+
+@benchmark
+def bench_events(args: argparse.Namespace):
+    """Bot games per second: scraping the game's text vs JSON-lines events vs events in process"""
+    world = World.load()
+
+    def scraping(seed: int) -> Tuple[WastelandEngine, int]:
+        sink = BufferedSink()
+        engine = WastelandEngine(seed=seed, world=world, output=sink, save_backend=saves.DiscardSaveBackend())
+        mind = BotMind(seed)
+        engine.display_location()
+        scrape_text(mind, "look", sink.take())
+        for ran in range(1, BOT_COMMAND_LIMIT + 1):
+            command = mind.next_command()
+            engine.process_command(command)
+            scrape_text(mind, command, sink.take())
+            if mind.over:
+                break
+        return engine, ran
+
+    def json_lines(seed: int, compact: bool = False) -> Tuple[WastelandEngine, int]:
+        session = ApiSession(world, seed, saves.DiscardSaveBackend(), compact=compact)
+        read = read_compact if compact else read_records
+        mind = BotMind(seed)
+        read(mind, "look", json.loads(session.start().splitlines()[-1]))
+        for ran in range(1, BOT_COMMAND_LIMIT + 1):
+            command = mind.next_command()
+            read(mind, command, json.loads(session.handle(command)[0]))
+            if mind.over:
+                break
+        return session.engine, ran
+
+    def in_process(seed: int) -> Tuple[WastelandEngine, int]:
+        engine = WastelandEngine(seed=seed, headless=True, world=world, save_backend=saves.DiscardSaveBackend(),
+                                 record_events=True)
+        mind = BotMind(seed)
+        engine.display_location()
+        read_events(mind, "look", engine.take_events())
+        for ran in range(1, BOT_COMMAND_LIMIT + 1):
+            command = mind.next_command()
+            engine.process_command(command)
+            read_events(mind, command, engine.take_events())
+            if mind.over:
+                break
+        return engine, ran
+
+    variants = {"stdout scraping": scraping, "JSON-lines API": json_lines,
+                "... --compact": lambda seed: json_lines(seed, compact=True), "events in process": in_process}
+    # Every front end must see the same games, or the comparison means nothing
+    for seed in range(min(args.bot_games, 200)):
+        outcomes = {(repr(engine.snapshot_state()), engine.state, ran)
+                    for engine, ran in (play(seed) for play in variants.values())}
+        assert len(outcomes) == 1, f"bots disagree on seed {seed}"
+
+    print(f"events: {args.bot_games:,} bot games on {WORLD_FILE}")
+    baseline = None
+    for name, play in variants.items():
+        commands = 0
+
+        def run():
+            nonlocal commands
+            commands = sum(play(seed)[1] for seed in range(args.bot_games))
+        elapsed = timed(run, args.repeat)
+        rate = commands / elapsed
+        baseline = baseline or rate
+        print(f"  {name:<20} {rate:>12,.0f} commands/sec  {args.bot_games / elapsed:>8,.0f} games/sec"
+              f" ({(rate / baseline - 1) * 100:+.1f}%)")
+
+
+@benchmark
+def bench_encounters(args: argparse.Namespace):
+    """Encounter picks per second: alias table vs random.choices, by table size"""
+    draws = args.queries
+    print(f"encounters: {draws:,} picks per table")
+    print(f"  {'encounters':>10} {'choices()':>14} {'cum_weights':>14} {'alias table':>14}   (picks/sec)")
+    for size in (5, 50, 500):
+        weight_rng = random.Random(size)
+        weights = [weight_rng.paretovariate(1.5) for _ in range(size)]  # A few common, many rare
+        table = EncounterTable(0.3, [Encounter(f"encounter {number}") for number in range(size)], weights)
+
+        rng = random.Random(1)
+        counts = [0] * size
+        for _ in range(draws):
+            counts[table.picker.sample(rng)] += 1
+        total = sum(weights)
+        worst = max(abs(count / draws - weight / total) for count, weight in zip(counts, weights))
+        assert worst < 0.01, f"alias table is off by {worst:.3f}"
+        first, second = random.Random(42), random.Random(42)
+        assert [table.pick(first) for _ in range(1000)] == [table.pick(second) for _ in range(1000)]
+
+        population = table.encounters
+        cumulative = list(itertools.accumulate(weights))
+
+        def choices():
+            pick = random.Random(1).choices
+            for _ in range(draws):
+                pick(population, weights)
+
+        def bisected():
+            pick = random.Random(1).choices
+            for _ in range(draws):
+                pick(population, cum_weights=cumulative)
+
+        def alias():
+            pick, rng = table.pick, random.Random(1)
+            for _ in range(draws):
+                pick(rng)
+
+        rates = [draws / timed(run, args.repeat) for run in (choices, bisected, alias)]
+        print(f"  {size:>10} {rates[0]:>14,.0f} {rates[1]:>14,.0f} {rates[2]:>14,.0f}")
+
+
+@benchmark
+def bench_clock(args: argparse.Namespace):
+    """Commands/sec with many timed events pending: the heap clock vs scanning every event each tick"""
+    data = world_data(World.load())
+    data["timed_events"] = {
+        "evaporation": {"kind": "evaporation", "every": 30, "effects": {"fuel": [0, 1]}},
+        "restock": {"kind": "respawn", "every": 50, "locations": ["truck_stop"], "item": "gas_can"},
+        "squall": {"kind": "storm", "first": 10**9, "locations": ["los_angeles"], "effects": {"bike": [1, 5]}},
+    }
+    world = World.from_data(data)
+    commands = (SCALING_COMMANDS * (args.queries // len(SCALING_COMMANDS) + 1))[:args.queries]
+    horizon = len(commands) * 100  # Pending squalls fall due over this many ticks after the run
+
+    def engine_with(pending: int) -> WastelandEngine:
+        engine = WastelandEngine(seed=1, headless=True, world=world)
+        rng = random.Random(pending)
+        for _ in range(pending):
+            engine.clock.schedule(len(commands) + rng.randrange(1, horizon), "squall")
+        return engine
+
+    def play(engine: WastelandEngine) -> WastelandEngine:
+        for command in commands:
+            engine.rider.fuel = engine.rider.bike_condition = 100
+            engine.process_command(command)
+        return engine
+
+    def scan(engine: WastelandEngine) -> WastelandEngine:
+        """The obvious alternative: a flat list, every entry checked on every tick"""
+        pending = list(engine.clock.heap)
+        engine.clock.heap = []
+        for command in commands:
+            engine.rider.fuel = engine.rider.bike_condition = 100
+            engine.process_command(command)
+            now = engine.rider.ticks
+            due = [entry for entry in pending if entry[0] <= now]
+            if due:
+                pending = [entry for entry in pending if entry[0] > now]
+        return engine
+
+    def rate(run: Callable[[WastelandEngine], WastelandEngine], pending: int, repeat: int) -> float:
+        """Best commands/sec of `run`, each time on a fresh engine built outside the timing"""
+        best = float("inf")
+        for _ in range(repeat):
+            engine = engine_with(pending)
+            start = time.perf_counter()
+            run(engine)
+            best = min(best, time.perf_counter() - start)
+        return len(commands) / best
+
+    print(f"clock: {len(commands):,} commands; the world's own events fire every 30-50 ticks, "
+          f"the pending ones later")
+    print(f"  {'pending':>9} {'heap clock':>14} {'list scan':>14}   (commands/sec)")
+    for pending in args.pending:
+        engine = play(engine_with(pending))
+        assert len(engine.clock) <= pending + len(world.timed_events)
+        assert engine.clock.next_due() > engine.rider.ticks
+        print(f"  {pending:>9,} {rate(play, pending, args.repeat):>14,.0f} "
+              f"{rate(scan, pending, min(args.repeat, 2)):>14,.0f}")
+
+
+@benchmark
+def bench_survival(args: argparse.Namespace):
+    """Route survival odds: NumPy riders vs scalar engine rides, checked to agree"""
+    if survival.np is None:
+        print("survival: skipped, needs NumPy (pip install numpy)")
+        return
+    data = world_data(World.load())
+    data["timed_events"] = {
+        "heat": {"kind": "evaporation", "every": 2, "effects": {"fuel": [0, 2], "health": [1, 3]}},
+        "raiders": {"kind": "patrol", "every": 1, "effects": {"bike": [2, 9]},
+                    "locations": ["potomac_bridge", "virginia_hills", "kentucky_border", "appalachian_pass"]},
+    }
+    cases = [("new rider", World.load(), None, None), ("battered bike", World.load(), 27, 12),
+             ("heat and patrols", World.from_data(data), 32, 25)]
+    print(f"survival: dc_ruins to los_angeles, {args.riders:,} NumPy riders vs {args.scalar_riders:,} engine rides")
+    print(f"  {'case':<17} {'died':>7} {'stranded':>9} {'worst z':>8} {'numpy':>12} {'engine':>10} {'speedup':>8}"
+          f"   (riders/sec)")
+    for label, world, fuel, bike in cases:
+        path = world.routes.plan("dc_ruins", "los_angeles", 100, 100).path
+        route = survival.compile_route(world, path)
+        odds = survival.survival_odds(route, args.riders, 1, fuel, bike)
+        reference = survival.scalar_odds(world, path, args.scalar_riders, 0, fuel, bike)
+        worst = max(survival.z_scores(odds, reference).values())
+        assert worst < 5, f"{label}: NumPy riders and the engine disagree by {worst:.1f} standard errors"
+        vectorized = args.riders / timed(lambda: survival.survival_odds(route, args.riders, 1, fuel, bike), args.repeat)
+        scalar = args.scalar_riders / timed(
+            lambda: survival.scalar_odds(world, path, args.scalar_riders, 0, fuel, bike), 1)
+        print(f"  {label:<17} {odds.death_rate:>7.2%} {odds.rate(survival.STRANDED):>9.2%} {worst:>8.2f} "
+              f"{vectorized:>12,.0f} {scalar:>10,.0f} {vectorized / scalar:>7,.0f}x")
+
+
+@benchmark
+def bench_reload(args: argparse.Namespace):
+    """One-location edit to a world file: restart (parse, build, tables) vs hot reload, by world size"""
+    print(f"reload: one location's fuel_cost edited, {args.engines:,} live sessions")
+    print(f"  {'locations':>10} {'restart':>12} {'hot: diff':>12} {'hot: pause':>12}")
+    for size in args.sizes:
+        data = worldgen.generate_world(size, min(args.items, size), branching=0.1, seed=size)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "world.json")
+            with open(path, "w") as f:
+                json.dump(data, f)
+            world = World.from_data(json.loads(json.dumps(data)))
+            world.routes.tree(0)
+            engines = []
+            for number in range(args.engines):
+                engine = WastelandEngine(seed=number, headless=True, world=world)
+                engine.process_command("look")  # Marks the start visited: every session has changed it
+                engines.append(engine)
+            reloader = hotreload.WorldReloader(path, world, lambda: engines)
+
+            def restart():
+                with open(path, "rb") as f:
+                    rebuilt = World.from_data(json.loads(f.read()))
+                rebuilt.routes.tree(0)
+
+            edited = "dc_ruins"
+            timings = []
+            for cost in range(2, 2 + args.repeat):
+                data["locations"][edited]["fuel_cost"] = cost
+                with open(path, "w") as f:
+                    json.dump(data, f)
+                os.utime(path, ns=(cost, cost))  # Same size, so make sure the stamp moves
+                report = reloader.reload()
+                assert report is not None and list(report.diff.locations) == [edited]
+                timings.append((report.diff_seconds, report.pause_seconds))
+            assert world.compact.fuel_cost == CompactWorld.from_world(world).fuel_cost
+            assert all(engine.locations[edited].fuel_cost == cost and engine.locations[edited].visited
+                       for engine in engines)
+            reloader.close()
+            diff, pause = min(timings)
+            print(f"  {size:>10,} {timed(restart, 1) * 1000:>10.1f}ms {diff * 1000:>10.1f}ms {pause * 1000:>10.3f}ms")
+
+
+@benchmark
+def bench_scripts(args: argparse.Namespace):
+    """A QA corpus of command scripts: run() under a pipe vs scripts.py, text and JSON lines"""
+    rng = random.Random(1)
+    vocabulary = DISPATCH_COMMANDS[:-1] + ["north", "south", "west", "east", "take pills", "use pills"]
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for number in range(args.scripts):
+            path = os.path.join(directory, f"script_{number}.txt")
+            with open(path, "w") as f:
+                f.write("\n".join(rng.choice(vocabulary) for _ in range(args.script_length)) + "\n")
+            paths.append(path)
+
+        def piped_run():
+            # What the pipelines did before: the interactive loop, banner, prompts and all
+            stdin = sys.stdin
+            with open(os.devnull, "w") as devnull:
+                try:
+                    for number, path in enumerate(paths):
+                        with open(path) as sys.stdin, contextlib.redirect_stdout(devnull):
+                            WastelandEngine(seed=number, save_backend=saves.DiscardSaveBackend()).run()
+                finally:
+                    sys.stdin = stdin
+
+        variants = {"run() piped": piped_run}
+        with open(os.devnull, "w") as devnull:
+            variants["scripts.py, text"] = lambda: scripts.run_scripts(paths, devnull)
+            variants["... --jsonl"] = lambda: scripts.run_scripts(paths, devnull, jsonl=True)
+            variants["... --jsonl --no-text"] = lambda: scripts.run_scripts(paths, devnull, jsonl=True, text=False)
+            workers = max(2, os.cpu_count() or 1)  # At least 2, so the pool's own overhead shows
+            variants[f"... --jsonl --workers {workers}"] = lambda: scripts.run_scripts(
+                paths, devnull, workers=workers, jsonl=True)
+            print(f"scripts: {args.scripts:,} scripts of {args.script_length} commands")
+            for name, run in variants.items():
+                elapsed = timed(run, 1)
+                print(f"  {name:<24} {args.scripts / elapsed:>10,.0f} scripts/sec ({elapsed:.2f}s)")
+
+
+def location_data(location: Location) -> Dict[str, Any]:
+    return {"name": location.name, "description": location.description,
+            "exits": dict(location.exits), "items": list(location.items),
+            "visited": location.visited, "dangerous": location.dangerous,
+            "fuel_cost": location.fuel_cost, "encounters": location.encounters,
+            "coordinates": location.coordinates}
+
+
+@benchmark
+def bench_saves(args: argparse.Namespace):
+    """save_game/load_game: full indented JSON dump vs binary delta save, by world size"""
+    print(f"saves: {'locations':>10} {'format':>8} {'save ms':>10} {'load ms':>10} {'bytes':>12}")
+    for size in args.sizes:
+        world = synthetic_world(size, max(10, size // 4))
+        engine = WastelandEngine(seed=1, headless=True, world=world)
+        engine.rider.fuel = 100
+        for command in ["look", "drop jerky", "west", "take item", "west", "west", "take item", "west"]:
+            engine.process_command(command)
+
+        with tempfile.TemporaryDirectory() as directory:
+            legacy_path = os.path.join(directory, saves.LEGACY_SAVE_FILE)
+
+            def legacy_save():
+                state = engine.snapshot_state()
+                state["locations"] = {location_id: location_data(location)
+                                      for location_id, location in engine.locations.items()}
+                with open(legacy_path, "w") as f:
+                    json.dump(state, f, indent=2)
+
+            def legacy_load():
+                with open(legacy_path, "r") as f:
+                    state = json.load(f)
+                return {location_id: Location(**location) for location_id, location in state["locations"].items()}
+
+            def delta_save():
+                saves.save_state(engine.snapshot_state(), directory=directory)
+
+            def delta_load():
+                engine.restore_state(saves.load_state(directory=directory))
+
+            results = [("json", timed(legacy_save, args.repeat), timed(legacy_load, args.repeat),
+                        os.path.getsize(legacy_path)),
+                       ("delta", timed(delta_save, args.repeat), timed(delta_load, args.repeat),
+                        os.path.getsize(saves.slot_path(directory=directory)))]
+        for name, save_time, load_time, size_bytes in results:
+            print(f"       {size:>10,} {name:>8} {save_time * 1000:>10.2f} {load_time * 1000:>10.2f} {size_bytes:>12,}")
+
+
+STARTUP_PROBE = """
+import json, resource, sys, time
+import game
+start = time.perf_counter()
+engine = game.WastelandEngine(seed=1, headless=True, world=game.World.load(sys.argv[1]) if sys.argv[1] else None)
+for command in ["look", "west", "take item", "west", "inventory"]:
+    engine.process_command(command)
+elapsed = time.perf_counter() - start
+try:
+    # ru_maxrss survives exec on Linux, so it would include the parent benchmark's peak
+    with open("/proc/self/status") as f:
+        peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except OSError:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"startup": elapsed, "rss_kib": peak}))
+"""
+
+
+def startup_probe(path: str) -> Dict[str, float]:
+    """Load a world and play a few commands in a fresh interpreter, so RSS is that world's alone"""
+    output = subprocess.run([sys.executable, "-c", STARTUP_PROBE, path], check=True, capture_output=True,
+                            text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@benchmark
+def bench_packed(args: argparse.Namespace):
+    """Startup time and peak RSS: whole-file JSON world vs memory-mapped packed world"""
+    size = max(args.sizes)
+    data = world_data(synthetic_world(size, max(10, size // 20)))
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "world.json")
+        pack_path = os.path.join(directory, "world.wrpack")
+        with open(json_path, "w") as f:
+            json.dump(data, f)
+        worldpack.write_pack(data, pack_path)
+        del data
+
+        baseline = startup_probe("")  # The 12-location wasteland.json, for the interpreter's own footprint
+        print(f"packed: {size:,} locations ({os.path.getsize(json_path) / 2**20:.1f} MiB JSON, "
+              f"{os.path.getsize(pack_path) / 2**20:.1f} MiB packed)")
+        print(f"  {'format':<14} {'startup ms':>11} {'peak RSS MiB':>13}")
+        for name, path in (("wasteland.json", ""), ("json", json_path), ("packed", pack_path)):
+            result = baseline if not path else startup_probe(path)
+            print(f"  {name:<14} {result['startup'] * 1000:>11.1f} {result['rss_kib'] / 1024:>13.1f}")
+
+
+FIRST_SCREEN = """
+import sys
+import game
+if sys.argv[1]:
+    game.WORLD_FILE = sys.argv[1]
+game.WastelandEngine(seed=1).display_location()
+"""
+
+
+def time_first_screen(world_file: str, repeat: int, before: Callable[[], None] = lambda: None) -> float:
+    """Best wall time from launching Python to the first location description"""
+    best = float("inf")
+    for _ in range(repeat):
+        before()
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", FIRST_SCREEN, world_file], check=True, stdout=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@benchmark
+def bench_startup(args: argparse.Namespace):
+    """Process start to first display_location: JSON parse vs compiled snapshot vs built-in default world"""
+    with tempfile.TemporaryDirectory() as directory:
+        worlds = [("wasteland.json", WORLD_FILE)]
+        for size in args.sizes:
+            path = os.path.join(directory, f"world_{size}.json")
+            with open(path, "w") as f:
+                json.dump(world_data(synthetic_world(size, max(10, size // 20))), f)
+            worlds.append((f"{size:,} locations", path))
+
+        def drop_snapshot(path: str) -> Callable[[], None]:
+            def drop():
+                if os.path.exists(compiled_world_path(path)):
+                    os.unlink(compiled_world_path(path))
+            return drop
+
+        print(f"startup: {'world':>18} {'cold ms':>10} {'cached ms':>10}")
+        missing = os.path.join(directory, "missing.json")
+        print(f"         {'default world':>18} {time_first_screen(missing, args.repeat) * 1000:>10.1f} {'-':>10}")
+        for name, path in worlds:
+            cold = time_first_screen(path, args.repeat, drop_snapshot(path))
+            cached = time_first_screen(path, args.repeat)
+            print(f"         {name:>18} {cold * 1000:>10.1f} {cached * 1000:>10.1f}")
+
+
+SCALING_COMMANDS = ["look", "west", "take fuel", "inventory", "status", "examine fuel", "drop fuel",
+                    "east", "take gear", "use gear", "help", "i"]
+
+
+def scaling_results(size: int, args: argparse.Namespace, directory: str) -> List[Dict[str, Any]]:
+    """Load, command, lookup and save measurements for one generated world size"""
+    results = []
+
+    def record(metric: str, value: float, unit: str):
+        results.append({"benchmark": "scaling", "locations": size, "metric": metric,
+                        "value": round(value, 6), "unit": unit})
+
+    path = os.path.join(directory, f"world_{size}.json")
+    data = worldgen.generate_world(size, max(10, size // 100), branching=0.1, seed=1, description_words=20)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    del data
+    record("world_file_size", os.path.getsize(path), "bytes")
+
+    gc.collect()
+    start = time.perf_counter()
+    World.load(path)  # No snapshot yet: parses the JSON and writes one
+    record("world_load_cold", (time.perf_counter() - start) * 1000, "ms")
+    game_module._worlds.clear()
+    gc.collect()
+    start = time.perf_counter()
+    world = World.load(path)
+    record("world_load_snapshot", (time.perf_counter() - start) * 1000, "ms")
+
+    engine = WastelandEngine(seed=1, headless=True, world=world)
+    commands = SCALING_COMMANDS * (args.queries // len(SCALING_COMMANDS) + 1)
+
+    def play():
+        for command in commands[:args.queries]:
+            engine.rider.fuel = engine.rider.bike_condition = engine.rider.health = 100
+            engine.state = GameState.PLAYING
+            engine.process_command(command)
+    record("process_command", args.queries / timed(play, args.repeat), "commands/s")
+
+    rng = random.Random(1)
+    pack = rng.sample(list(world.items), min(args.pack, len(world.items)))
+    names = [rng.choice([item_id, rng.choice(world.items[item_id].aliases or (item_id,)),
+                         world.items[item_id].name.lower().split()[-1], "golden wrench"])
+             for item_id in (rng.choice(pack) for _ in range(args.queries))]
+    record("find_item_by_name", args.queries / timed(
+        lambda: [engine.find_item_by_name(name, pack) for name in names], args.repeat), "lookups/s")
+
+    engine.save_backend = saves.FileSaveBackend(directory)
+    record("save_game", timed(engine.save_game, args.repeat) * 1000, "ms")
+    record("load_game", timed(engine.load_game, args.repeat) * 1000, "ms")
+    record("save_size", os.path.getsize(saves.slot_path(directory=directory)), "bytes")
+    return results
+
+
+@benchmark
+def bench_scaling(args: argparse.Namespace):
+    """Generated worlds at each --scale-sizes: load time, process_command, find_item_by_name,
+    save/load. Prints one JSON object per measurement, for tracking regressions."""
+    meta = {"python": platform.python_version(), "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.scale_sizes:
+            for result in scaling_results(size, args, directory):
+                line = json.dumps({**result, **meta})
+                print(line, flush=True)
+                if args.output:
+                    with open(args.output, "a") as f:
+                        f.write(line + "\n")
+            game_module._worlds.clear()
+            gc.collect()
+
+
+def percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    pick = lambda fraction: samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+    return f"p50 {pick(0.5):.3f} ms, p99 {pick(0.99):.3f} ms"
+
+
+@benchmark
+def bench_save_store(args: argparse.Namespace):
+    """Save backends under many concurrent players: files vs pooled, batched SQLite"""
+    engine = WastelandEngine(seed=1, headless=True)
+    for command in ["take gas", "west", "north", "take food"]:
+        engine.process_command(command)
+    blob = saves.encode_save(engine.snapshot_state())
+    players = [f"rider{number}" for number in range(args.players)]
+    shards = [players[start::args.threads] for start in range(args.threads)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = [("files", saves.FileSaveBackend(directory)),
+                    ("sqlite", saves.SQLiteSaveBackend(os.path.join(directory, "saves.db")))]
+        for name, backend in backends:
+            def save_all(shard: List[str]):
+                for _ in range(args.saves_per_player):
+                    for player in shard:
+                        backend.save(player, saves.DEFAULT_SLOT, blob)
+
+            latencies: List[float] = []
+
+            def load_some(shard: List[str]):
+                rng = random.Random(len(shard))
+                for player in rng.sample(shard, min(len(shard), 200)):
+                    start = time.perf_counter()
+                    backend.load(player, saves.DEFAULT_SLOT)
+                    latencies.append(time.perf_counter() - start)
+
+            def on_threads(work: Callable[[List[str]], None]) -> float:
+                start = time.perf_counter()
+                threads = [threading.Thread(target=work, args=(shard,)) for shard in shards]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                backend.flush()  # Saves only count once they are committed
+                return time.perf_counter() - start
+
+            elapsed = on_threads(save_all)
+            on_threads(load_some)
+            backend.close()
+
+            total = args.players * args.saves_per_player
+            batches = f", {backend.batches} transactions" if isinstance(backend, saves.SQLiteSaveBackend) else ""
+            print(f"save store ({name}): {args.players} players x {args.saves_per_player} saves "
+                  f"on {args.threads} threads{batches}")
+            print(f"  {total / elapsed:>10,.0f} saves/sec   load {percentiles(latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Wasteland Rider benchmarks")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--pack", type=int, default=300)
+    parser.add_argument("--pack-units", type=int, default=10000, help="Items carried, for the inventory benchmark")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--engines", type=int, default=10000)
+    parser.add_argument("--locations", type=int, default=100)
+    parser.add_argument("--route-locations", type=int, default=50000)
+    parser.add_argument("--geo-locations", type=int, default=1_000_000, help="Locations, for the geo benchmark")
+    parser.add_argument("--sizes", type=lambda text: [int(size) for size in text.split(",")],
+                        default=[100, 1000, 10000, 100000], help="World sizes, comma separated")
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--saves-per-player", type=int, default=3)
+    parser.add_argument("--scale-sizes", type=lambda text: [int(size) for size in text.split(",")],
+                        default=[10**2, 10**4, 10**6], help="World sizes for the scaling suite")
+    parser.add_argument("--journal-commands", type=int, default=100000)
+    parser.add_argument("--scripts", type=int, default=10000, help="Scripts in the script runner's corpus")
+    parser.add_argument("--script-length", type=int, default=30)
+    parser.add_argument("--pending", type=lambda text: [int(size) for size in text.split(",")],
+                        default=[0, 1000, 10000, 100000], help="Pending timed events, for the clock benchmark")
+    parser.add_argument("--bot-games", type=int, default=1000, help="Games each bot plays, for the events benchmark")
+    parser.add_argument("--riders", type=int, default=1_000_000, help="NumPy riders, for the survival benchmark")
+    parser.add_argument("--scalar-riders", type=int, default=20000, help="Engine rides it is checked against")
+    parser.add_argument("--output", help="Also append the scaling suite's JSON lines to this file")
+    args = parser.parse_args()
+
+    for name in args.names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+        BENCHMARKS[name](args)
+
+
+if __name__ == "__main__":
+    main()
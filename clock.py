@@ -0,0 +1,104 @@
+"""
+Wasteland Rider - Game Clock
+Time is counted in whole ticks: every command is one, a night's rest is a
+day of TICKS_PER_DAY. Timed world events - fuel evaporation, storms, item
+respawns, raider patrols - are world data, and each engine keeps the ones
+still to come in a heap ordered by due tick. A command only looks at the
+top of the heap, so it costs the same with ten pending events or a million;
+just the events that are due get popped and run.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from encounters import EFFECTS
+
+TICKS_PER_COMMAND = 1
+TICKS_PER_DAY = 10
+
+
+@dataclass(frozen=True)
+class TimedEvent:
+    kind: str  # Which handler runs it - see game.TIMED_EVENTS
+    first: int  # Tick of the first firing
+    every: int = 0  # Ticks between firings; 0 fires once
+    text: str = ""
+    effects: Tuple[Tuple[str, int, int], ...] = ()  # (stat, least, most) lost, as for encounters
+    locations: Tuple[str, ...] = ()  # Where it happens: a storm's region, a respawn spot, a patrol's beat
+    item: Optional[str] = None  # What a respawn puts back
+    name: str = ""  # Its id in the world file
+
+
+def compile_timed_events(data: Mapping[str, Dict[str, Any]]) -> Dict[str, TimedEvent]:
+    """Check and compile the timed_events section of a world file"""
+    compiled = {}
+    for event_id, event in data.items():
+        effects = []
+        for stat, (least, most) in event.get("effects", {}).items():
+            if stat not in EFFECTS or not 0 <= least <= most:
+                raise ValueError(f"timed event '{event_id}' has a bad effect: {stat} {least}-{most}")
+            effects.append((stat, least, most))
+        first, every = event.get("first", event.get("every", 0)), event.get("every", 0)
+        if first < 0 or every < 0 or (first == 0 and every == 0):
+            raise ValueError(f"timed event '{event_id}' needs a positive 'first' or 'every' tick")
+        compiled[event_id] = TimedEvent(event["kind"], first, every, event.get("text", ""), tuple(effects),
+                                        tuple(event.get("locations", ())), event.get("item"), event_id)
+    return compiled
+
+
+class Scheduler:
+    """Pending events as a heap of (due tick, order, event id, firings so far).
+    `order` breaks ties first-scheduled-first, so runs and replays agree."""
+
+    __slots__ = ("heap", "scheduled")
+
+    def __init__(self):
+        self.heap: List[Tuple[int, int, str, int]] = []
+        self.scheduled = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def schedule(self, due: int, event_id: str, fired: int = 0):
+        heapq.heappush(self.heap, (due, self.scheduled, event_id, fired))
+        self.scheduled += 1
+
+    def start(self, events: Mapping[str, TimedEvent], now: int = 0):
+        """Schedule the next firing after tick `now` of every event not already pending,
+        counting the firings it has had by then - so a patrol picks up its beat where it
+        would be. Ones that only fire once and are already past stay gone."""
+        pending = {entry[2] for entry in self.heap}
+        for event_id, event in events.items():
+            if event_id in pending:
+                continue  # Its saved count stands
+            due, fired = event.first, 0
+            if due <= now:
+                if not event.every:
+                    continue
+                fired = (now - due) // event.every + 1
+                due += fired * event.every
+            self.schedule(due, event_id, fired)
+
+    def next_due(self) -> Optional[int]:
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: int) -> Iterator[Tuple[int, str, int]]:
+        """(due tick, event id, firings so far) of each event due by `now`, earliest first.
+        Events scheduled while this runs are popped too if they fall due by `now`."""
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            due, _, event_id, fired = heapq.heappop(heap)
+            yield due, event_id, fired
+
+    def state(self) -> Dict[str, Any]:
+        """For saves and journals: plain lists, in heap order"""
+        return {"scheduled": self.scheduled, "pending": [list(entry) for entry in self.heap]}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> "Scheduler":
+        scheduler = cls()
+        scheduler.scheduled = state["scheduled"]
+        scheduler.heap = [tuple(entry) for entry in state["pending"]]
+        heapq.heapify(scheduler.heap)  # A no-op for our own saves; cheap insurance for edited ones
+        return scheduler
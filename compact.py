@@ -0,0 +1,147 @@
+"""
+Wasteland Rider - Compact World Tables
+Numbers every location and item once and keeps exits, fuel costs, danger
+flags, map coordinates and item placement in flat arrays, so large generated worlds can be
+walked by route planning and analysis code without touching Location objects
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, Mapping, Tuple
+
+UNMAPPED = (float("nan"), float("nan"))  # Coordinates of a location that has none
+
+
+class CompactWorld:
+    """Read-only, integer-indexed tables built from a World's locations and items.
+    adjacency[n] is a tuple of the location numbers reachable from location n, with
+    the matching direction numbers in exit_directions[n]. Item placement uses offset
+    arrays: the items at location n are item_refs[item_offsets[n]:item_offsets[n + 1]].
+    latitude[n] and longitude[n] are NaN for a location without coordinates."""
+
+    __slots__ = ("location_ids", "location_numbers", "item_ids", "item_numbers",
+                 "directions", "direction_numbers", "fuel_cost", "dangerous",
+                 "latitude", "longitude", "adjacency", "exit_directions", "item_offsets", "item_refs")
+
+    def __init__(self, locations: Mapping[str, object], items: Mapping[str, object]):
+        self.location_ids: Tuple[str, ...] = tuple(locations)
+        self.location_numbers: Dict[str, int] = {location_id: number
+                                                 for number, location_id in enumerate(self.location_ids)}
+        self.item_ids: Tuple[str, ...] = tuple(items)
+        self.item_numbers: Dict[str, int] = {item_id: number for number, item_id in enumerate(self.item_ids)}
+        self.directions: list = []
+        self.direction_numbers: Dict[str, int] = {}
+
+        self.fuel_cost = array("i")
+        self.dangerous = bytearray()
+        self.latitude = array("d")
+        self.longitude = array("d")
+        self.item_offsets = array("I", [0])
+        self.item_refs = array("I")
+        adjacency = []
+        exit_directions = []
+        # Most locations share a handful of direction layouts ("east", "west"), so share the tuples
+        layouts: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+        for location in locations.values():
+            self.fuel_cost.append(location.fuel_cost)
+            self.dangerous.append(1 if location.dangerous else 0)
+            latitude, longitude = location.coordinates or UNMAPPED
+            self.latitude.append(latitude)
+            self.longitude.append(longitude)
+            targets = []
+            directions = []
+            for direction, target in location.exits.items():
+                number = self.location_numbers.get(target)
+                if number is None:
+                    continue  # Exit to a location the world doesn't define
+                targets.append(number)
+                directions.append(self._direction_number(direction))
+            adjacency.append(tuple(targets))
+            directions = tuple(directions)
+            exit_directions.append(layouts.setdefault(directions, directions))
+            for item_id in location.items:
+                number = self.item_numbers.get(item_id)
+                if number is not None:
+                    self.item_refs.append(number)
+            self.item_offsets.append(len(self.item_refs))
+        self.adjacency: Tuple[Tuple[int, ...], ...] = tuple(adjacency)
+        self.exit_directions: Tuple[Tuple[int, ...], ...] = tuple(exit_directions)
+
+    @classmethod
+    def from_world(cls, world) -> "CompactWorld":
+        return cls(world.locations, world.items)
+
+    def patch(self, changed: Mapping[str, object], items: Iterable[str] = ()):
+        """Bring the tables up to date after locations changed or were added, and items
+        were added: new ones are numbered after the existing ones. Removals renumber
+        everything, so they need a fresh CompactWorld. Exits from unchanged locations
+        to a newly added one are only seen once those locations change too."""
+        added_items = [item_id for item_id in items if item_id not in self.item_numbers]
+        for item_id in added_items:
+            self.item_numbers[item_id] = len(self.item_numbers)
+        if added_items:
+            self.item_ids = tuple(self.item_numbers)
+
+        added = [location_id for location_id in changed if location_id not in self.location_numbers]
+        adjacency = list(self.adjacency)
+        exit_directions = list(self.exit_directions)
+        for location_id in added:
+            self.location_numbers[location_id] = len(self.location_numbers)
+            self.fuel_cost.append(0)
+            self.dangerous.append(0)
+            self.latitude.append(UNMAPPED[0])
+            self.longitude.append(UNMAPPED[1])
+            adjacency.append(())
+            exit_directions.append(())
+            self.item_offsets.append(self.item_offsets[-1])
+        if added:
+            self.location_ids = tuple(self.location_numbers)
+
+        for location_id, location in changed.items():
+            number = self.location_numbers[location_id]
+            self.fuel_cost[number] = location.fuel_cost
+            self.dangerous[number] = 1 if location.dangerous else 0
+            self.latitude[number], self.longitude[number] = location.coordinates or UNMAPPED
+            targets = []
+            directions = []
+            for direction, target in location.exits.items():
+                if target in self.location_numbers:
+                    targets.append(self.location_numbers[target])
+                    directions.append(self._direction_number(direction))
+            adjacency[number] = tuple(targets)
+            exit_directions[number] = tuple(directions)
+            refs = array("I", [self.item_numbers[item_id] for item_id in location.items if item_id in self.item_numbers])
+            start, end = self.item_offsets[number], self.item_offsets[number + 1]
+            self.item_refs[start:end] = refs
+            shift = len(refs) - (end - start)
+            if shift:
+                self.item_offsets[number + 1:] = array("I", map(shift.__add__, self.item_offsets[number + 1:]))
+        self.adjacency = tuple(adjacency)
+        self.exit_directions = tuple(exit_directions)
+
+    def _direction_number(self, direction: str) -> int:
+        number = self.direction_numbers.get(direction)
+        if number is None:
+            number = self.direction_numbers[direction] = len(self.directions)
+            self.directions.append(direction)
+        return number
+
+    def __len__(self) -> int:
+        return len(self.location_ids)
+
+    def exits(self, number: int) -> Iterator[Tuple[str, int]]:
+        """(direction, target location number) pairs for one location"""
+        for direction, target in zip(self.exit_directions[number], self.adjacency[number]):
+            yield self.directions[direction], target
+
+    def location_items(self, number: int) -> array:
+        """Numbers of the items placed at a location in the pristine world"""
+        return self.item_refs[self.item_offsets[number]:self.item_offsets[number + 1]]
+
+    def has_item(self, location_number: int, item_number: int) -> bool:
+        return item_number in self.location_items(location_number)
+
+    def nbytes(self) -> int:
+        """Bytes held by the array tables (not the id tuples and dicts)"""
+        tables = (self.fuel_cost, self.latitude, self.longitude, self.item_offsets, self.item_refs)
+        return sum(table.itemsize * len(table) for table in tables) + len(self.dangerous)
@@ -0,0 +1,121 @@
+"""
+Wasteland Rider - Encounter Tables
+Encounters are world data: each has its text and explicit effects, and
+named tables give each region its own encounter chance and weights.
+Tables are compiled into alias tables (Vose's method) once per world, so
+picking an encounter costs one random number whatever the table's size.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Rider stats an effect can lower, with how the loss is shown
+EFFECTS = {"bike": "🔧 condition", "health": "❤️  health", "fuel": "⛽ fuel"}
+
+DEFAULT_TABLE = "default"  # Used by dangerous locations that don't name a table
+
+# The encounters every world had before they became data; worlds without their own use these
+DEFAULT_ENCOUNTERS: Dict[str, Dict[str, Any]] = {
+    "raiders": {"text": "🏴‍☠️ Raiders spot you! You gun the engine and escape, but not without some bike damage.",
+                "effects": {"bike": [5, 15]}},
+    "radiation": {"text": "☢️ You ride through a radiation pocket. You feel sick but push through.",
+                  "effects": {"health": [5, 10]}},
+    # Scenery only, as they always were
+    "dust_storm": {"text": "🌪️ A dust storm hits! Visibility drops to zero, but you navigate by instinct."},
+    "wolves": {"text": "🐺 A pack of mutant wolves howls in the distance. You rev the engine to scare them off."},
+    "pothole": {"text": "⚡ Your bike hits a pothole hard. The suspension takes a beating."},
+}
+DEFAULT_ENCOUNTER_TABLES: Dict[str, Dict[str, Any]] = {
+    DEFAULT_TABLE: {"chance": 0.3, "weights": {encounter_id: 1 for encounter_id in DEFAULT_ENCOUNTERS}},
+}
+
+
+@dataclass(frozen=True)
+class Encounter:
+    text: str
+    effects: Tuple[Tuple[str, int, int], ...] = ()  # (stat, least, most) lost, in the order they apply
+    name: str = ""  # Its id in the world file
+
+
+class AliasTable:
+    """Weighted sampling of 0..n-1 in constant time: pick a column uniformly, then
+    either keep it or take its alias, each column holding exactly 1/n of the mass"""
+
+    __slots__ = ("size", "keep", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        if not weights or min(weights) < 0 or sum(weights) <= 0:
+            raise ValueError("weights must be non-negative with a positive total")
+        self.size = len(weights)
+        total = sum(weights)
+        scaled = [weight * self.size / total for weight in weights]
+        self.keep = [1.0] * self.size
+        self.alias = list(range(self.size))
+        small = [index for index, weight in enumerate(scaled) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.keep[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding, and keeps its whole column
+
+    def sample(self, rng: random.Random) -> int:
+        column = rng.random() * self.size
+        index = int(column)
+        return index if column - index < self.keep[index] else self.alias[index]
+
+
+class EncounterTable:
+    """One region's encounters: `chance` of one per arrival, then a weighted pick"""
+
+    __slots__ = ("chance", "encounters", "probabilities", "picker")
+
+    def __init__(self, chance: float, encounters: List[Encounter], weights: List[float]):
+        self.chance = chance
+        self.encounters = encounters
+        self.picker = AliasTable(weights)
+        self.probabilities = [weight / sum(weights) for weight in weights]  # Of each encounter, given one happens
+
+    def pick(self, rng: random.Random) -> Encounter:
+        return self.encounters[self.picker.sample(rng)]
+
+
+def compile_encounters(encounters: Mapping[str, Dict[str, Any]],
+                       tables: Mapping[str, Dict[str, Any]]) -> Dict[str, EncounterTable]:
+    """Check and compile the encounter data of a world file"""
+    parsed = {}
+    for encounter_id, data in encounters.items():
+        text = data.get("text")
+        if not isinstance(text, str) or not text:
+            raise ValueError(f"encounter '{encounter_id}' needs some text")
+        effects = []
+        for stat, (least, most) in data.get("effects", {}).items():
+            if stat not in EFFECTS or not 0 <= least <= most:
+                raise ValueError(f"encounter '{encounter_id}' has a bad effect: {stat} {least}-{most}")
+            effects.append((stat, least, most))
+        parsed[encounter_id] = Encounter(text, tuple(effects), encounter_id)
+
+    compiled = {}
+    for name, table in tables.items():
+        chance = table.get("chance", 0.3)
+        if not 0 <= chance <= 1:
+            raise ValueError(f"encounter table '{name}' has a chance outside 0-1: {chance}")
+        if not isinstance(table.get("weights"), dict):
+            raise ValueError(f"encounter table '{name}' needs weights")
+        unknown = set(table["weights"]) - set(parsed)
+        if unknown:
+            raise ValueError(f"encounter table '{name}' uses unknown encounters: {', '.join(sorted(unknown))}")
+        weighted = [(encounter_id, weight) for encounter_id, weight in table["weights"].items() if weight > 0]
+        compiled[name] = EncounterTable(chance, [parsed[encounter_id] for encounter_id, _ in weighted],
+                                        [weight for _, weight in weighted])
+    return compiled
+
+
+def encounter_data(data: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """A world file's (encounters, encounter_tables), or the defaults for worlds that predate them"""
+    if "encounter_tables" not in data:
+        return DEFAULT_ENCOUNTERS, DEFAULT_ENCOUNTER_TABLES
+    return data.get("encounters", {}), data["encounter_tables"]
@@ -0,0 +1,198 @@
+"""
+Wasteland Rider - Game Events
+What a command did, as data. Handlers report every outcome as one of these
+typed events; narration.py turns them into the game's text for players, and
+bots and the JSON-lines API (api.py) read them as they are, so nothing has to
+format prose only for a client to parse it back out.
+Events are NamedTuples: a handler makes several per command, and a tuple is
+the cheapest immutable record Python builds.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+
+class Moved(NamedTuple):
+    direction: str
+    origin: str
+    destination: str
+    miles: int = 0  # Added to miles traveled; 0 unless both ends have coordinates
+
+
+class LocationSeen(NamedTuple):
+    """On arrival, 'look' and loading a game"""
+    location: str
+    exits: Tuple[str, ...]
+    items: Tuple[str, ...]
+    dangerous: bool
+    first_visit: bool  # The first visit to a location without coordinates adds ~50 miles traveled
+
+
+class NotEnoughFuel(NamedTuple):
+    direction: str
+    needed: int
+    fuel: int
+
+
+# Rider stat changes. `amount` is what actually changed (after clamping to 0-100);
+# `cause` is ride, terrain, refuel, repair, use, rest, encounter or event (a timed event)
+class FuelChanged(NamedTuple):
+    amount: int
+    fuel: int
+    cause: str
+
+
+class BikeChanged(NamedTuple):
+    amount: int
+    condition: int
+    cause: str
+
+
+class HealthChanged(NamedTuple):
+    amount: int
+    health: int
+    cause: str
+
+
+class Encounter(NamedTuple):
+    """Stat changes caused by the encounter follow it"""
+    encounter: str
+    text: str
+
+
+class TimedEventFired(NamedTuple):
+    """Weather or a patrol caught the rider; stat changes follow"""
+    event: str
+    kind: str
+    text: str
+
+
+class ItemRespawned(NamedTuple):
+    """Reported wherever the rider is; the text is only shown to a rider standing there"""
+    event: str
+    location: str
+    item: str
+    text: str
+
+
+class ItemTaken(NamedTuple):
+    item: str
+
+
+class ItemDropped(NamedTuple):
+    item: str
+
+
+class ItemUsed(NamedTuple):
+    """`verb` is use, refuel or repair; its stat changes follow"""
+    item: str
+    verb: str
+    consumed: bool
+
+
+class Rested(NamedTuple):
+    ticks: int
+
+
+class CommandFailed(NamedTuple):
+    """A command that changed nothing. `subject` is the item or location id the reason is
+    about, or the name as typed when nothing matched it - see narration.FAILURES"""
+    verb: str
+    reason: str
+    subject: str = ""
+
+
+class UnknownCommand(NamedTuple):
+    command: str
+    reply: int  # Which of narration.UNKNOWN_REPLIES the wasteland answers with
+
+
+class Won(NamedTuple):
+    miles: int
+    days: int
+
+
+class GameOver(NamedTuple):
+    cause: str  # fuel or bike
+    miles: int
+    days: int
+
+
+class Relocated(NamedTuple):
+    """A hot reload removed the rider's location"""
+    location: str
+
+
+class ItemExamined(NamedTuple):
+    item: str
+
+
+class InventoryListed(NamedTuple):
+    counts: Tuple[Tuple[str, int], ...]  # (item id, count), in the order they were picked up
+
+
+class StatusReported(NamedTuple):
+    location: str
+    miles: int
+    days: int
+    health: int
+    fuel: int
+    bike: int
+    goal_miles: Optional[int] = None  # As the crow flies to Los Angeles, when both are on the map
+
+
+class NearbyListed(NamedTuple):
+    """The places closest to the rider on the map, nearest first"""
+    location: str
+    places: Tuple[Tuple[str, int, str], ...]  # (location id, miles, compass direction)
+    radius: int = 0  # How far was asked for; 0 for the nearest few
+
+
+class RoutePlanned(NamedTuple):
+    destination: str
+    path: Tuple[str, ...]
+    directions: Tuple[str, ...]
+    fuel_needed: int
+    fuel_available: int
+    rough_segments: int
+    max_bike_damage: int
+    dangerous_stops: int
+    notes: Tuple[str, ...]
+    fuel_ok: bool
+    bike_ok: bool
+
+
+class HelpShown(NamedTuple):
+    pass
+
+
+class GameSaved(NamedTuple):
+    slot: str
+
+
+class GameLoaded(NamedTuple):
+    slot: str
+
+
+class MetricsReported(NamedTuple):
+    pass
+
+
+Event = Union[Moved, LocationSeen, NotEnoughFuel, FuelChanged, BikeChanged, HealthChanged, Encounter,
+              TimedEventFired, ItemRespawned, ItemTaken, ItemDropped, ItemUsed, Rested, CommandFailed,
+              UnknownCommand, Won, GameOver, Relocated, ItemExamined, InventoryListed, StatusReported,
+              NearbyListed, RoutePlanned, HelpShown, GameSaved, GameLoaded, MetricsReported]
+
+
+# Each kind of event's fields by name, for clients of the API's compact form
+SCHEMA: Dict[str, Tuple[str, ...]] = {kind.__name__: kind._fields for kind in Event.__args__}
+
+
+def event_record(event: Event) -> Dict[str, Any]:
+    """An event as a JSON-ready dict: {"event": "Moved", "direction": "west", ...}"""
+    return {"event": type(event).__name__, **event._asdict()}
+
+
+def compact_record(event: Event) -> Tuple[Any, ...]:
+    """An event as a JSON-ready array, its fields in SCHEMA order: ["Moved", "west", ...].
+    Half the bytes of a record, and much quicker to encode and parse."""
+    return (type(event).__name__,) + event
@@ -5,14 +5,35 @@ Navigate the dangerous wasteland from Washington DC to Los Angeles
 on your trusty dual-sport motorcycle
 """
 
+import gc
+import hashlib
 import json
 import os
 import pickle
 import random
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import sys
+import time
+from array import array
+from typing import (Any, Callable, Collection, Container, Dict, FrozenSet, Iterable, Iterator, List, Mapping,
+                    Optional, Sequence, Set, Tuple, Union)
+from dataclasses import dataclass, fields, replace
 from enum import Enum
 
+import saves
+import worldpack
+from metrics import Metrics
+from output import NULL_SINK, BufferedSink, OutputSink
+from clock import TICKS_PER_COMMAND, TICKS_PER_DAY, Scheduler, TimedEvent, compile_timed_events
+from compact import CompactWorld
+from encounters import DEFAULT_TABLE, EncounterTable, compile_encounters, encounter_data
+from events import (BikeChanged, CommandFailed, Encounter, Event, FuelChanged, GameLoaded, GameOver, GameSaved,
+                    HealthChanged, HelpShown, InventoryListed, ItemDropped, ItemExamined, ItemRespawned, ItemTaken,
+                    ItemUsed, LocationSeen, MetricsReported, Moved, NearbyListed, NotEnoughFuel, Relocated, Rested,
+                    RoutePlanned, StatusReported, TimedEventFired, UnknownCommand, Won)
+from geo import SpatialIndex, compass, great_circle_miles
+from narration import UNKNOWN_REPLIES, narrate, status_brief
+from routes import MAX_TERRAIN_DAMAGE, ROUGH_TERRAIN_COST, Route, RoutePlanner
+
 
 class GameState(Enum):
     PLAYING = "playing"
@@ -20,6 +41,17 @@ class GameState(Enum):
     WON = "won"
 
 
+def slotted(cls):
+    """Rebuild a dataclass with __slots__ - what dataclass(slots=True) does on Python 3.10+.
+    Large worlds hold one of these per location/item, so dropping __dict__ adds up."""
+    names = tuple(field.name for field in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@slotted
 @dataclass
 class Item:
     name: str
@@ -27,16 +59,97 @@ class Item:
     takeable: bool = True
     useable: bool = False
     use_message: str = ""
-    aliases: List[str] = None
+    aliases: Tuple[str, ...] = None
     fuel_value: int = 0  # For fuel items
     food_value: int = 0  # For food items
     repair_value: int = 0  # For repair items
     
     def __post_init__(self):
-        if self.aliases is None:
-            self.aliases = []
+        self.aliases = tuple(self.aliases or ())
+
+
+class ItemNameIndex:
+    """Lowercased id/alias -> item ids, plus a trigram index over item names.
+    Answers 'which items does this name match' without scanning every item."""
+
+    GRAM = 3  # Names are indexed by every substring of this length
+    CACHE_SIZE = 4096  # Remembered query results, so typed junk can't grow it forever
+
+    def __init__(self, items: Optional[Dict[str, Item]] = None):
+        self.exact: Dict[str, Set[str]] = {}
+        self.grams: Dict[str, Set[str]] = {}
+        self.names: Dict[str, str] = {}
+        self.keys: Dict[str, FrozenSet[str]] = {}
+        self._cache: Dict[str, FrozenSet[str]] = {}
+        for item_id, item in (items or {}).items():
+            self.add(item_id, item)
+
+    def add(self, item_id: str, item: Item):
+        if item_id in self.names:
+            self.discard(item_id)
+        name = item.name.lower()
+        self.names[item_id] = name
+        self.keys[item_id] = frozenset({item_id.lower()} | {alias.lower() for alias in item.aliases})
+        for key in self.keys[item_id]:
+            self.exact.setdefault(key, set()).add(item_id)
+        for gram in self._grams(name):
+            self.grams.setdefault(gram, set()).add(item_id)
+        self._cache.clear()
+
+    def discard(self, item_id: str):
+        name = self.names.pop(item_id, None)
+        if name is None:
+            return
+        for index, keys in ((self.exact, self.keys.pop(item_id)), (self.grams, self._grams(name))):
+            for key in keys:
+                index[key].discard(item_id)
+                if not index[key]:
+                    del index[key]
+        self._cache.clear()
+
+    def _grams(self, text: str) -> Set[str]:
+        return {text[start:start + self.GRAM] for start in range(len(text) - self.GRAM + 1)}
+
+    def matches(self, name: str) -> FrozenSet[str]:
+        """All item ids whose name contains `name` or whose id/alias equals it.
+        `name` must be lowercased and at least GRAM characters long."""
+        cached = self._cache.get(name)
+        if cached is not None:
+            return cached
+
+        postings = sorted((self.grams.get(name[start:start + self.GRAM], set())
+                           for start in range(len(name) - self.GRAM + 1)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        found = {item_id for item_id in candidates if name in self.names[item_id]}
+        found.update(self.exact.get(name, ()))
 
+        result = frozenset(found)
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.clear()
+        self._cache[name] = result
+        return result
 
+    def first_match(self, name: str, item_list: Iterable[str]) -> Optional[str]:
+        """The first item in `item_list` that a lowercased `name` refers to"""
+        if not name:
+            return next(iter(item_list), None)
+        if len(name) < self.GRAM:
+            # Too short for trigrams; checking the listed items' names is just as cheap
+            exact = self.exact.get(name, ())
+            names = self.names
+            for item_id in item_list:
+                if item_id in exact or name in names[item_id]:
+                    return item_id
+            return None
+        matches = self.matches(name)
+        if matches:
+            for item_id in item_list:
+                if item_id in matches:
+                    return item_id
+        return None
+
+
+@slotted
 @dataclass
 class Location:
     name: str
@@ -46,30 +159,120 @@ class Location:
     visited: bool = False
     dangerous: bool = False
     fuel_cost: int = 1  # Fuel cost to leave this location
+    encounters: Optional[str] = None  # Encounter table; dangerous locations default to DEFAULT_TABLE
+    coordinates: Optional[Tuple[float, float]] = None  # (latitude, longitude) in degrees, if it's on the map
     
     def __post_init__(self):
         if not hasattr(self, 'items'):
             self.items = []
+        if self.coordinates is not None:
+            latitude, longitude = self.coordinates  # JSON gives a list
+            self.coordinates = (latitude, longitude)
+
+
+class Inventory:
+    """The rider's pack as a multiset: a count per item id, kept in the order items
+    were first picked up. Iterating yields every unit, like the list it replaced."""
+
+    __slots__ = ('counts', 'order', '_stamp', '_size')
+
+    def __init__(self, item_ids: Union[Iterable[str], Mapping[str, int]] = ()):
+        self.counts: Dict[str, int] = {}  # Insertion ordered - the display order
+        self.order: Dict[str, int] = {}  # Pickup stamp per held id, for first-match lookups
+        self._stamp = 0
+        self._size = 0
+        # Old saves store a list of ids, newer ones {id: count}
+        for item_id, count in (item_ids.items() if isinstance(item_ids, Mapping) else ((i, 1) for i in item_ids)):
+            self.add(item_id, count)
+
+    def add(self, item_id: str, count: int = 1):
+        if item_id in self.counts:
+            self.counts[item_id] += count
+        else:
+            self.counts[item_id] = count
+            self.order[item_id] = self._stamp
+            self._stamp += 1
+        self._size += count
+
+    def remove(self, item_id: str) -> bool:
+        """Take one unit out; False if there is none"""
+        count = self.counts.get(item_id)
+        if count is None:
+            return False
+        if count == 1:
+            del self.counts[item_id]
+            del self.order[item_id]
+        else:
+            self.counts[item_id] = count - 1
+        self._size -= 1
+        return True
+
+    def extend(self, item_ids: Any):
+        for item_id in item_ids:
+            self.add(item_id)
+
+    def count(self, item_id: str) -> int:
+        return self.counts.get(item_id, 0)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self.counts
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for item_id, count in self.counts.items():
+            for _ in range(count):
+                yield item_id
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Inventory) and self.counts == other.counts
+
+    def __repr__(self) -> str:
+        return f"Inventory({self.counts!r})"
+
+    def first_match(self, index: ItemNameIndex, name: str,
+                    scan: Callable[[Iterable[str]], Iterable[str]] = iter) -> Optional[str]:
+        """The earliest picked-up item a lowercased `name` refers to. Uses the world's
+        name index, so the cost follows the number of matches or of distinct items held,
+        whichever is smaller - never the number of units. Every item id looked at goes
+        through `scan`, so metrics can count them."""
+        if len(name) < index.GRAM:
+            return index.first_match(name, scan(self.counts))
+        matches = index.matches(name)
+        if len(matches) < len(self.counts):
+            order = self.order
+            held = [item_id for item_id in scan(matches) if item_id in order]
+            return min(held, key=order.__getitem__) if held else None
+        return next((item_id for item_id in scan(self.counts) if item_id in matches), None)
+
+    def state(self) -> Dict[str, int]:
+        """For saves: {id: count} in display order"""
+        return dict(self.counts)
 
 
 class Rider:
+    __slots__ = ('inventory', 'current_location', 'health', 'fuel', 'bike_condition',
+                 'miles_traveled', 'ticks')
+    
     def __init__(self):
-        self.inventory: List[str] = ["toolkit", "water_bottle", "jerky"]
+        self.inventory = Inventory(["toolkit", "water_bottle", "jerky"])
         self.current_location: str = "dc_ruins"
         self.health: int = 100
         self.fuel: int = 50
         self.bike_condition: int = 100
         self.miles_traveled: int = 0
-        self.days_survived: int = 0
+        self.ticks: int = 0  # Game time; see clock.py
+
+    @property
+    def days_survived(self) -> int:
+        return self.ticks // TICKS_PER_DAY
     
     def add_item(self, item_name: str):
-        self.inventory.append(item_name)
+        self.inventory.add(item_name)
     
     def remove_item(self, item_name: str):
-        if item_name in self.inventory:
-            self.inventory.remove(item_name)
-            return True
-        return False
+        return self.inventory.remove(item_name)
     
     def has_item(self, item_name: str) -> bool:
         return item_name in self.inventory
@@ -87,32 +290,445 @@ class Rider:
         self.bike_condition = max(0, self.bike_condition - amount)
 
 
+WORLD_FILE = os.path.join(os.path.dirname(__file__), 'wasteland.json')
+GOAL_LOCATION = 'los_angeles'
+NEARBY_PLACES = 5  # How many places 'nearby' lists
+
+# Compiled world snapshots are only reused by a game with the same layout; bump on format changes
+WORLD_SCHEMA_VERSION = 3
+LOCATION_FIELDS = tuple(field.name for field in fields(Location))
+ITEM_FIELDS = tuple(field.name for field in fields(Item))
+
+
+def freeze_location(location: Location) -> Location:
+    """Prepare a location for sharing between engines.
+    One shared string per id, however many exits, item lists and packs mention it.
+    Tuples make an accidental in-place edit of the shared template fail loudly."""
+    intern = sys.intern
+    location.items = tuple(intern(item_id) for item_id in location.items)
+    location.exits = {intern(direction): intern(target) for direction, target in location.exits.items()}
+    return location
+
+
+def check_timed_events(events: Mapping[str, TimedEvent], locations: Container[str], items: Container[str]):
+    for event_id, event in events.items():
+        if event.kind not in TIMED_EVENTS:
+            raise ValueError(f"timed event '{event_id}' is of unknown kind '{event.kind}'")
+        unknown = [location_id for location_id in event.locations if location_id not in locations]
+        if unknown or (event.item is not None and event.item not in items):
+            raise ValueError(f"timed event '{event_id}' names something not in this world: "
+                             f"{', '.join(unknown) or event.item}")
+
+
+class _Patched(Container[str]):
+    """Membership in a table as it will be once a patch is applied"""
+
+    def __init__(self, table: Container[str], added: Container[str], removed: Container[str]):
+        self.table, self.added, self.removed = table, added, removed
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.added or (key in self.table and key not in self.removed)
+
+
+def saved_ticks(rider_data: Mapping[str, Any]) -> int:
+    """The clock of a saved rider; saves from before ticks counted fractional days"""
+    if 'ticks' in rider_data:
+        return rider_data['ticks']
+    return round(rider_data['days_survived'] * TICKS_PER_DAY)
+
+
+class LocationNameIndex:
+    """Trigram index over location names, keeping world order, plus each id as it reads
+    with spaces for underscores. Finds the first location a name refers to by checking
+    only the ones that share the name's rarest trigram."""
+
+    GRAM = ItemNameIndex.GRAM
+
+    def __init__(self, locations: Mapping[str, Location]):
+        gram = self.GRAM
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.exact: Dict[str, int] = {}
+        self.grams: Dict[str, array] = {}  # Location numbers, ascending
+        for number, (location_id, location) in enumerate(locations.items()):
+            name = location.name.lower()
+            self.ids.append(location_id)
+            self.names.append(name)
+            self.exact.setdefault(location_id.replace('_', ' '), number)
+            for key in {name[start:start + gram] for start in range(len(name) - gram + 1)}:
+                postings = self.grams.get(key)
+                if postings is None:
+                    postings = self.grams[key] = array('i')
+                postings.append(number)
+
+    def first_match(self, name: str) -> Optional[str]:
+        """The earliest location whose name contains a lowercased `name`, or whose id it spells"""
+        exact = self.exact.get(name, len(self.ids))
+        if len(name) < self.GRAM:
+            candidates: Iterable[int] = range(exact)  # Too short for trigrams; stops at the first match
+        else:
+            postings = [self.grams.get(name[start:start + self.GRAM]) for start in range(len(name) - self.GRAM + 1)]
+            candidates = () if None in postings else min(postings, key=len)
+        names = self.names
+        for number in candidates:
+            if number >= exact:
+                break
+            if name in names[number]:
+                return self.ids[number]
+        return self.ids[exact] if exact < len(self.ids) else None
+
+
+class World:
+    """Static world data, parsed once and shared by every engine that plays it.
+    Never modified during play - each engine records its changes in a WorldState."""
+
+    TEXT_CACHE_SIZE = 4096  # Rendered location/item text kept, so huge worlds can't grow it forever
+
+    def __init__(self, locations: Mapping[str, Location], items: Mapping[str, Item], frozen: bool = False,
+                 encounters: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None,
+                 timed_events: Optional[Dict[str, Any]] = None):
+        # Packed tables build frozen objects as they load them; plain dicts are frozen here
+        if isinstance(locations, dict) and not frozen:
+            locations = {sys.intern(location_id): freeze_location(location)
+                         for location_id, location in locations.items()}
+        if isinstance(items, dict):
+            items = {sys.intern(item_id): item for item_id, item in items.items()}
+        self.locations = locations
+        self.items = items
+        # (encounters, encounter_tables) as in the world file, and the tables compiled for sampling
+        self.encounter_data = encounters or encounter_data({})
+        self.encounter_tables: Dict[str, EncounterTable] = compile_encounters(*self.encounter_data)
+        # The timed_events section as in the world file, and compiled for the engines' clocks
+        self.timed_event_data = timed_events or {}
+        self.timed_events: Dict[str, TimedEvent] = compile_timed_events(self.timed_event_data)
+        check_timed_events(self.timed_events, locations, items)
+        self._item_index: Optional[ItemNameIndex] = None
+        self._compact: Optional[CompactWorld] = None
+        self._routes: Optional[RoutePlanner] = None
+        self._geo: Optional[SpatialIndex] = None
+        self._location_index: Optional[LocationNameIndex] = None
+        self._text: Dict[Any, Any] = {}
+
+    @property
+    def item_index(self) -> ItemNameIndex:
+        """Name/alias lookups, computed once per world instead of per command"""
+        if self._item_index is None:
+            self._item_index = ItemNameIndex(self.items)
+        return self._item_index
+
+    @property
+    def location_index(self) -> LocationNameIndex:
+        """Place-name lookups for 'route', built on the first one"""
+        if self._location_index is None:
+            self._location_index = LocationNameIndex(self.locations)
+        return self._location_index
+
+    @property
+    def compact(self) -> CompactWorld:
+        """Integer-indexed, array-backed tables for route planning and analysis"""
+        if self._compact is None:
+            self._compact = CompactWorld.from_world(self)
+        return self._compact
+
+    @property
+    def routes(self) -> RoutePlanner:
+        """Route planner whose cached shortest-path trees live and die with this world"""
+        if self._routes is None:
+            self._routes = RoutePlanner(self.compact)
+        return self._routes
+
+    @property
+    def geo(self) -> SpatialIndex:
+        """Grid index over the locations' coordinates, for 'nearby' questions"""
+        if self._geo is None:
+            self._geo = SpatialIndex.from_compact(self.compact)
+        return self._geo
+
+    def encounter_table(self, location: Location) -> Optional[EncounterTable]:
+        if location.encounters is not None:
+            table = self.encounter_tables.get(location.encounters)
+            if table is None:
+                raise ValueError(f"location '{location.name}' uses unknown encounter table '{location.encounters}'")
+            return table
+        return self.encounter_tables.get(DEFAULT_TABLE) if location.dangerous else None
+
+    def patch(self, locations: Mapping[str, Location], removed_locations: Collection[str] = (),
+              items: Optional[Mapping[str, Item]] = None, removed_items: Collection[str] = (),
+              encounters: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None,
+              timed_events: Optional[Dict[str, Any]] = None):
+        """Hot reload: replace, add and remove locations and items in place, for every engine
+        sharing this world at once. Everything that can fail is checked before anything
+        changes, and derived tables are patched rather than rebuilt where the edit allows."""
+        if not isinstance(self.locations, dict):
+            raise ValueError("packed worlds can't be patched; repack and restart instead")
+        removed_locations, removed_items = set(removed_locations), set(removed_items)
+        locations = {sys.intern(location_id): freeze_location(location) for location_id, location in locations.items()}
+        items = {sys.intern(item_id): item for item_id, item in (items or {}).items()}
+        encounter_tables = compile_encounters(*encounters) if encounters is not None else self.encounter_tables
+        events = compile_timed_events(timed_events) if timed_events is not None else self.timed_events
+        check_timed_events(events, _Patched(self.locations, locations, removed_locations),
+                           _Patched(self.items, items, removed_items))
+        for location_id, location in locations.items():
+            table = location.encounters
+            if table is not None and table not in encounter_tables:
+                raise ValueError(f"location '{location_id}' uses unknown encounter table '{table}'")
+
+        # Location and item numbers are positional: additions go on the end, removals renumber
+        compact = self._compact if not (removed_locations or removed_items) else None
+        old_exits = {}
+        if compact is not None:
+            old_exits = {location_id: compact.adjacency[compact.location_numbers[location_id]]
+                         for location_id in locations if location_id in compact.location_numbers}
+
+        for location_id in removed_locations:
+            self.locations.pop(location_id, None)
+        self.locations.update(locations)
+        for item_id in removed_items:
+            self.items.pop(item_id, None)
+        self.items.update(items)
+        if encounters is not None:
+            self.encounter_data, self.encounter_tables = encounters, encounter_tables
+        if timed_events is not None:
+            self.timed_event_data, self.timed_events = timed_events, events
+
+        if self._item_index is not None:
+            for item_id in removed_items:
+                self._item_index.discard(item_id)
+            for item_id, item in items.items():
+                self._item_index.add(item_id, item)
+        if compact is None:
+            self._compact = self._routes = None  # Rebuilt when next needed
+        elif locations or items:
+            compact.patch(locations, items)
+            if self._routes is not None:
+                self._routes.patch({compact.location_numbers[location_id]: old_exits.get(location_id, ())
+                                    for location_id in locations})
+        if locations or removed_locations:
+            self._geo = self._location_index = None  # Rebuilt when next needed
+        self._text.clear()
+
+    def _cached_text(self, key: Any, render: Callable[[], Any]) -> Any:
+        text = self._text.get(key)
+        if text is None:
+            if len(self._text) >= self.TEXT_CACHE_SIZE:
+                self._text.clear()
+            text = self._text[key] = render()
+        return text
+
+    def location_text(self, location_id: str) -> Tuple[str, str]:
+        """A location's fixed text: (name, description and routes; danger warning)"""
+        def render():
+            location = self.locations[location_id]
+            head = f"\n{'=' * 60}\n🏍️  {location.name}\n{'-' * len(location.name)}\n{location.description}\n"
+            if location.exits:
+                head += f"\n🛣️  Routes: {', '.join(location.exits.keys())}\n"
+            return head, "⚠️  DANGER: This area looks hazardous!\n" if location.dangerous else ""
+        return self._cached_text(location_id, render)
+
+    def spotted_text(self, item_ids: Tuple[str, ...]) -> str:
+        """The 'You spot' line for a set of items lying on the ground"""
+        return self._cached_text(item_ids, lambda: f"\n🎒 You spot: {', '.join(self.items[item].name for item in item_ids)}\n")
+
+    def pack_text(self, item_id: str, count: int = 1) -> str:
+        """An item's lines in the inventory listing"""
+        def render():
+            item = self.items[item_id]
+            text = f"  • {item.name}{f' ×{count}' if count > 1 else ''}\n"
+            values = []
+            if item.fuel_value > 0:
+                values.append(f"⛽{item.fuel_value}")
+            if item.food_value > 0:
+                values.append(f"❤️{item.food_value}")
+            if item.repair_value > 0:
+                values.append(f"🔧{item.repair_value}")
+            if values:
+                text += f"    ({' '.join(values)})\n"
+            return text
+        return self._cached_text(('pack', item_id, count), render)
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "World":
+        return cls(
+            {location_id: Location(**location_data)
+             for location_id, location_data in data.get('locations', {}).items()},
+            {item_id: Item(**item_data) for item_id, item_data in data.get('items', {}).items()},
+            encounters=encounter_data(data),
+            timed_events=data.get('timed_events'),
+        )
+
+    @classmethod
+    def from_source(cls, source: bytes, path: str) -> "World":
+        """Build a world from JSON text, going through its compiled snapshot when that matches.
+        Snapshots live in __pycache__ beside the world file, like .pyc files beside modules."""
+        key = (WORLD_SCHEMA_VERSION, LOCATION_FIELDS, ITEM_FIELDS,
+               hashlib.sha256(source).hexdigest())
+        snapshot_path = compiled_world_path(path)
+        try:
+            with open(snapshot_path, 'rb') as f:
+                if pickle.load(f) == key:
+                    # Nothing built here can be a reference cycle; don't let the
+                    # collector rescan the growing heap every few hundred objects
+                    collecting = gc.isenabled()
+                    gc.disable()
+                    try:
+                        return cls.from_compiled(pickle.load(f))
+                    finally:
+                        if collecting:
+                            gc.enable()
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            pass  # Missing, stale or unreadable - rebuild it below
+
+        world = cls.from_data(json.loads(source))
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            saves.write_atomic(snapshot_path, pickle.dumps(key, protocol=4) +
+                               pickle.dumps(world.compiled(), protocol=4))
+        except OSError:
+            pass  # Read-only install; next launch just parses the JSON again
+        return world
+
+    def compiled(self) -> Tuple[Dict[str, tuple], Dict[str, tuple], Tuple[Dict[str, Any], Dict[str, Any]],
+                                Dict[str, Any]]:
+        """Field values only, so snapshots don't depend on how the classes are imported"""
+        return ({location_id: tuple(getattr(location, name) for name in LOCATION_FIELDS)
+                 for location_id, location in self.locations.items()},
+                {item_id: tuple(getattr(item, name) for name in ITEM_FIELDS)
+                 for item_id, item in self.items.items()},
+                self.encounter_data, self.timed_event_data)
+
+    @classmethod
+    def from_compiled(cls, compiled: Tuple[Dict[str, tuple], Dict[str, tuple],
+                                           Tuple[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> "World":
+        locations, items, encounters, timed_events = compiled
+        # Snapshots are taken from frozen locations, and pickle keeps their shared strings shared
+        return cls({location_id: Location(*values) for location_id, values in locations.items()},
+                   {item_id: Item(*values) for item_id, values in items.items()}, frozen=True,
+                   encounters=encounters, timed_events=timed_events)
+
+    @classmethod
+    def from_pack(cls, path: str, resident: int = worldpack.DEFAULT_RESIDENT) -> "World":
+        """Open a packed world; locations and items are decoded on first access"""
+        pack = worldpack.WorldPack(path)
+        return cls(
+            pack.table('locations', lambda data: freeze_location(Location(**data)), resident),
+            pack.table('items', lambda data: Item(**data), resident),
+            encounters=encounter_data(pack.directory),
+            timed_events=pack.directory.get('timed_events'),
+        )
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "World":
+        """Parse a world file (JSON or packed), reusing the last result while the file is unchanged"""
+        path = path or WORLD_FILE
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+            if key not in _worlds:
+                if f.read(len(worldpack.PACK_MAGIC)) == worldpack.PACK_MAGIC:
+                    world = cls.from_pack(path)
+                else:
+                    f.seek(0)
+                    world = cls.from_source(f.read(), path)
+                _worlds.clear()
+                _worlds[key] = world
+        return _worlds[key]
+
+
+_worlds: Dict[Any, World] = {}
+
+
+def compiled_world_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, '__pycache__', f'{name}.world.pickle')
+
+
+class WorldState(Mapping[str, Location]):
+    """One playthrough's view of a shared World. Reads fall through to the
+    template; a location is copied only when the session first changes it."""
+
+    def __init__(self, world: World):
+        self.world = world
+        self.changed: Dict[str, Location] = {}
+
+    def __getitem__(self, location_id: str) -> Location:
+        location = self.changed.get(location_id)
+        if location is None:
+            return self.world.locations[location_id]
+        return location
+
+    def __iter__(self):
+        return iter(self.world.locations)
+
+    def __len__(self) -> int:
+        return len(self.world.locations)
+
+    def edit(self, location_id: str) -> Location:
+        """This session's own copy of a location, safe to modify"""
+        location = self.changed.get(location_id)
+        if location is None:
+            location = replace(self.world.locations[location_id],
+                               items=list(self.world.locations[location_id].items))
+            self.changed[location_id] = location
+        return location
+
+    def restore(self, location_id: str, visited: bool, items: List[str]):
+        """Apply saved per-session state, copying only if it differs from the template"""
+        template = self.world.locations.get(location_id)
+        if template is None:
+            return
+        if template.visited != visited or list(template.items) != items:
+            location = self.edit(location_id)
+            location.visited = visited
+            location.items = list(items)
+
+
 class WastelandEngine:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, headless: bool = False,
+                 world: Optional[World] = None, output: Optional[OutputSink] = None,
+                 save_backend: Optional[saves.SaveBackend] = None, player: str = saves.DEFAULT_PLAYER,
+                 metrics: Optional[Metrics] = None, record_events: bool = False, operator: bool = False):
         self.rider = Rider()
-        self.locations: Dict[str, Location] = {}
+        self.locations: Mapping[str, Location] = {}
         self.items: Dict[str, Item] = {}
         self.state = GameState.PLAYING
+        # Each engine owns its RNG so seeded runs are reproducible; unseeded engines
+        # still pick a seed of their own, so a journal can replay them
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**63)
+        self.rng = random.Random(self.seed)
+        self.journal = None  # A journal.Journal once attached
+        self.metrics = metrics  # Instrumentation is off unless a Metrics is passed in
+        # Whoever runs the process, not a rider on a server: only they see the metrics command,
+        # whose figures cover every session
+        self.operator = operator
+        self.headless = headless
+        # Servers pass a per-session sink; the console gets one write to stdout per command
+        self.say: OutputSink = NULL_SINK if headless else (output or BufferedSink())
+        # Every command's outcomes as typed events, for bots and the JSON-lines API (see events.py)
+        self.events: Optional[List[Event]] = [] if record_events else None
+        # Save slots go to files in the working directory unless a server shares a store
+        self.save_backend = save_backend or saves.FileSaveBackend()
+        self.player = player
+        self.world = world
         self.load_world_data()
+        self.clock = Scheduler()  # The world's timed events still to come
+        self.clock.start(self.world.timed_events)
         
+    @property
+    def item_index(self) -> ItemNameIndex:
+        return self.world.item_index
+
     def load_world_data(self):
-        """Load world data from JSON file"""
-        world_file = os.path.join(os.path.dirname(__file__), 'wasteland.json')
-        try:
-            with open(world_file, 'r') as f:
-                data = json.load(f)
-                
-            # Load locations
-            for location_id, location_data in data.get('locations', {}).items():
-                self.locations[location_id] = Location(**location_data)
-                
-            # Load items
-            for item_id, item_data in data.get('items', {}).items():
-                self.items[item_id] = Item(**item_data)
-                
-        except FileNotFoundError:
-            print("Wasteland data file not found. Creating default world...")
-            self.create_default_world()
+        """Load world data from JSON file, unless the engine was given a shared World"""
+        if self.world is None:
+            try:
+                self.world = World.load()
+            except FileNotFoundError:
+                self.say("Wasteland data file not found. Creating default world...")
+                self.create_default_world()
+                self.world = World(self.locations, self.items)
+        
+        self.items = self.world.items
+        self.locations = WorldState(self.world)
     
     def create_default_world(self):
         """Create a default post-apocalyptic world if no wasteland.json exists"""
@@ -123,14 +739,16 @@ class WastelandEngine:
                 description="The skeletal remains of the Capitol dome pierce the smoky sky. Your dual-sport motorcycle idles among the rubble-strewn streets. The Potomac River glows with an unnatural green hue to the south. Interstate 66 stretches west toward the wasteland.",
                 exits={"west": "highway_66", "south": "potomac_bridge"},
                 items=["gas_can"],
-                fuel_cost=2
+                fuel_cost=2,
+                coordinates=(38.8977, -77.0365)
             ),
             "highway_66": Location(
                 name="Interstate 66 Wasteland",
                 description="Cracked asphalt stretches endlessly west. Abandoned vehicles rust in the median, their metal skeletons picked clean by scavengers. Your bike's engine echoes across the desolate landscape. A side road leads north to an old truck stop.",
                 exits={"east": "dc_ruins", "west": "shenandoah", "north": "truck_stop"},
                 items=["spare_tire"],
-                fuel_cost=3
+                fuel_cost=3,
+                coordinates=(38.85, -77.45)
             ),
             "truck_stop": Location(
                 name="Abandoned Truck Stop",
@@ -138,7 +756,8 @@ class WastelandEngine:
                 exits={"south": "highway_66"},
                 items=["fuel_siphon", "canned_food", "road_map"],
                 dangerous=True,
-                fuel_cost=1
+                fuel_cost=1,
+                coordinates=(39.05, -77.45)
             ),
             "potomac_bridge": Location(
                 name="Potomac River Bridge",
@@ -146,35 +765,40 @@ class WastelandEngine:
                 exits={"north": "dc_ruins", "west": "virginia_hills"},
                 items=["rad_pills"],
                 dangerous=True,
-                fuel_cost=2
+                fuel_cost=2,
+                coordinates=(38.8, -77.05)
             ),
             "shenandoah": Location(
                 name="Shenandoah Wasteland",
                 description="What once were the beautiful Blue Ridge Mountains are now twisted, blackened peaks. Your dual-sport handles the rough terrain well. A hidden valley to the south might offer shelter.",
                 exits={"east": "highway_66", "south": "hidden_valley", "west": "appalachian_pass"},
                 items=["mountain_gear"],
-                fuel_cost=4
+                fuel_cost=4,
+                coordinates=(38.65, -78.45)
             ),
             "hidden_valley": Location(
                 name="Hidden Valley Settlement",
                 description="Smoke rises from chimneys built into hillsides. Survivors have carved out a life here, trading supplies and information. Your motorcycle draws curious but wary glances.",
                 exits={"north": "shenandoah"},
                 items=["trade_goods", "fuel_barrel", "repair_kit"],
-                fuel_cost=1
+                fuel_cost=1,
+                coordinates=(38.3, -78.5)
             ),
             "virginia_hills": Location(
                 name="Virginia Hills",
                 description="Rolling hills stretch toward the horizon, dotted with the remains of small towns. Your bike climbs steadily westward. The air tastes of ash and distant storms.",
                 exits={"east": "potomac_bridge", "west": "appalachian_pass"},
                 items=["binoculars"],
-                fuel_cost=3
+                fuel_cost=3,
+                coordinates=(37.45, -78.75)
             ),
             "appalachian_pass": Location(
                 name="Appalachian Mountain Pass",
                 description="The highest point for hundreds of miles. From here you can see the long road ahead - thousands of miles of wasteland between you and Los Angeles. Your bike's engine strains against the altitude.",
                 exits={"east": "shenandoah", "south": "virginia_hills", "west": "kentucky_border"},
                 items=["high_octane_fuel"],
-                fuel_cost=5
+                fuel_cost=5,
+                coordinates=(37.95, -79.75)
             ),
             "kentucky_border": Location(
                 name="Kentucky Border Crossing",
@@ -182,14 +806,16 @@ class WastelandEngine:
                 exits={"east": "appalachian_pass", "west": "louisville_ruins"},
                 items=["ammunition"],
                 dangerous=True,
-                fuel_cost=2
+                fuel_cost=2,
+                coordinates=(37.55, -82.3)
             ),
             "louisville_ruins": Location(
                 name="Louisville Ruins",
                 description="The Ohio River flows past the skeletal remains of the city. Your destination of Los Angeles feels impossibly far from here. But your bike is strong, and the road calls westward.",
                 exits={"east": "kentucky_border"},
                 items=["victory_flag"],
-                fuel_cost=1
+                fuel_cost=1,
+                coordinates=(38.2527, -85.7585)
             )
         }
         
@@ -321,123 +947,91 @@ class WastelandEngine:
         }
     
     def get_current_location(self) -> Location:
+        if self.metrics is not None:
+            self.metrics.location_fetches += 1
         return self.locations[self.rider.current_location]
     
     def display_location(self):
         location = self.get_current_location()
+        first_visit = not location.visited
         
-        print("\n" + "="*60)
-        print(f"🏍️  {location.name}")
-        print("-" * len(location.name))
-        print(location.description)
-        
-        if not location.visited:
-            location.visited = True
-            self.rider.miles_traveled += 50  # Each new location is ~50 miles
-        
-        # Show exits
-        if location.exits:
-            print(f"\n🛣️  Routes: {', '.join(location.exits.keys())}")
-        
-        # Show items
-        if location.items:
-            print(f"\n🎒 You spot: {', '.join([self.items[item].name for item in location.items])}")
+        if first_visit:
+            self.locations.edit(self.rider.current_location).visited = True
+            if location.coordinates is None:
+                self.rider.miles_traveled += 50  # Off the map, each new location counts as ~50 miles
         
-        # Show status warnings
-        if location.dangerous:
-            print("⚠️  DANGER: This area looks hazardous!")
-        
-        self.show_status_brief()
+        if self.reporting:
+            self.emit(LocationSeen(self.rider.current_location, tuple(location.exits), tuple(location.items),
+                                   location.dangerous, first_visit))
     
     def show_status_brief(self):
         """Show brief status info"""
-        fuel_bar = "█" * (self.rider.fuel // 10) + "░" * (10 - self.rider.fuel // 10)
-        bike_bar = "█" * (self.rider.bike_condition // 10) + "░" * (10 - self.rider.bike_condition // 10)
-        
-        print(f"\n⛽ Fuel: [{fuel_bar}] {self.rider.fuel}%")
-        print(f"🔧 Bike: [{bike_bar}] {self.rider.bike_condition}%")
-        if self.rider.health < 100:
-            health_bar = "█" * (self.rider.health // 10) + "░" * (10 - self.rider.health // 10)
-            print(f"❤️  Health: [{health_bar}] {self.rider.health}%")
+        if self.say.active:
+            self.say.write(status_brief(self))
+    
+    @property
+    def reporting(self) -> bool:
+        """Whether anyone takes in events; screens that only report skip building them if not"""
+        return self.events is not None or self.say.active
     
-    def process_command(self, command: str) -> bool:
+    def emit(self, event: Event):
+        """Report what a command did: to the event list when one is kept, and as text
+        when the output sink is read - narrated now, while the rider is as it describes"""
+        if self.events is not None:
+            self.events.append(event)
+        if self.say.active:
+            self.say.write(narrate(self, event))
+    
+    def take_events(self) -> List[Event]:
+        """The events since the last call, for an engine made with record_events"""
+        events, self.events = self.events, []
+        return events
+    
+    def process_command(self, command: str, observed: bool = False) -> bool:
         """Process user command and return False if game should quit"""
+        if not observed and (self.journal is not None or self.metrics is not None):
+            return self.observe_command(command)
         command = command.lower().strip()
-        self.rider.days_survived += 0.1  # Each command represents time passing
+        self.advance(TICKS_PER_COMMAND)  # Each command represents time passing
         
         if not command:
             return True
             
         parts = command.split()
-        verb = parts[0]
-        
-        # Movement commands
-        if verb in ['ride', 'go', 'move', 'drive'] and len(parts) > 1:
-            return self.move_rider(parts[1])
-        elif verb in ['north', 'n', 'south', 's', 'east', 'e', 'west', 'w', 'up', 'down']:
-            return self.move_rider(verb)
-        
-        # Item commands
-        elif verb in ['take', 'get', 'pick', 'grab'] and len(parts) > 1:
-            return self.take_item(' '.join(parts[1:]))
-        elif verb in ['drop', 'leave'] and len(parts) > 1:
-            return self.drop_item(' '.join(parts[1:]))
-        elif verb in ['use', 'consume', 'drink', 'eat'] and len(parts) > 1:
-            return self.use_item(' '.join(parts[1:]))
-        
-        # Bike-specific commands
-        elif verb in ['refuel', 'fuel'] and len(parts) > 1:
-            return self.refuel_bike(' '.join(parts[1:]))
-        elif verb in ['repair', 'fix'] and len(parts) > 1:
-            return self.repair_bike_with(' '.join(parts[1:]))
-        elif verb in ['rest', 'sleep', 'camp']:
-            return self.rest()
-        
-        # Information commands
-        elif verb in ['look', 'l']:
-            self.display_location()
-        elif verb in ['inventory', 'i', 'inv', 'pack']:
-            self.show_inventory()
-        elif verb in ['examine', 'x', 'inspect'] and len(parts) > 1:
-            self.examine_item(' '.join(parts[1:]))
-        elif verb in ['status', 'stats', 'condition']:
-            self.show_full_status()
-        
-        # Game commands
-        elif verb in ['help', 'h']:
-            self.show_help()
-        elif verb in ['save']:
-            self.save_game()
-        elif verb in ['load']:
-            self.load_game()
-        elif verb in ['quit', 'q', 'exit']:
-            return False
-        
+        handler = COMMANDS.get(parts[0])
+        argument = ' '.join(parts[1:]) if len(parts) > 1 else ''
+        if handler is not None and (argument or not handler.needs_argument):
+            result = handler.run(self, argument)
+            if handler.returns:
+                return result
         else:
-            responses = [
-                "Your bike's engine idles as you consider that command...",
-                "The wasteland wind carries away your words...",
-                "That doesn't seem possible in this harsh world.",
-                "Your survival instincts suggest trying something else."
-            ]
-            print(random.choice(responses))
-            print("Type 'help' for available commands.")
+            self.emit(UnknownCommand(command, self.rng.randrange(len(UNKNOWN_REPLIES))))
         
         # Check for game over conditions
         if self.rider.fuel <= 0:
-            print("\n💀 Your bike runs out of fuel in the middle of the wasteland...")
-            print("Without transportation, you become another casualty of the apocalypse.")
+            self.emit(GameOver('fuel', self.rider.miles_traveled, self.rider.days_survived))
             self.state = GameState.GAME_OVER
             return False
         
         if self.rider.bike_condition <= 0:
-            print("\n💀 Your motorcycle breaks down beyond repair...")
-            print("Stranded in the wasteland, your journey ends here.")
+            self.emit(GameOver('bike', self.rider.miles_traveled, self.rider.days_survived))
             self.state = GameState.GAME_OVER
             return False
         
         return True
     
+    def observe_command(self, command: str) -> bool:
+        """process_command, journaled and/or timed"""
+        if self.journal is not None:
+            self.journal.record(command)
+        started = time.perf_counter()
+        result = self.process_command(command, observed=True)
+        if self.metrics is not None:
+            self.metrics.observe_command(command, time.perf_counter() - started)
+        if self.journal is not None:
+            self.journal.recorded(self, command)
+        return result
+
     def move_rider(self, direction: str) -> bool:
         # Handle direction aliases
         direction_map = {
@@ -446,70 +1040,115 @@ class WastelandEngine:
         direction = direction_map.get(direction, direction)
         
         location = self.get_current_location()
+        rider = self.rider
         
         if direction in location.exits:
             # Check if bike can make the journey
             fuel_needed = location.fuel_cost
-            if self.rider.fuel < fuel_needed:
-                print(f"⛽ You don't have enough fuel to travel {direction}.")
-                print(f"Need {fuel_needed} fuel, but only have {self.rider.fuel}.")
+            if rider.fuel < fuel_needed:
+                self.emit(NotEnoughFuel(direction, fuel_needed, rider.fuel))
                 return True
             
             # Use fuel and potentially damage bike
-            self.rider.use_fuel(fuel_needed)
+            fuel = rider.fuel
+            rider.use_fuel(fuel_needed)
+            self.emit(FuelChanged(rider.fuel - fuel, rider.fuel, 'ride'))
             
             # Rough terrain damages bike
-            if fuel_needed > 3:
-                damage = random.randint(1, 5)
-                self.rider.damage_bike(damage)
-                print(f"🔧 The rough terrain damages your bike (-{damage} condition)")
+            if fuel_needed > ROUGH_TERRAIN_COST:
+                condition = rider.bike_condition
+                rider.damage_bike(self.rng.randint(1, MAX_TERRAIN_DAMAGE))
+                self.emit(BikeChanged(rider.bike_condition - condition, rider.bike_condition, 'terrain'))
             
             # Move to new location
-            self.rider.current_location = location.exits[direction]
-            print(f"🏍️  You ride {direction}, engine roaring across the wasteland...")
+            origin = rider.current_location
+            rider.current_location = location.exits[direction]
+            destination = self.get_current_location()
+            miles = 0
+            if location.coordinates is not None and destination.coordinates is not None:
+                # Every ride covers some road, however close the stops are on the map
+                miles = max(1, round(great_circle_miles(location.coordinates, destination.coordinates)))
+                rider.miles_traveled += miles
+            self.emit(Moved(direction, origin, rider.current_location, miles))
             
             # Random events in dangerous areas
-            new_location = self.get_current_location()
-            if new_location.dangerous and random.random() < 0.3:
-                self.random_encounter()
+            encounters = self.world.encounter_table(destination)
+            if encounters is not None and self.rng.random() < encounters.chance:
+                self.random_encounter(encounters)
             
             self.display_location()
             
             # Check win condition (reached Los Angeles)
-            if self.rider.current_location == "los_angeles":
-                print("\n🎉 INCREDIBLE! You've made it to Los Angeles!")
-                print("Against all odds, you've crossed the wasteland and reached the City of Angels!")
-                print(f"Miles traveled: {self.rider.miles_traveled}")
-                print(f"Days survived: {int(self.rider.days_survived)}")
+            if rider.current_location == GOAL_LOCATION:
+                self.emit(Won(rider.miles_traveled, rider.days_survived))
                 self.state = GameState.WON
                 return False
         else:
-            print(f"🚫 You can't ride {direction} from here.")
-            print("Check your map and try a different route.")
+            self.emit(CommandFailed('ride', 'no_exit', direction))
         
         return True
     
-    def random_encounter(self):
-        """Handle random encounters in dangerous areas"""
-        encounters = [
-            "🏴‍☠️ Raiders spot you! You gun the engine and escape, but not without some bike damage.",
-            "☢️ You ride through a radiation pocket. You feel sick but push through.",
-            "🌪️ A dust storm hits! Visibility drops to zero, but you navigate by instinct.",
-            "🐺 A pack of mutant wolves howls in the distance. You rev the engine to scare them off.",
-            "⚡ Your bike hits a pothole hard. The suspension takes a beating."
-        ]
-        
-        encounter = random.choice(encounters)
-        print(f"\n{encounter}")
-        
-        # Apply random effects
-        if "damage" in encounter.lower():
-            damage = random.randint(5, 15)
-            self.rider.damage_bike(damage)
-        elif "sick" in encounter.lower():
-            health_loss = random.randint(5, 10)
-            self.rider.health = max(0, self.rider.health - health_loss)
+    def random_encounter(self, encounters: EncounterTable):
+        """Pick an encounter from the location's table and apply its effects"""
+        encounter = encounters.pick(self.rng)
+        self.emit(Encounter(encounter.name, encounter.text))
+        self.apply_effects(encounter.effects, 'encounter')
+
+    def apply_effects(self, effects: Tuple[Tuple[str, int, int], ...], cause: str):
+        """Roll and apply (stat, least, most) losses, reporting each one"""
+        rider = self.rider
+        for stat, least, most in effects:
+            loss = self.rng.randint(least, most)
+            if stat == 'bike':
+                before = rider.bike_condition
+                rider.damage_bike(loss)
+                self.emit(BikeChanged(rider.bike_condition - before, rider.bike_condition, cause))
+            elif stat == 'health':
+                before = rider.health
+                rider.health = max(0, rider.health - loss)
+                self.emit(HealthChanged(rider.health - before, rider.health, cause))
+            else:
+                before = rider.fuel
+                rider.use_fuel(loss)
+                self.emit(FuelChanged(rider.fuel - before, rider.fuel, cause))
     
+    def advance(self, ticks: int):
+        """Move the clock on; only a due event costs more than a glance at the heap"""
+        self.rider.ticks += ticks
+        heap = self.clock.heap
+        if heap and heap[0][0] <= self.rider.ticks:
+            self.run_due_events()
+
+    def run_due_events(self):
+        events = self.world.timed_events
+        for due, event_id, fired in self.clock.pop_due(self.rider.ticks):
+            event = events.get(event_id)
+            if event is None:
+                continue  # Saved with a version of the world that has since dropped it
+            TIMED_EVENTS[event.kind](self, event, fired)
+            if event.every:
+                self.clock.schedule(due + event.every, event_id, fired + 1)
+
+    def weather(self, event: TimedEvent, fired: int):
+        """Evaporation and storms: the effects hit a rider in the event's region (anywhere if it has none)"""
+        if event.locations and self.rider.current_location not in event.locations:
+            return
+        self.emit(TimedEventFired(event.name, event.kind, event.text))
+        self.apply_effects(event.effects, 'event')
+
+    def respawn(self, event: TimedEvent, fired: int):
+        """Put the item back wherever it has been taken from"""
+        for location_id in event.locations:
+            if event.item not in self.locations[location_id].items:
+                self.locations.edit(location_id).items.append(event.item)
+                self.emit(ItemRespawned(event.name, location_id, event.item, event.text))
+
+    def patrol(self, event: TimedEvent, fired: int):
+        """Each firing the patrol moves one stop along its beat, hitting a rider it finds there"""
+        if event.locations and event.locations[fired % len(event.locations)] == self.rider.current_location:
+            self.emit(TimedEventFired(event.name, event.kind, event.text))
+            self.apply_effects(event.effects, 'event')
+
     def refuel_bike(self, item_name: str) -> bool:
         """Refuel bike with fuel items"""
         item_id = self.find_item_by_name(item_name, self.rider.inventory)
@@ -520,13 +1159,12 @@ class WastelandEngine:
                 old_fuel = self.rider.fuel
                 self.rider.add_fuel(item.fuel_value)
                 self.rider.remove_item(item_id)
-                gained = self.rider.fuel - old_fuel
-                print(f"⛽ You add fuel to your tank (+{gained} fuel)")
-                print(f"Current fuel: {self.rider.fuel}%")
+                self.emit(ItemUsed(item_id, 'refuel', True))
+                self.emit(FuelChanged(self.rider.fuel - old_fuel, self.rider.fuel, 'refuel'))
             else:
-                print(f"❌ The {item.name} can't be used as fuel.")
+                self.emit(CommandFailed('refuel', 'not_fuel', item_id))
         else:
-            print(f"❌ You don't have any {item_name}.")
+            self.emit(CommandFailed('refuel', 'not_carried', item_name))
         
         return True
     
@@ -539,39 +1177,41 @@ class WastelandEngine:
             if item.repair_value > 0:
                 old_condition = self.rider.bike_condition
                 self.rider.repair_bike(item.repair_value)
-                if item.name == "Motorcycle Toolkit":
-                    # Toolkit is reusable but less effective each time
-                    print(f"🔧 You perform maintenance with your toolkit.")
-                else:
+                # Toolkit is reusable but less effective each time
+                consumed = item.name != "Motorcycle Toolkit"
+                if consumed:
                     self.rider.remove_item(item_id)
-                    print(f"🔧 You use the {item.name} to repair your bike.")
+                self.emit(ItemUsed(item_id, 'repair', consumed))
                 
                 gained = self.rider.bike_condition - old_condition
-                print(f"Bike condition improved by {gained}% (now {self.rider.bike_condition}%)")
+                self.emit(BikeChanged(gained, self.rider.bike_condition, 'repair'))
             else:
-                print(f"❌ The {item.name} can't be used for repairs.")
+                self.emit(CommandFailed('repair', 'not_repair', item_id))
         else:
-            print(f"❌ You don't have any {item_name}.")
+            self.emit(CommandFailed('repair', 'not_carried', item_name))
         
         return True
     
     def rest(self) -> bool:
         """Rest to recover health but use time and fuel"""
-        print("🏕️ You make camp and rest for the night...")
-        print("The wasteland is quiet except for distant howls and the wind.")
+        self.emit(Rested(TICKS_PER_DAY))
+        rider = self.rider
         
         # Recover health
-        health_gain = random.randint(10, 20)
-        self.rider.health = min(100, self.rider.health + health_gain)
+        health = rider.health
+        rider.health = min(100, rider.health + self.rng.randint(10, 20))
         
         # Use some fuel (bike idles for warmth/power)
-        self.rider.use_fuel(2)
+        fuel = rider.fuel
+        rider.use_fuel(2)
+        recovered = (HealthChanged(rider.health - health, rider.health, 'rest'),
+                     FuelChanged(rider.fuel - fuel, rider.fuel, 'rest'))
         
-        # Advance time
-        self.rider.days_survived += 1
+        # Advance time; the night's timed events come before the morning's tally
+        self.advance(TICKS_PER_DAY)
         
-        print(f"❤️  You feel refreshed (+{health_gain} health)")
-        print(f"⛽ Your bike used some fuel overnight (-2 fuel)")
+        for event in recovered:
+            self.emit(event)
         
         return True
     
@@ -584,13 +1224,13 @@ class WastelandEngine:
         if item_id:
             item = self.items[item_id]
             if item.takeable:
-                location.items.remove(item_id)
+                self.locations.edit(self.rider.current_location).items.remove(item_id)
                 self.rider.add_item(item_id)
-                print(f"📦 You secure the {item.name} in your pack.")
+                self.emit(ItemTaken(item_id))
             else:
-                print(f"❌ You can't take the {item.name}.")
+                self.emit(CommandFailed('take', 'not_takeable', item_id))
         else:
-            print(f"❌ There's no {item_name} here to take.")
+            self.emit(CommandFailed('take', 'not_here', item_name))
         
         return True
     
@@ -598,12 +1238,11 @@ class WastelandEngine:
         item_id = self.find_item_by_name(item_name, self.rider.inventory)
         
         if item_id:
-            item = self.items[item_id]
             self.rider.remove_item(item_id)
-            self.get_current_location().items.append(item_id)
-            print(f"📦 You drop the {item.name} here.")
+            self.locations.edit(self.rider.current_location).items.append(item_id)
+            self.emit(ItemDropped(item_id))
         else:
-            print(f"❌ You don't have a {item_name} to drop.")
+            self.emit(CommandFailed('drop', 'not_carried', item_name))
         
         return True
     
@@ -613,49 +1252,53 @@ class WastelandEngine:
         if item_id:
             item = self.items[item_id]
             if item.useable:
-                print(f"🔧 {item.use_message}")
+                # Fuel and food are used up; the toolkit is reusable
+                consumed = (item.fuel_value > 0 or item.food_value > 0) and item.name != "Motorcycle Toolkit"
+                self.emit(ItemUsed(item_id, 'use', consumed))
                 
                 # Apply item effects
                 if item.fuel_value > 0:
                     old_fuel = self.rider.fuel
                     self.rider.add_fuel(item.fuel_value)
-                    gained = self.rider.fuel - old_fuel
-                    print(f"⛽ Fuel increased by {gained}% (now {self.rider.fuel}%)")
+                    self.emit(FuelChanged(self.rider.fuel - old_fuel, self.rider.fuel, 'use'))
                 
                 if item.food_value > 0:
                     old_health = self.rider.health
                     self.rider.health = min(100, self.rider.health + item.food_value)
-                    gained = self.rider.health - old_health
-                    print(f"❤️  Health increased by {gained}% (now {self.rider.health}%)")
+                    self.emit(HealthChanged(self.rider.health - old_health, self.rider.health, 'use'))
                 
                 if item.repair_value > 0:
                     old_condition = self.rider.bike_condition
                     self.rider.repair_bike(item.repair_value)
-                    gained = self.rider.bike_condition - old_condition
-                    print(f"🔧 Bike condition improved by {gained}% (now {self.rider.bike_condition}%)")
+                    self.emit(BikeChanged(self.rider.bike_condition - old_condition, self.rider.bike_condition, 'use'))
                 
                 # Remove consumable items
-                if item.fuel_value > 0 or item.food_value > 0:
-                    if item.name != "Motorcycle Toolkit":  # Toolkit is reusable
-                        self.rider.remove_item(item_id)
+                if consumed:
+                    self.rider.remove_item(item_id)
                 
             else:
-                print(f"❌ You can't use the {item.name} right now.")
+                self.emit(CommandFailed('use', 'not_useable', item_id))
         else:
-            print(f"❌ You don't have a {item_name} in your pack.")
+            self.emit(CommandFailed('use', 'not_carried', item_name))
         
         return True
     
-    def find_item_by_name(self, name: str, item_list: List[str]) -> Optional[str]:
-        """Find item by name or alias"""
-        name = name.lower()
-        for item_id in item_list:
-            item = self.items[item_id]
-            if (name in item.name.lower() or 
-                name == item_id.lower() or 
-                any(alias.lower() == name for alias in item.aliases)):
-                return item_id
-        return None
+    def find_item_by_name(self, name: str, item_list: Sequence[str]) -> Optional[str]:
+        """Find item by name or alias - the first listed (or first picked up) item that matches wins"""
+        scan = iter
+        if self.metrics is not None:
+            self.metrics.item_lookups += 1
+            scan = self._scanned
+        if isinstance(item_list, Inventory):
+            return item_list.first_match(self.item_index, name.lower(), scan)
+        return self.item_index.first_match(name.lower(), scan(item_list))
+
+    def _scanned(self, item_ids: Iterable[str]) -> Iterator[str]:
+        """Counts each item a name lookup actually looks at, up to the one it settles on"""
+        metrics = self.metrics
+        for item_id in item_ids:
+            metrics.items_scanned += 1
+            yield item_id
     
     def examine_item(self, item_name: str):
         # Check inventory first
@@ -666,152 +1309,213 @@ class WastelandEngine:
             item_id = self.find_item_by_name(item_name, location.items)
         
         if item_id:
-            item = self.items[item_id]
-            print(f"\n🔍 {item.name}")
-            print(f"   {item.description}")
-            
-            # Show item stats
-            if item.fuel_value > 0:
-                print(f"   ⛽ Fuel value: +{item.fuel_value}")
-            if item.food_value > 0:
-                print(f"   ❤️  Health value: +{item.food_value}")
-            if item.repair_value > 0:
-                print(f"   🔧 Repair value: +{item.repair_value}")
+            self.emit(ItemExamined(item_id))
         else:
-            print(f"❌ You don't see a {item_name} here.")
+            self.emit(CommandFailed('examine', 'not_here', item_name))
     
     def show_inventory(self):
-        if self.rider.inventory:
-            print("\n🎒 SURVIVAL PACK:")
-            for item_id in self.rider.inventory:
-                item = self.items[item_id]
-                print(f"  • {item.name}")
-                if item.fuel_value > 0 or item.food_value > 0 or item.repair_value > 0:
-                    values = []
-                    if item.fuel_value > 0:
-                        values.append(f"⛽{item.fuel_value}")
-                    if item.food_value > 0:
-                        values.append(f"❤️{item.food_value}")
-                    if item.repair_value > 0:
-                        values.append(f"🔧{item.repair_value}")
-                    print(f"    ({' '.join(values)})")
-        else:
-            print("\n🎒 Your pack is empty.")
+        if self.reporting:
+            self.emit(InventoryListed(tuple(self.rider.inventory.counts.items())))
     
     def show_full_status(self):
-        print(f"\n📊 RIDER STATUS:")
-        print(f"🏍️  Location: {self.get_current_location().name}")
-        print(f"🛣️  Miles Traveled: {self.rider.miles_traveled}")
-        print(f"📅 Days Survived: {int(self.rider.days_survived)}")
-        print(f"❤️  Health: {self.rider.health}%")
-        print(f"⛽ Fuel: {self.rider.fuel}%")
-        print(f"🔧 Bike Condition: {self.rider.bike_condition}%")
-        
-        # Distance to LA (rough estimate)
-        distance_remaining = 2500 - self.rider.miles_traveled
-        print(f"🎯 Estimated miles to Los Angeles: {max(0, distance_remaining)}")
-    
+        rider = self.rider
+        here, goal = self.get_current_location(), self.locations.get(GOAL_LOCATION)
+        goal_miles = None
+        if here.coordinates is not None and goal is not None and goal.coordinates is not None:
+            goal_miles = round(great_circle_miles(here.coordinates, goal.coordinates))
+        self.emit(StatusReported(rider.current_location, rider.miles_traveled, rider.days_survived,
+                                 rider.health, rider.fuel, rider.bike_condition, goal_miles))
+
+    def plan_route(self, destination: str = GOAL_LOCATION) -> Optional[Route]:
+        """Cheapest ride from here to a location id, counting the fuel and repairs in the pack"""
+        pack = [(self.items[item_id], count) for item_id, count in self.rider.inventory.counts.items()]
+        return self.world.routes.plan(
+            self.rider.current_location, destination,
+            fuel=self.rider.fuel,
+            bike_condition=self.rider.bike_condition,
+            fuel_reserve=sum(item.fuel_value * count for item, count in pack),
+            repair_reserve=sum(item.repair_value * count for item, count in pack),
+            can_repair_anywhere=any(item.name == "Motorcycle Toolkit" for item, _ in pack),
+        )
+
+    def find_location_by_name(self, name: str) -> Optional[str]:
+        if name in self.locations:
+            return name
+        return self.world.location_index.first_match(name.replace('_', ' '))
+
+    def show_route(self, destination_name: str = ""):
+        destination = self.find_location_by_name(destination_name) if destination_name else GOAL_LOCATION
+        if destination is None:
+            self.emit(CommandFailed('route', 'unknown_place', destination_name))
+            return
+        if destination == self.rider.current_location:
+            self.emit(CommandFailed('route', 'already_there', destination))
+            return
+
+        route = self.plan_route(destination)
+        if route is None:
+            self.emit(CommandFailed('route', 'no_road', destination))
+            return
+
+        self.emit(RoutePlanned(destination, tuple(route.path), tuple(route.directions), route.fuel_needed,
+                               route.fuel_available, route.rough_segments, route.max_bike_damage,
+                               route.dangerous_stops, tuple(route.notes), route.fuel_ok, route.bike_ok))
+
+    def show_nearby(self, radius: str = ""):
+        """The places closest to here on the map, or all within `radius` miles up to NEARBY_PLACES"""
+        here = self.get_current_location()
+        if here.coordinates is None:
+            self.emit(CommandFailed('nearby', 'no_map', self.rider.current_location))
+            return
+        miles = None
+        if radius:
+            miles = int(radius) if radius.isdigit() else 0
+            if miles <= 0:
+                self.emit(CommandFailed('nearby', 'bad_radius', radius))
+                return
+
+        compact = self.world.compact
+        found = self.world.geo.nearest(here.coordinates, NEARBY_PLACES, miles,
+                                       exclude=compact.location_numbers[self.rider.current_location])
+        places = []
+        for distance, number in found:
+            there = (compact.latitude[number], compact.longitude[number])
+            places.append((compact.location_ids[number], round(distance), compass(here.coordinates, there)))
+        self.emit(NearbyListed(self.rider.current_location, tuple(places), miles or 0))
+
     def show_help(self):
-        print("""
-🏍️  WASTELAND RIDER COMMANDS:
-═══════════════════════════════════════════════════════════════
-
-🛣️  MOVEMENT:
-   ride <direction> | north/n, south/s, east/e, west/w
-   
-🎒 ITEMS:
-   take <item>     - Pick up items from the wasteland
-   drop <item>     - Drop items from your pack
-   use <item>      - Consume food, fuel, or medicine
-   examine <item>  - Get detailed information about items
-   
-🔧 BIKE MAINTENANCE:
-   refuel <item>   - Add fuel to your tank
-   repair <item>   - Fix your bike with tools/parts
-   rest            - Make camp and recover health
-   
-📊 INFORMATION:
-   look/l          - Look around your current location
-   inventory/i     - Check your survival pack
-   status          - View detailed rider and bike status
-   
-💾 GAME:
-   save            - Save your progress
-   load            - Load saved game
-   help/h          - Show this help
-   quit/q          - End your journey
-
-💡 SURVIVAL TIPS:
-• Keep your fuel tank full - running out means death
-• Maintain your bike - breakdowns are fatal
-• Rest when injured, but watch your fuel consumption
-• Dangerous areas have better loot but more risks
-• Your goal: Reach Los Angeles alive!
-        """)
-    
-    def save_game(self):
+        self.emit(HelpShown())
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Everything this playthrough changed, relative to the shared world"""
+        return {
+            'rider': {
+                'inventory': self.rider.inventory.state(),
+                'current_location': self.rider.current_location,
+                'health': self.rider.health,
+                'fuel': self.rider.fuel,
+                'bike_condition': self.rider.bike_condition,
+                'miles_traveled': self.rider.miles_traveled,
+                'ticks': self.rider.ticks
+            },
+            'locations': {loc_id: {'visited': location.visited, 'items': list(location.items)}
+                          for loc_id, location in self.locations.changed.items()},
+            'clock': self.clock.state()
+        }
+    
+    def restore_state(self, save_data: Dict[str, Any]):
+        """Apply a snapshot_state() dict - or an old full save, which has every location"""
+        rider_data = save_data['rider']
+        self.rider.inventory = Inventory(rider_data['inventory'])
+        self.rider.current_location = rider_data['current_location']
+        self.rider.health = rider_data['health']
+        self.rider.fuel = rider_data['fuel']
+        self.rider.bike_condition = rider_data['bike_condition']
+        self.rider.miles_traveled = rider_data['miles_traveled']
+        self.rider.ticks = saved_ticks(rider_data)
+        if 'clock' in save_data:
+            self.clock = Scheduler.from_state(save_data['clock'])
+        else:
+            # Saved before the clock: pick the world's events up from where the rider is
+            self.clock = Scheduler()
+            self.clock.start(self.world.timed_events, self.rider.ticks)
+        
+        # Restore location states on a fresh overlay of the shared world
+        self.locations = WorldState(self.world)
+        for loc_id, loc_data in save_data['locations'].items():
+            self.locations.restore(loc_id, loc_data.get('visited', False), loc_data.get('items', []))
+    
+    def rebase(self, locations: Iterable[str], removed_locations: Collection[str] = (),
+               removed_items: Collection[str] = (), new_events: Iterable[str] = ()):
+        """Carry this session across a World.patch: locations it had changed get the new
+        template with this rider's visited flag and items kept, and removed items leave the
+        pack and the ground. (Removed timed events are skipped when they fall due.)"""
+        changed = self.locations.changed
+        for location_id in removed_locations:
+            changed.pop(location_id, None)
+        for location_id in [location_id for location_id in locations if location_id in changed]:
+            mine = changed.pop(location_id)
+            self.locations.restore(location_id, mine.visited, list(mine.items))
+        if removed_items:
+            for location_id, location in list(changed.items()):
+                if any(item_id in removed_items for item_id in location.items):
+                    del changed[location_id]
+                    self.locations.restore(location_id, location.visited,
+                                           [item_id for item_id in location.items if item_id not in removed_items])
+            for item_id in removed_items:
+                while self.rider.remove_item(item_id):
+                    pass
+        self.clock.start({event_id: self.world.timed_events[event_id] for event_id in new_events}, self.rider.ticks)
+        if self.rider.current_location not in self.world.locations:
+            start = Rider().current_location
+            self.rider.current_location = start if start in self.world.locations else next(iter(self.world.locations))
+            self.emit(Relocated(self.rider.current_location))
+
+    def save_game(self, slot: str = saves.DEFAULT_SLOT):
         try:
-            save_data = {
-                'rider': {
-                    'inventory': self.rider.inventory,
-                    'current_location': self.rider.current_location,
-                    'health': self.rider.health,
-                    'fuel': self.rider.fuel,
-                    'bike_condition': self.rider.bike_condition,
-                    'miles_traveled': self.rider.miles_traveled,
-                    'days_survived': self.rider.days_survived
-                },
-                'locations': {loc_id: asdict(location) for loc_id, location in self.locations.items()}
-            }
-            
-            with open('wasteland_save.json', 'w') as f:
-                json.dump(save_data, f, indent=2)
-            print("💾 Game saved successfully!")
+            started = time.perf_counter()
+            saves.save_state(self.snapshot_state(), slot, backend=self.save_backend, player=self.player)
+            if self.metrics is not None:
+                self.metrics.saves.observe(time.perf_counter() - started)
+            self.emit(GameSaved(slot))
         except Exception as e:
-            print(f"❌ Error saving game: {e}")
+            self.emit(CommandFailed('save', 'error', str(e)))
     
-    def load_game(self):
+    def load_game(self, slot: str = saves.DEFAULT_SLOT):
         try:
-            with open('wasteland_save.json', 'r') as f:
-                save_data = json.load(f)
-            
-            # Restore rider state
-            rider_data = save_data['rider']
-            self.rider.inventory = rider_data['inventory']
-            self.rider.current_location = rider_data['current_location']
-            self.rider.health = rider_data['health']
-            self.rider.fuel = rider_data['fuel']
-            self.rider.bike_condition = rider_data['bike_condition']
-            self.rider.miles_traveled = rider_data['miles_traveled']
-            self.rider.days_survived = rider_data['days_survived']
-            
-            # Restore location states
-            for loc_id, loc_data in save_data['locations'].items():
-                self.locations[loc_id] = Location(**loc_data)
-            
-            print("💾 Game loaded successfully!")
+            started = time.perf_counter()
+            self.restore_state(saves.load_state(slot, backend=self.save_backend, player=self.player))
+            if self.metrics is not None:
+                self.metrics.loads.observe(time.perf_counter() - started)
+            self.emit(GameLoaded(slot))
             self.display_location()
         except FileNotFoundError:
-            print("❌ No saved game found.")
+            self.emit(CommandFailed('load', 'no_save', slot))
         except Exception as e:
-            print(f"❌ Error loading game: {e}")
+            self.emit(CommandFailed('load', 'error', str(e)))
     
-    def run(self):
-        print("🏍️  WASTELAND RIDER")
-        print("=" * 50)
-        print("The year is 2087. The bombs fell decades ago.")
-        print("You're a lone rider on a dual-sport motorcycle,")
-        print("trying to get from Washington DC to Los Angeles")
-        print("across 2,500 miles of post-apocalyptic wasteland.")
-        print("\nYour bike is your lifeline. Your fuel is your blood.")
-        print("The road is long, dangerous, and unforgiving.")
-        print("\nType 'help' for commands. Good luck, rider.")
-        print("=" * 50)
+    def show_metrics(self):
+        if not self.operator:
+            self.emit(CommandFailed('metrics', 'operator_only'))
+        elif self.metrics is None:
+            self.emit(CommandFailed('metrics', 'off'))
+        else:
+            self.emit(MetricsReported())
+
+    def show_intro(self):
+        self.say("🏍️  WASTELAND RIDER")
+        self.say("=" * 50)
+        self.say("The year is 2087. The bombs fell decades ago.")
+        self.say("You're a lone rider on a dual-sport motorcycle,")
+        self.say("trying to get from Washington DC to Los Angeles")
+        self.say("across 2,500 miles of post-apocalyptic wasteland.")
+        self.say("\nYour bike is your lifeline. Your fuel is your blood.")
+        self.say("The road is long, dangerous, and unforgiving.")
+        self.say("\nType 'help' for commands. Good luck, rider.")
+        self.say("=" * 50)
         
         self.display_location()
+    
+    def show_ending(self):
+        if self.state == GameState.WON:
+            self.say(f"\n🎉 VICTORY! You've conquered the wasteland!")
+            self.say(f"Miles traveled: {self.rider.miles_traveled}")
+            self.say(f"Days survived: {self.rider.days_survived}")
+            self.say("You are a true wasteland legend!")
+        elif self.state == GameState.GAME_OVER:
+            self.say(f"\n💀 GAME OVER")
+            self.say(f"Miles traveled: {self.rider.miles_traveled}")
+            self.say(f"Days survived: {self.rider.days_survived}")
+            self.say("The wasteland claims another soul...")
+        else:
+            self.say(f"\n🏍️ Thanks for riding! Miles traveled: {self.rider.miles_traveled}")
+    
+    def run(self):
+        self.show_intro()
         
         while self.state == GameState.PLAYING:
             try:
+                self.say.flush()
                 command = input("\n🏍️ > ").strip()
                 if not self.process_command(command):
                     break
@@ -821,20 +1525,94 @@ class WastelandEngine:
             except EOFError:
                 break
         
-        if self.state == GameState.WON:
-            print(f"\n🎉 VICTORY! You've conquered the wasteland!")
-            print(f"Miles traveled: {self.rider.miles_traveled}")
-            print(f"Days survived: {int(self.rider.days_survived)}")
-            print("You are a true wasteland legend!")
-        elif self.state == GameState.GAME_OVER:
-            print(f"\n💀 GAME OVER")
-            print(f"Miles traveled: {self.rider.miles_traveled}")
-            print(f"Days survived: {int(self.rider.days_survived)}")
-            print("The wasteland claims another soul...")
-        else:
-            print(f"\n🏍️ Thanks for riding! Miles traveled: {self.rider.miles_traveled}")
+        self.show_ending()
+        self.say.flush()
+
+
+@dataclass(frozen=True)
+class Command:
+    """What a verb does: run(engine, argument) gets the rest of the command line,
+    lower-cased with single spaces ('' if there is none)"""
+    run: Callable[[WastelandEngine, str], Optional[bool]]
+    needs_argument: bool = False  # Without one the verb is treated as unknown
+    # run()'s result is the command's result and skips the game-over checks
+    # (movement, items and resting do their own); otherwise it is ignored
+    returns: bool = False
+
+
+# Every verb process_command understands, built once - metrics label anything else 'unknown'
+COMMANDS: Dict[str, Command] = {}
+COMMAND_VERBS = COMMANDS.keys()
+
+
+def command(*verbs: str, needs_argument: bool = False, returns: bool = False):
+    """Register a handler for `verbs`; plugins use this to add (or replace) commands:
+
+        @command("dig", "excavate")
+        def dig(engine, argument): ...
+    """
+    def register(run: Callable[[WastelandEngine, str], Optional[bool]]):
+        for verb in verbs:
+            COMMANDS[verb] = Command(run, needs_argument, returns)
+        return run
+    return register
+
+
+command('ride', 'go', 'move', 'drive', needs_argument=True, returns=True)(
+    lambda engine, argument: engine.move_rider(argument.partition(' ')[0]))
+for _direction in ('north', 'n', 'south', 's', 'east', 'e', 'west', 'w', 'up', 'down'):
+    command(_direction, returns=True)(lambda engine, argument, direction=_direction: engine.move_rider(direction))
+command('take', 'get', 'pick', 'grab', needs_argument=True, returns=True)(WastelandEngine.take_item)
+command('drop', 'leave', needs_argument=True, returns=True)(WastelandEngine.drop_item)
+command('use', 'consume', 'drink', 'eat', needs_argument=True, returns=True)(WastelandEngine.use_item)
+command('refuel', 'fuel', needs_argument=True, returns=True)(WastelandEngine.refuel_bike)
+command('repair', 'fix', needs_argument=True, returns=True)(WastelandEngine.repair_bike_with)
+command('rest', 'sleep', 'camp', returns=True)(lambda engine, argument: engine.rest())
+command('look', 'l')(lambda engine, argument: engine.display_location())
+command('inventory', 'i', 'inv', 'pack')(lambda engine, argument: engine.show_inventory())
+command('examine', 'x', 'inspect', needs_argument=True)(WastelandEngine.examine_item)
+command('status', 'stats', 'condition')(lambda engine, argument: engine.show_full_status())
+command('route', 'plan')(WastelandEngine.show_route)
+command('nearby', 'near')(WastelandEngine.show_nearby)
+command('help', 'h')(lambda engine, argument: engine.show_help())
+command('save')(lambda engine, argument: engine.save_game(argument.partition(' ')[0] or saves.DEFAULT_SLOT))
+command('load')(lambda engine, argument: engine.load_game(argument.partition(' ')[0] or saves.DEFAULT_SLOT))
+command('metrics')(lambda engine, argument: engine.show_metrics())
+command('quit', 'q', 'exit', returns=True)(lambda engine, argument: False)
+
+
+# What each kind of timed event in a world file does: handler(engine, event, times it has fired before)
+TIMED_EVENTS: Dict[str, Callable[[WastelandEngine, TimedEvent, int], None]] = {}
+
+
+def timed_event(*kinds: str):
+    """Register a handler for timed events of `kinds`, as command() does for verbs"""
+    def register(run: Callable[[WastelandEngine, TimedEvent, int], None]):
+        for kind in kinds:
+            TIMED_EVENTS[kind] = run
+        return run
+    return register
+
+
+timed_event('evaporation', 'storm')(WastelandEngine.weather)
+timed_event('respawn')(WastelandEngine.respawn)
+timed_event('patrol')(WastelandEngine.patrol)
 
 
 if __name__ == "__main__":
-    game = WastelandEngine()
+    import argparse
+    parser = argparse.ArgumentParser(description="Ride from Washington DC to Los Angeles")
+    parser.add_argument("--seed", type=int, help="Seed the wasteland's dice for a repeatable ride")
+    parser.add_argument("--journal", help="Record every command to this file (replay with journal.py)")
+    parser.add_argument("--metrics-file", help="Time every command and write Prometheus metrics to this file")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="Seconds between metrics writes")
+    args = parser.parse_args()
+
+    metrics = Metrics(COMMAND_VERBS, args.metrics_file, args.metrics_interval) if args.metrics_file else None
+    game = WastelandEngine(seed=args.seed, metrics=metrics, operator=True)
+    if args.journal:
+        from journal import Journal
+        Journal(args.journal).attach(game)
     game.run()
+    if metrics is not None:
+        metrics.export()
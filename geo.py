@@ -0,0 +1,170 @@
+"""
+Wasteland Rider - Map Geometry
+Distances and bearings between locations that carry (latitude, longitude)
+coordinates, and a grid index over them that finds the places near a point
+by looking only at the grid cells the search circle overlaps - so 'nearby'
+costs about the same on a map of twelve places or a million.
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = EARTH_RADIUS_MILES * math.pi / 180  # Along a meridian
+HALF_WAY_ROUND = EARTH_RADIUS_MILES * math.pi  # No two places are farther apart than this
+
+COMPASS = ("north", "northeast", "east", "southeast", "south", "southwest", "west", "northwest")
+
+Point = Tuple[float, float]  # (latitude, longitude) in degrees
+
+
+def haversine_miles(h: float) -> float:
+    """Miles for a haversine term: sin²(Δlat/2) + cos(lat1)·cos(lat2)·sin²(Δlon/2), in radians.
+    Loops over many pairs can compare these terms and only convert the one they keep."""
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(h)))
+
+
+def great_circle_miles(a: Point, b: Point) -> float:
+    """Miles between two points over the Earth's surface"""
+    lat_a, lat_b = math.radians(a[0]), math.radians(b[0])
+    half_lat = (lat_b - lat_a) / 2
+    half_lon = math.radians(b[1] - a[1]) / 2
+    return haversine_miles(math.sin(half_lat) ** 2 + math.cos(lat_a) * math.cos(lat_b) * math.sin(half_lon) ** 2)
+
+
+def compass(a: Point, b: Point) -> str:
+    """Which of the eight compass points `b` lies towards, setting out from `a`"""
+    lat_a, lat_b = math.radians(a[0]), math.radians(b[0])
+    delta_lon = math.radians(b[1] - a[1])
+    bearing = math.degrees(math.atan2(math.sin(delta_lon) * math.cos(lat_b),
+                                      math.cos(lat_a) * math.sin(lat_b)
+                                      - math.sin(lat_a) * math.cos(lat_b) * math.cos(delta_lon)))
+    return COMPASS[round(bearing / 45) % 8]
+
+
+def mapped(latitude: float) -> bool:
+    """Whether a coordinate table entry is real; locations without coordinates hold NaN"""
+    return latitude == latitude
+
+
+class SpatialIndex:
+    """Location numbers bucketed into a grid of latitude/longitude cells, sized so a
+    cell holds about PER_CELL of them. Cells run all the way round in longitude, so a
+    search near the antimeridian wraps; near a pole it takes every column."""
+
+    PER_CELL = 4
+    MIN_CELL_DEGREES = 1e-4
+    SAMPLE = 20000  # Locations looked at to size the cells
+
+    def __init__(self, latitude: Sequence[float], longitude: Sequence[float]):
+        self.latitude, self.longitude = latitude, longitude
+        points = [number for number in range(len(latitude)) if mapped(latitude[number])]
+        self.size = len(points)
+        # A whole number of columns round the globe, so a search wrapping past 180° lands in the right one
+        self.columns = math.ceil(360 / self._cell_size(points))
+        self.cell_degrees = 360 / self.columns
+        self.rows = math.ceil(180 / self.cell_degrees)
+        cells: Dict[int, List[int]] = {}
+        rows, columns, cell_degrees = self.rows, self.columns, self.cell_degrees
+        for number in points:
+            row = min(rows - 1, int((latitude[number] + 90) / cell_degrees))
+            key = row * columns + int(((longitude[number] + 180) % 360) / cell_degrees) % columns
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [number]
+            else:
+                bucket.append(number)
+        self.cells = cells
+
+    def _cell_size(self, points: List[int]) -> float:
+        """Degrees per cell: what the bounding box would give if the locations were spread
+        evenly over it, halved while a sample says they crowd more than PER_CELL to a cell -
+        as they do when a map strings them along roads"""
+        if not points:
+            return 180.0
+        latitude, longitude = self.latitude, self.longitude
+        lat_span = max(latitude[number] for number in points) - min(latitude[number] for number in points)
+        lon_span = max(longitude[number] for number in points) - min(longitude[number] for number in points)
+        area = max(lat_span, self.MIN_CELL_DEGREES) * max(lon_span, self.MIN_CELL_DEGREES)
+        size = min(180.0, max(self.MIN_CELL_DEGREES, math.sqrt(area * self.PER_CELL / len(points))))
+        # Random, not every nth: maps often number locations in order along their roads
+        sample = random.Random(0).sample(points, self.SAMPLE) if len(points) > self.SAMPLE else points
+        scale = (len(points) - 1) / max(1, len(sample) - 1)
+        while size > self.MIN_CELL_DEGREES:
+            counts: Dict[Tuple[int, int], int] = {}
+            for number in sample:
+                key = (int((latitude[number] + 90) / size), int((longitude[number] + 180) / size))
+                counts[key] = counts.get(key, 0) + 1
+            # Other locations sharing a typical location's cell, scaled up from the sample
+            crowding = sum(count * (count - 1) for count in counts.values()) / len(sample) * scale
+            if crowding <= 2 * self.PER_CELL:
+                break
+            size = max(self.MIN_CELL_DEGREES, size / 2)
+        return size
+
+    @classmethod
+    def from_compact(cls, compact) -> "SpatialIndex":
+        return cls(compact.latitude, compact.longitude)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _candidates(self, point: Point, miles: float) -> List[int]:
+        """Numbers in every cell a circle of `miles` round `point` touches"""
+        latitude, longitude = point
+        reach = min(miles, HALF_WAY_ROUND) / MILES_PER_DEGREE
+        cell_degrees, columns = self.cell_degrees, self.columns
+        low_row = max(0, int((latitude - reach + 90) / cell_degrees))
+        high_row = min(self.rows - 1, int((latitude + reach + 90) / cell_degrees))
+        # How far the circle reaches in longitude: exact for a spherical cap, unless it covers a pole
+        if abs(latitude) + reach >= 90:
+            low_column, high_column = 0, columns - 1
+        else:
+            spread = math.sin(math.radians(reach)) / math.cos(math.radians(latitude))
+            spread = math.degrees(math.asin(min(1.0, spread)))
+            low_column = math.floor((longitude - spread + 180) / cell_degrees)
+            high_column = math.floor((longitude + spread + 180) / cell_degrees)
+            if high_column - low_column + 1 >= columns:
+                low_column, high_column = 0, columns - 1
+
+        cells = self.cells
+        found: List[int] = []
+        if (high_row - low_row + 1) * (high_column - low_column + 1) > len(cells):
+            # More cells in the box than hold anything: check the occupied ones instead
+            for key, bucket in cells.items():
+                row, column = divmod(key, columns)
+                if low_row <= row <= high_row and (column - low_column) % columns <= high_column - low_column:
+                    found.extend(bucket)
+            return found
+        for row in range(low_row, high_row + 1):
+            base = row * columns
+            for column in range(low_column, high_column + 1):
+                bucket = cells.get(base + column % columns)
+                if bucket is not None:
+                    found.extend(bucket)
+        return found
+
+    def within(self, point: Point, miles: float) -> List[Tuple[float, int]]:
+        """(miles away, location number) for every location within `miles` of `point`, nearest first"""
+        latitude, longitude = self.latitude, self.longitude
+        found = []
+        for number in self._candidates(point, miles):
+            distance = great_circle_miles(point, (latitude[number], longitude[number]))
+            if distance <= miles:
+                found.append((distance, number))
+        found.sort()
+        return found
+
+    def nearest(self, point: Point, count: int, miles: Optional[float] = None,
+                exclude: Optional[int] = None) -> List[Tuple[float, int]]:
+        """The `count` locations nearest `point`, optionally only those within `miles`.
+        Starts with a circle a cell wide and doubles it until it holds enough."""
+        limit = HALF_WAY_ROUND if miles is None else min(miles, HALF_WAY_ROUND)
+        radius = min(limit, self.cell_degrees * MILES_PER_DEGREE)
+        wanted = count + (exclude is not None)
+        while True:
+            found = self.within(point, radius)
+            if len(found) >= wanted or radius >= limit:
+                return [entry for entry in found if entry[1] != exclude][:count]
+            radius = min(limit, radius * 2)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Hot Reload
+Watches a JSON world file and, when it changes, patches the live World in
+place instead of restarting: the new file is diffed against the last one
+record by record, and only locations and items that changed are rebuilt.
+Every engine sharing the world sees the edit at once and keeps its rider,
+clock and what it has done to the world (visited flags, items moved).
+Parsing and diffing happen in a helper process that keeps the last version
+of the file, so the game's process only ever handles the changed records.
+Usage: python hotreload.py wasteland.json   (watch and report each reload)
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from encounters import encounter_data
+from game import Item, Location, WastelandEngine, World
+from metrics import Metrics
+
+EXTRA_SECTIONS = ("encounters", "encounter_tables", "timed_events")  # Small; swapped whole when they change
+
+
+@dataclass
+class WorldDiff:
+    """What changed between two versions of a world file, as raw records from the new one"""
+    locations: Dict[str, Dict[str, Any]]  # Changed or added
+    removed_locations: Set[str]
+    items: Dict[str, Dict[str, Any]]
+    removed_items: Set[str]
+    sections: Dict[str, Any]  # EXTRA_SECTIONS that changed, and the whole file's copy of each
+    new_events: Set[str]  # Timed events the old file didn't have
+
+    def __bool__(self) -> bool:
+        return bool(self.locations or self.removed_locations or self.items or self.removed_items or self.sections)
+
+    def summary(self) -> str:
+        parts = [f"{len(self.locations)} location(s) changed", f"{len(self.removed_locations)} removed",
+                 f"{len(self.items)} item(s) changed", f"{len(self.removed_items)} removed"]
+        if self.sections:
+            parts.append(f"new {', '.join(self.sections)}")
+        return ", ".join(parts)
+
+
+def changed_records(old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[Dict[str, Any], Set[str]]:
+    """(records that are new or differ, ids that are gone) - one dict comparison per record"""
+    changed = {record_id: data for record_id, data in new.items() if old.get(record_id) != data}
+    return changed, set(old.keys() - new.keys())
+
+
+def diff_world_data(old: Dict[str, Any], new: Dict[str, Any]) -> WorldDiff:
+    locations, removed_locations = changed_records(old.get("locations", {}), new.get("locations", {}))
+    items, removed_items = changed_records(old.get("items", {}), new.get("items", {}))
+    sections = {section: new.get(section) for section in EXTRA_SECTIONS if old.get(section) != new.get(section)}
+    if "encounters" in sections or "encounter_tables" in sections:
+        sections["encounters"], sections["encounter_tables"] = encounter_data(new)
+    new_events = set((new.get("timed_events") or {}).keys() - (old.get("timed_events") or {}).keys())
+    return WorldDiff(locations, removed_locations, items, removed_items, sections, new_events)
+
+
+class WorldDiffer:
+    """The last good version of a world file, and what the file has changed since"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data, self.stamp = self.read()
+        self.pending: Optional[Tuple[Dict[str, Any], Tuple[int, int]]] = None
+
+    def read(self) -> Tuple[Dict[str, Any], Tuple[int, int]]:
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            return json.loads(f.read()), (stat.st_mtime_ns, stat.st_size)
+
+    def diff(self) -> Optional[WorldDiff]:
+        """None while the file is as last seen (or missing, mid-replace by an editor)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) == self.stamp:
+            return None
+        try:
+            self.pending = self.read()
+        except ValueError:
+            self.stamp = stat.st_mtime_ns, stat.st_size  # Not valid JSON; wait for the next save
+            raise
+        return diff_world_data(self.data, self.pending[0])
+
+    def commit(self):
+        """The last diff was applied: it is the new baseline"""
+        self.data, self.stamp = self.pending
+        self.pending = None
+
+    def reject(self):
+        """The last diff couldn't be applied: keep diffing against the old file, but not
+        again until the file changes"""
+        self.stamp = self.pending[1]
+        self.pending = None
+
+
+# The helper process's differ
+_differ: Optional[WorldDiffer] = None
+
+
+def _start_differ(path: str):
+    global _differ
+    _differ = WorldDiffer(path)
+
+
+def _differ_call(method: str):
+    return getattr(_differ, method)()
+
+
+def _differ_stamp() -> Tuple[int, int]:
+    return _differ.stamp
+
+
+@dataclass
+class ReloadReport:
+    diff: WorldDiff
+    diff_seconds: float  # Reading, parsing and diffing; sessions keep playing meanwhile
+    pause_seconds: float  # Patching the world and every session, with nothing else running
+    sessions: int
+
+    def summary(self) -> str:
+        return (f"🔄 World reloaded: {self.diff.summary()}; {self.sessions} session(s) patched. "
+                f"Diff {self.diff_seconds * 1000:.1f} ms, pause {self.pause_seconds * 1000:.2f} ms")
+
+
+class WorldReloader:
+    """Keeps a World in step with its JSON file. `engines` returns the engines playing it
+    right now; a server passes its live sessions. With `isolated`, the differ runs in a
+    helper process so parsing a huge file never holds up the game's process."""
+
+    def __init__(self, path: str, world: World, engines: Callable[[], Iterable[WastelandEngine]] = tuple,
+                 metrics: Optional[Metrics] = None, isolated: bool = True):
+        if not isinstance(world.locations, dict):
+            raise ValueError("hot reload needs a JSON world; packed worlds are repacked and restarted")
+        self.world = world
+        self.engines = engines
+        self.metrics = metrics
+        self.pool = ProcessPoolExecutor(1, initializer=_start_differ, initargs=(path,)) if isolated else None
+        self.differ = None if isolated else WorldDiffer(path)
+        if self.pool is not None:
+            self.pool.submit(_differ_stamp).result()  # Read the baseline now, before the file can change
+
+    def call(self, method: str):
+        if self.pool is not None:
+            return self.pool.submit(_differ_call, method).result()
+        return getattr(self.differ, method)()
+
+    async def call_async(self, method: str):
+        if self.pool is not None:
+            return await asyncio.wrap_future(self.pool.submit(_differ_call, method))
+        return await asyncio.get_running_loop().run_in_executor(None, getattr(self.differ, method))
+
+    def apply(self, diff: WorldDiff) -> Tuple[float, int]:
+        """Patch the world, then every session; returns (seconds taken, sessions patched).
+        Raises - with nothing changed - if the new records don't check out."""
+        started = time.perf_counter()
+        # Only a handful of objects are made, but each allocation could set off a full
+        # collection of a huge world's heap - and nothing made here forms a cycle
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            sections = diff.sections
+            locations = {location_id: Location(**data) for location_id, data in diff.locations.items()}
+            self.world.patch(locations, diff.removed_locations,
+                             {item_id: Item(**data) for item_id, data in diff.items.items()}, diff.removed_items,
+                             encounters=(sections["encounters"], sections["encounter_tables"])
+                             if "encounters" in sections else None,
+                             timed_events=(sections["timed_events"] or {}) if "timed_events" in sections else None)
+            sessions = 0
+            for engine in self.engines():
+                engine.rebase(locations, diff.removed_locations, diff.removed_items, diff.new_events)
+                sessions += 1
+        finally:
+            if collecting:
+                gc.enable()
+        return time.perf_counter() - started, sessions
+
+    def finish(self, diff: WorldDiff, diff_seconds: float) -> ReloadReport:
+        try:
+            pause, sessions = self.apply(diff)
+        except (ValueError, TypeError, KeyError):
+            self.call("reject")
+            raise
+        self.call("commit")
+        if self.metrics is not None:
+            self.metrics.reloads.observe(diff_seconds + pause)
+            self.metrics.reload_pauses.observe(pause)
+        return ReloadReport(diff, diff_seconds, pause, sessions)
+
+    def reload(self) -> Optional[ReloadReport]:
+        """Reload now if the file changed: None when it hasn't. A file that doesn't parse
+        or doesn't check out raises, and leaves the world as it was."""
+        started = time.perf_counter()
+        diff = self.call("diff")
+        return None if diff is None else self.finish(diff, time.perf_counter() - started)
+
+    async def watch(self, interval: float = 2.0, report: Callable[[str], None] = print):
+        """Poll the file forever; only the patch itself holds up the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            started = time.perf_counter()
+            try:
+                diff = await self.call_async("diff")
+                if diff is None:
+                    continue
+                report(self.finish(diff, time.perf_counter() - started).summary())
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                report(f"❌ World reload failed, still playing the old one: {e}")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a world file and report each hot reload")
+    parser.add_argument("world", help="World JSON, e.g. wasteland.json")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between checks of the file")
+    args = parser.parse_args()
+
+    world = World.load(args.world)
+    reloader = WorldReloader(args.world, world)
+    print(f"👀 Watching {args.world} ({len(world.locations):,} locations)")
+    try:
+        asyncio.run(reloader.watch(args.interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reloader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Command Journals
+Every command a journaled engine processes is appended to a journal file,
+along with the engine's RNG seed and periodic checkpoints of its state.
+Replaying a journal rebuilds the session exactly, starting from the
+checkpoint nearest to the command you want to see. A session that names
+its rider after the header was written gets a player record when it does.
+Usage: python journal.py session.journal [--until N] [--verify]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+import saves
+from game import GameState, Inventory, WastelandEngine, World, saved_ticks
+
+JOURNAL_VERSION = 1
+CHECKPOINT_EVERY = 1000  # Commands between checkpoints
+
+# Commands whose outcome depends on more than the journal: a checkpoint follows each one
+EXTERNAL_VERBS = {"load"}
+
+
+def rng_state(engine: WastelandEngine) -> List[Any]:
+    version, internal, gauss = engine.rng.getstate()
+    return [version, list(internal), gauss]
+
+
+def checkpoint(engine: WastelandEngine, count: int) -> Dict[str, Any]:
+    return {"checkpoint": count, "state": engine.snapshot_state(), "game_state": engine.state.value,
+            "rng": rng_state(engine)}
+
+
+def restore_checkpoint(engine: WastelandEngine, record: Dict[str, Any]):
+    engine.restore_state(record["state"])
+    engine.state = GameState(record["game_state"])
+    version, internal, gauss = record["rng"]
+    engine.rng.setstate((version, tuple(internal), gauss))
+
+
+def matches_checkpoint(engine: WastelandEngine, record: Dict[str, Any]) -> bool:
+    """Whether the engine is in the checkpointed state. Locations are compared by
+    content: a restored overlay only copies locations that differ from the world."""
+    live = checkpoint(engine, record["checkpoint"])
+    # Older journals list every unit of the pack instead of counting them, and count days, not ticks
+    recorded_rider = record["state"]["rider"]
+    expected_rider = {key: value for key, value in recorded_rider.items() if key != "days_survived"}
+    expected_rider.update(inventory=Inventory(recorded_rider["inventory"]).state(), ticks=saved_ticks(recorded_rider))
+    if (live["state"]["rider"], live["game_state"], live["rng"]) != \
+            (expected_rider, record["game_state"], record["rng"]):
+        return False
+    if "clock" in record["state"] and live["state"]["clock"] != record["state"]["clock"]:
+        return False
+    for location_id in set(live["state"]["locations"]) | set(record["state"]["locations"]):
+        location = engine.locations[location_id]
+        expected = record["state"]["locations"].get(location_id)
+        if expected is None:
+            template = engine.world.locations[location_id]
+            expected = {"visited": template.visited, "items": list(template.items)}
+        if {"visited": location.visited, "items": list(location.items)} != expected:
+            return False
+    return True
+
+
+class Journal:
+    """Append-only command log for one engine. Lines are either a JSON string (one
+    command) or a JSON object: the header first, then checkpoints and player records."""
+
+    def __init__(self, path: str, every: int = CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.count = 0
+        self.file: Optional[TextIO] = None
+
+    def attach(self, engine: WastelandEngine, world_file: Optional[str] = None, player: Optional[str] = None):
+        """Start journaling `engine` from its current state"""
+        # Never appended to an older journal; line buffered, so one write per record
+        self.file = open(self.path, "x", buffering=1, encoding="utf-8")
+        self.file.write(json.dumps({"journal": JOURNAL_VERSION, "seed": engine.seed, "world": world_file,
+                                    "player": player, "started": time.time()}) + "\n")
+        self._checkpoint(engine)
+        engine.journal = self
+
+    def named(self, player: str):
+        """The rider took a name after the header was written, as API clients do"""
+        self.file.write(json.dumps({"player": player, "at": self.count}) + "\n")
+
+    def _checkpoint(self, engine: WastelandEngine):
+        self.file.write(json.dumps(checkpoint(engine, self.count), separators=(",", ":")) + "\n")
+
+    def record(self, command: str):
+        """Called before a command runs, so a command that crashes the engine is still logged"""
+        self.file.write(json.dumps(command) + "\n")
+
+    def recorded(self, engine: WastelandEngine, command: str):
+        """Called once the command has run"""
+        self.count += 1
+        verb = command.strip().lower().split()[:1]
+        if self.count % self.every == 0 or (verb and verb[0] in EXTERNAL_VERBS):
+            self._checkpoint(engine)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_journal(path: str) -> Tuple[Dict[str, Any], List[str]]:
+    """The header and the raw lines after it"""
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("journal", 0) > JOURNAL_VERSION:
+            raise ValueError(f"{path} was written by a newer version of the game")
+        return header, f.read().splitlines()
+
+
+def replay(path: str, until: Optional[int] = None, world: Optional[World] = None,
+           verify: bool = False, from_start: bool = False) -> Tuple[WastelandEngine, int]:
+    """Rebuild a journaled session headless, up to command number `until` (default: the end).
+    Starts from the latest checkpoint at or before `until`, or from the first one with
+    `from_start`. Returns the engine and how many commands were actually re-run."""
+    header, lines = read_journal(path)
+    if world is None:
+        world = World.load(header.get("world"))
+    engine = WastelandEngine(seed=header["seed"], headless=True, world=world,
+                             save_backend=saves.DiscardSaveBackend())
+
+    # Only checkpoint lines start with '{'; decode backwards until one is early enough
+    start = None
+    for position in (range(len(lines)) if from_start else range(len(lines) - 1, -1, -1)):
+        if lines[position].startswith("{"):
+            record = json.loads(lines[position])
+            if "checkpoint" not in record:
+                continue
+            if until is None or record["checkpoint"] <= until:
+                restore_checkpoint(engine, record)
+                start, count = position + 1, record["checkpoint"]
+                break
+    if start is None:
+        raise ValueError(f"{path} has no checkpoint to start from")
+
+    replayed = 0
+    after_external = False
+    for line in lines[start:]:
+        if line.startswith("{"):
+            record = json.loads(line)
+            if "checkpoint" not in record:
+                continue
+            if after_external:
+                restore_checkpoint(engine, record)  # Whatever the load actually read at the time
+            elif verify and not matches_checkpoint(engine, record):
+                raise AssertionError(f"replay diverged from the journal at command {count}")
+            after_external = False
+            continue
+        if until is not None and count >= until:
+            break
+        command = json.loads(line)
+        verb = command.strip().lower().split()[:1]
+        after_external = bool(verb) and verb[0] in EXTERNAL_VERBS
+        if not after_external:
+            engine.process_command(command)
+        count += 1
+        replayed += 1
+    # Who was riding by then: the header's name, or one the session took later
+    player = header.get("player")
+    for line in lines:
+        if line.startswith('{"player"'):
+            record = json.loads(line)
+            if until is None or record["at"] <= until:
+                player = record["player"]
+    if player is not None:
+        engine.player = player
+    return engine, replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Wasteland Rider session journal")
+    parser.add_argument("journal")
+    parser.add_argument("--until", type=int, help="Stop after this many commands")
+    parser.add_argument("--verify", action="store_true", help="Check the replay against every checkpoint it passes")
+    parser.add_argument("--from-start", action="store_true", help="Re-run every command instead of "
+                                                                  "starting at the nearest checkpoint")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine, replayed = replay(args.journal, args.until, verify=args.verify, from_start=args.from_start)
+    elapsed = time.perf_counter() - start
+    rider = engine.rider
+    print(f"🏍️  Replayed {replayed:,} commands in {elapsed:.3f}s ({replayed / max(elapsed, 1e-9):,.0f} commands/sec)")
+    print(f"   rider: {engine.player}, state: {engine.state.value}, at {rider.current_location}, fuel {rider.fuel}%, "
+          f"bike {rider.bike_condition}%, health {rider.health}%, pack: {', '.join(rider.inventory) or 'empty'}")
+
+
+if __name__ == "__main__":
+    main()
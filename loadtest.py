@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Server Load Test
+Opens thousands of simulated rider connections against server.py
+and reports command latency percentiles
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+from server import PROMPT
+
+PROMPT_BYTES = PROMPT.replace("\n", "\r\n").encode("utf-8")
+
+# Commands that never end the game, so every connection stays up for the whole run
+COMMAND_MIX = ["look", "inventory", "status", "examine jerky", "take gas", "drop gas", "x toolkit", "help"]
+SAVE_MIX = COMMAND_MIX + ["save", "load"]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def raise_fd_limit(wanted: int):
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+
+async def rider(host: str, port: int, commands: int, offset: int, login: bool,
+                connect_gate: asyncio.Semaphore, latencies: List[float], errors: List[str]):
+    try:
+        async with connect_gate:
+            reader, writer = await asyncio.open_connection(host, port)
+            await reader.readuntil(PROMPT_BYTES)  # Intro and first location, or the name question
+            if login:
+                writer.write(f"rider{offset}\r\n".encode("utf-8"))
+                await reader.readuntil(PROMPT_BYTES)
+    except (OSError, asyncio.IncompleteReadError) as e:
+        errors.append(f"connect: {e}")
+        return
+
+    try:
+        for number in range(commands):
+            mix = SAVE_MIX if login else COMMAND_MIX
+            command = mix[(offset + number) % len(mix)]
+            start = time.perf_counter()
+            writer.write(command.encode("utf-8") + b"\r\n")
+            await reader.readuntil(PROMPT_BYTES)
+            latencies.append(time.perf_counter() - start)
+        writer.write(b"quit\r\n")
+        await writer.drain()
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+        errors.append(f"command: {e}")
+    finally:
+        writer.close()
+
+
+async def load_test(args: argparse.Namespace):
+    connect_gate = asyncio.Semaphore(args.connect_concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(rider(args.host, args.port, args.commands, number, args.login,
+                                 connect_gate, latencies, errors)
+                           for number in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"🏍️  {args.connections} connections x {args.commands} commands in {elapsed:.2f}s")
+    print(f"   commands/sec: {len(latencies) / elapsed:,.0f}")
+    print(f"   p50 latency:  {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"   p99 latency:  {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"   max latency:  {percentile(latencies, 1.0) * 1000:.2f} ms")
+    print(f"   errors:       {len(errors)}")
+    for error in sorted(set(errors))[:5]:
+        print(f"     {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a Wasteland Rider server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2087)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--commands", type=int, default=20, help="Commands sent per connection")
+    parser.add_argument("--connect-concurrency", type=int, default=500,
+                        help="Connections allowed to be mid-handshake at once")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="Start server.py on --port for the duration of the test")
+    parser.add_argument("--save-db", help="With --spawn-server: give the server this save database; "
+                                          "riders log in and the command mix includes save/load")
+    args = parser.parse_args()
+    args.login = bool(args.save_db)
+
+    raise_fd_limit(args.connections + 256)
+    server = None
+    if args.spawn_server:
+        server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+        command = [sys.executable, server_script, "--host", args.host,
+                   "--port", str(args.port), "--backlog", "4096"]
+        if args.save_db:
+            command += ["--save-db", args.save_db]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        time.sleep(1.0)
+    try:
+        asyncio.run(load_test(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Wasteland Rider - Metrics
+Opt-in instrumentation: per-verb command counts and latency histograms,
+world lookup counters and save/load timings. Engines only touch a Metrics
+object when one is attached; the operator can see it in-game with the
+`metrics` command, and it can be exported as a Prometheus text-format file.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Collection, Dict, List, Optional, Tuple
+
+import saves
+
+# Upper bounds in seconds, Prometheus style: a sample lands in the first bucket it fits
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                   0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample (the last finite bound for +Inf)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[min(bucket, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+
+class Metrics:
+    """Counters and histograms shared by every engine they're attached to.
+    Commands are labelled by verb; verbs outside `verbs` count as 'unknown' so
+    typos can't grow the label set."""
+
+    def __init__(self, verbs: Collection[str] = (), textfile: Optional[str] = None,
+                 interval: float = 15.0):
+        self.verbs = verbs
+        self.commands: Dict[str, Histogram] = {}
+        self.item_lookups = 0
+        self.items_scanned = 0
+        self.location_fetches = 0
+        self.saves = Histogram()
+        self.loads = Histogram()
+        self.reloads = Histogram()  # Hot reloads of the world file, start to finish
+        self.reload_pauses = Histogram()  # The part of each that holds every session up
+        self.textfile = textfile
+        self.interval = interval
+        self.exported = time.monotonic()
+
+    def observe_command(self, command: str, seconds: float):
+        verb = command.lstrip().partition(" ")[0].lower()
+        histogram = self.commands.get(verb)
+        if histogram is None:
+            if verb not in self.verbs:
+                verb = "unknown"
+            histogram = self.commands.setdefault(verb, Histogram())
+        histogram.observe(seconds)
+        if self.textfile is not None and time.monotonic() - self.exported >= self.interval:
+            self.export()
+
+    def export(self):
+        """Write the Prometheus text file (atomically, so a scraper never sees half of it)"""
+        self.exported = time.monotonic()
+        saves.write_atomic(self.textfile, self.prometheus().encode("utf-8"))
+
+    def prometheus(self) -> str:
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, series: Dict[str, Histogram], label: str = ""):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for value, hist in sorted(series.items()):
+                labels = f'{label}="{value}",' if label else ""
+                cumulative = 0
+                for bound, count in zip(hist.bounds + (float("inf"),), hist.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels}le="{le}"}} {cumulative}')
+                selector = f"{{{labels.rstrip(',')}}}" if labels else ""
+                lines.append(f"{name}_sum{selector} {hist.total!r}")
+                lines.append(f"{name}_count{selector} {hist.count}")
+
+        def counter(name: str, help_text: str, value: int):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"])
+
+        histogram("wasteland_command_seconds", "Time spent processing a command, by verb", self.commands, "verb")
+        counter("wasteland_item_lookups_total", "find_item_by_name calls", self.item_lookups)
+        counter("wasteland_items_scanned_total", "Items find_item_by_name looked at", self.items_scanned)
+        counter("wasteland_location_fetches_total", "get_current_location calls", self.location_fetches)
+        histogram("wasteland_save_seconds", "Time spent saving a game", {"": self.saves})
+        histogram("wasteland_load_seconds", "Time spent loading a game", {"": self.loads})
+        histogram("wasteland_reload_seconds", "Time taken by a hot reload of the world", {"": self.reloads})
+        histogram("wasteland_reload_pause_seconds", "Time sessions were held up by a hot reload",
+                  {"": self.reload_pauses})
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        """Human-readable summary for the metrics command"""
+        lines = [f"\n📈 METRICS", f"   {'verb':<10} {'calls':>8} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}"]
+        for verb, hist in sorted(self.commands.items(), key=lambda entry: -entry[1].count):
+            lines.append(f"   {verb:<10} {hist.count:>8} {hist.total / hist.count * 1000:>9.3f} "
+                         f"{hist.quantile(0.5) * 1000:>8.3f} {hist.quantile(0.99) * 1000:>8.3f}")
+        lines.append(f"   item lookups: {self.item_lookups} ({self.items_scanned} items looked at), "
+                     f"location fetches: {self.location_fetches}")
+        for name, hist in (("saves", self.saves), ("loads", self.loads), ("world reloads", self.reloads),
+                           ("reload pauses", self.reload_pauses)):
+            if hist.count:
+                lines.append(f"   {name}: {hist.count}, mean {hist.total / hist.count * 1000:.2f} ms")
+        return "\n".join(lines)
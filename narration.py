@@ -0,0 +1,377 @@
+"""
+Wasteland Rider - Narration
+The game's text, rendered from events (see events.py). An engine only calls
+in here when its output sink is active, so headless and API sessions never
+format a line of prose. Every narrator reads the engine as it is when the
+event is emitted - right after the handler changed the rider - which is how
+the screens show the rider's bars and the names of things.
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
+
+from encounters import EFFECTS
+from events import (BikeChanged, CommandFailed, Encounter, Event, FuelChanged, GameLoaded, GameOver,
+                    GameSaved, HealthChanged, HelpShown, InventoryListed, ItemDropped, ItemExamined,
+                    ItemRespawned, ItemTaken, ItemUsed, LocationSeen, MetricsReported, Moved, NearbyListed,
+                    NotEnoughFuel, Relocated, Rested, RoutePlanned, StatusReported, TimedEventFired, UnknownCommand,
+                    Won)
+from saves import DEFAULT_SLOT
+
+if TYPE_CHECKING:
+    from game import WastelandEngine
+
+# Every bar the status display can show, [0] empty through [10] full
+BARS = tuple("█" * filled + "░" * (10 - filled) for filled in range(11))
+
+
+def bar(percent: int) -> str:
+    return BARS[min(max(percent, 0), 100) // 10]
+
+
+STATUS_CACHE_SIZE = 4096  # Rendered status lines kept, by (fuel, bike, health)
+_status_text: Dict[Tuple[int, int, int], str] = {}
+
+
+def status_brief(engine: "WastelandEngine") -> str:
+    """The bars under every location; riders see the same few readings over and over"""
+    rider = engine.rider
+    key = (rider.fuel, rider.bike_condition, rider.health)
+    text = _status_text.get(key)
+    if text is None:
+        fuel, bike, health = key
+        text = (f"\n⛽ Fuel: [{bar(fuel)}] {fuel}%\n"
+                f"🔧 Bike: [{bar(bike)}] {bike}%\n")
+        if health < 100:
+            text += f"❤️  Health: [{bar(health)}] {health}%\n"
+        if len(_status_text) >= STATUS_CACHE_SIZE:
+            _status_text.clear()
+        _status_text[key] = text
+    return text
+
+
+# What the wasteland says to a command it doesn't know; the engine rolls which
+UNKNOWN_REPLIES = (
+    "Your bike's engine idles as you consider that command...",
+    "The wasteland wind carries away your words...",
+    "That doesn't seem possible in this harsh world.",
+    "Your survival instincts suggest trying something else.",
+)
+
+HELP_TEXT = """
+🏍️  WASTELAND RIDER COMMANDS:
+═══════════════════════════════════════════════════════════════
+
+🛣️  MOVEMENT:
+   ride <direction> | north/n, south/s, east/e, west/w
+   
+🎒 ITEMS:
+   take <item>     - Pick up items from the wasteland
+   drop <item>     - Drop items from your pack
+   use <item>      - Consume food, fuel, or medicine
+   examine <item>  - Get detailed information about items
+   
+🔧 BIKE MAINTENANCE:
+   refuel <item>   - Add fuel to your tank
+   repair <item>   - Fix your bike with tools/parts
+   rest            - Make camp and recover health
+   
+📊 INFORMATION:
+   look/l          - Look around your current location
+   inventory/i     - Check your survival pack
+   status          - View detailed rider and bike status
+   route [place]   - Plan the cheapest ride to a place (default: Los Angeles)
+   nearby [miles]  - The closest places on the map, or those within some miles
+   
+💾 GAME:
+   save [slot]     - Save your progress
+   load [slot]     - Load saved game
+   metrics         - Command timings, when metrics are on (single player)
+   help/h          - Show this help
+   quit/q          - End your journey
+
+💡 SURVIVAL TIPS:
+• Keep your fuel tank full - running out means death
+• Maintain your bike - breakdowns are fatal
+• Rest when injured, but watch your fuel consumption
+• Dangerous areas have better loot but more risks
+• Your goal: Reach Los Angeles alive!
+        
+"""
+
+Narrator = Callable[["WastelandEngine", Event], str]
+
+# How each kind of event reads; a narrator returns "" for events the text leaves unsaid
+NARRATORS: Dict[type, Narrator] = {}
+
+
+def narrates(*kinds: type):
+    """Register the narrator of `kinds`, as command() does for verbs"""
+    def register(narrator: Narrator) -> Narrator:
+        for kind in kinds:
+            NARRATORS[kind] = narrator
+        return narrator
+    return register
+
+
+def narrate(engine: "WastelandEngine", event: Event) -> str:
+    return NARRATORS[type(event)](engine, event)
+
+
+def item_name(engine: "WastelandEngine", item_id: str) -> str:
+    return engine.items[item_id].name
+
+
+def location_name(engine: "WastelandEngine", location_id: str) -> str:
+    return engine.locations[location_id].name
+
+
+@narrates(LocationSeen)
+def location_seen(engine: "WastelandEngine", event: LocationSeen) -> str:
+    # Name, description and routes never change; only the items on the ground do
+    head, danger = engine.world.location_text(event.location)
+    spotted = engine.world.spotted_text(event.items) if event.items else ""
+    return "".join((head, spotted, danger, status_brief(engine)))
+
+
+@narrates(Moved)
+def moved(engine: "WastelandEngine", event: Moved) -> str:
+    if event.miles:
+        return f"🏍️  You ride {event.direction} for {event.miles} miles, engine roaring across the wasteland...\n"
+    return f"🏍️  You ride {event.direction}, engine roaring across the wasteland...\n"
+
+
+@narrates(NotEnoughFuel)
+def not_enough_fuel(engine: "WastelandEngine", event: NotEnoughFuel) -> str:
+    return (f"⛽ You don't have enough fuel to travel {event.direction}.\n"
+            f"Need {event.needed} fuel, but only have {event.fuel}.\n")
+
+
+def effect(stat: str) -> Callable[["WastelandEngine", Event], str]:
+    """An encounter's or timed event's loss, under the text that announced it"""
+    return lambda engine, event: f"   (-{-event.amount} {EFFECTS[stat]})\n"
+
+
+# (event kind, cause) -> narrator; a cause missing here is left unsaid
+STAT_CHANGES: Dict[Tuple[type, str], Narrator] = {
+    (FuelChanged, "refuel"): lambda engine, event: (f"⛽ You add fuel to your tank (+{event.amount} fuel)\n"
+                                                    f"Current fuel: {event.fuel}%\n"),
+    (FuelChanged, "use"): lambda engine, event: f"⛽ Fuel increased by {event.amount}% (now {event.fuel}%)\n",
+    (FuelChanged, "rest"): lambda engine, event: f"⛽ Your bike used some fuel overnight ({event.amount} fuel)\n",
+    (BikeChanged, "terrain"): lambda engine, event: f"🔧 The rough terrain damages your bike "
+                                                    f"({event.amount} condition)\n",
+    (BikeChanged, "repair"): lambda engine, event: (f"Bike condition improved by {event.amount}% "
+                                                    f"(now {event.condition}%)\n"),
+    (BikeChanged, "use"): lambda engine, event: (f"🔧 Bike condition improved by {event.amount}% "
+                                                 f"(now {event.condition}%)\n"),
+    (HealthChanged, "rest"): lambda engine, event: f"❤️  You feel refreshed (+{event.amount} health)\n",
+    (HealthChanged, "use"): lambda engine, event: (f"❤️  Health increased by {event.amount}% "
+                                                   f"(now {event.health}%)\n"),
+}
+for _kind, _stat in ((FuelChanged, "fuel"), (BikeChanged, "bike"), (HealthChanged, "health")):
+    STAT_CHANGES[_kind, "encounter"] = STAT_CHANGES[_kind, "event"] = effect(_stat)
+
+
+@narrates(FuelChanged, BikeChanged, HealthChanged)
+def stat_changed(engine: "WastelandEngine", event: Event) -> str:
+    narrator = STAT_CHANGES.get((type(event), event.cause))
+    return narrator(engine, event) if narrator is not None else ""
+
+
+@narrates(Encounter, TimedEventFired)
+def announced(engine: "WastelandEngine", event: Event) -> str:
+    return f"\n{event.text}\n" if event.text else ""
+
+
+@narrates(ItemRespawned)
+def item_respawned(engine: "WastelandEngine", event: ItemRespawned) -> str:
+    return f"\n{event.text}\n" if event.text and event.location == engine.rider.current_location else ""
+
+
+@narrates(ItemTaken)
+def item_taken(engine: "WastelandEngine", event: ItemTaken) -> str:
+    return f"📦 You secure the {item_name(engine, event.item)} in your pack.\n"
+
+
+@narrates(ItemDropped)
+def item_dropped(engine: "WastelandEngine", event: ItemDropped) -> str:
+    return f"📦 You drop the {item_name(engine, event.item)} here.\n"
+
+
+@narrates(ItemUsed)
+def item_used(engine: "WastelandEngine", event: ItemUsed) -> str:
+    item = engine.items[event.item]
+    if event.verb == "use":
+        return f"🔧 {item.use_message}\n"
+    if event.verb == "repair":
+        if event.consumed:
+            return f"🔧 You use the {item.name} to repair your bike.\n"
+        return "🔧 You perform maintenance with your toolkit.\n"
+    return ""  # Refueling says it all with the fuel it adds
+
+
+@narrates(Rested)
+def rested(engine: "WastelandEngine", event: Rested) -> str:
+    return ("🏕️ You make camp and rest for the night...\n"
+            "The wasteland is quiet except for distant howls and the wind.\n")
+
+
+# (verb, reason) -> the refusal, given the engine and the event's subject
+FAILURES: Dict[Tuple[str, str], Callable[["WastelandEngine", str], str]] = {
+    ("ride", "no_exit"): lambda engine, direction: (f"🚫 You can't ride {direction} from here.\n"
+                                                    "Check your map and try a different route.\n"),
+    ("refuel", "not_fuel"): lambda engine, item: f"❌ The {item_name(engine, item)} can't be used as fuel.\n",
+    ("refuel", "not_carried"): lambda engine, name: f"❌ You don't have any {name}.\n",
+    ("repair", "not_repair"): lambda engine, item: f"❌ The {item_name(engine, item)} can't be used for repairs.\n",
+    ("repair", "not_carried"): lambda engine, name: f"❌ You don't have any {name}.\n",
+    ("take", "not_takeable"): lambda engine, item: f"❌ You can't take the {item_name(engine, item)}.\n",
+    ("take", "not_here"): lambda engine, name: f"❌ There's no {name} here to take.\n",
+    ("drop", "not_carried"): lambda engine, name: f"❌ You don't have a {name} to drop.\n",
+    ("use", "not_useable"): lambda engine, item: f"❌ You can't use the {item_name(engine, item)} right now.\n",
+    ("use", "not_carried"): lambda engine, name: f"❌ You don't have a {name} in your pack.\n",
+    ("examine", "not_here"): lambda engine, name: f"❌ You don't see a {name} here.\n",
+    ("route", "unknown_place"): lambda engine, name: f"🗺️  You don't know of anywhere called '{name}'.\n",
+    ("route", "already_there"): lambda engine, place: f"🗺️  You're already at {location_name(engine, place)}.\n",
+    ("route", "no_road"): lambda engine, place: (f"🗺️  No road leads from here to "
+                                                 f"{location_name(engine, place)}.\n"),
+    ("nearby", "no_map"): lambda engine, place: f"🧭 {location_name(engine, place)} isn't on any map you have.\n",
+    ("nearby", "bad_radius"): lambda engine, radius: f"🧭 '{radius}' isn't a number of miles.\n",
+    ("save", "error"): lambda engine, error: f"❌ Error saving game: {error}\n",
+    ("load", "no_save"): lambda engine, slot: ("❌ No saved game found.\n" if slot == DEFAULT_SLOT
+                                               else f"❌ No saved game in slot '{slot}'.\n"),
+    ("load", "error"): lambda engine, error: f"❌ Error loading game: {error}\n",
+    ("metrics", "off"): lambda engine, _: ("📈 Metrics are off. Start the game or server with "
+                                           "--metrics-file to turn them on.\n"),
+    ("metrics", "operator_only"): lambda engine, _: ("📈 Metrics are for whoever runs the game; "
+                                                     "a server exports them to its --metrics-file.\n"),
+}
+
+
+@narrates(CommandFailed)
+def command_failed(engine: "WastelandEngine", event: CommandFailed) -> str:
+    return FAILURES[event.verb, event.reason](engine, event.subject)
+
+
+@narrates(UnknownCommand)
+def unknown_command(engine: "WastelandEngine", event: UnknownCommand) -> str:
+    return f"{UNKNOWN_REPLIES[event.reply]}\nType 'help' for available commands.\n"
+
+
+@narrates(Won)
+def won(engine: "WastelandEngine", event: Won) -> str:
+    return ("\n🎉 INCREDIBLE! You've made it to Los Angeles!\n"
+            "Against all odds, you've crossed the wasteland and reached the City of Angels!\n"
+            f"Miles traveled: {event.miles}\n"
+            f"Days survived: {event.days}\n")
+
+
+@narrates(GameOver)
+def game_over(engine: "WastelandEngine", event: GameOver) -> str:
+    if event.cause == "fuel":
+        return ("\n💀 Your bike runs out of fuel in the middle of the wasteland...\n"
+                "Without transportation, you become another casualty of the apocalypse.\n")
+    return ("\n💀 Your motorcycle breaks down beyond repair...\n"
+            "Stranded in the wasteland, your journey ends here.\n")
+
+
+@narrates(Relocated)
+def relocated(engine: "WastelandEngine", event: Relocated) -> str:
+    return f"\n🌪️  The road you were on is gone. You come to at {location_name(engine, event.location)}.\n"
+
+
+@narrates(ItemExamined)
+def item_examined(engine: "WastelandEngine", event: ItemExamined) -> str:
+    item = engine.items[event.item]
+    text = f"\n🔍 {item.name}\n   {item.description}\n"
+    if item.fuel_value > 0:
+        text += f"   ⛽ Fuel value: +{item.fuel_value}\n"
+    if item.food_value > 0:
+        text += f"   ❤️  Health value: +{item.food_value}\n"
+    if item.repair_value > 0:
+        text += f"   🔧 Repair value: +{item.repair_value}\n"
+    return text
+
+
+@narrates(InventoryListed)
+def inventory_listed(engine: "WastelandEngine", event: InventoryListed) -> str:
+    if not event.counts:
+        return "\n🎒 Your pack is empty.\n"
+    pack_text = engine.world.pack_text
+    return "\n🎒 SURVIVAL PACK:\n" + "".join(pack_text(item_id, count) for item_id, count in event.counts)
+
+
+@narrates(StatusReported)
+def status_reported(engine: "WastelandEngine", event: StatusReported) -> str:
+    if event.goal_miles is not None:
+        goal = f"🎯 Miles to Los Angeles, as the crow flies: {event.goal_miles}\n"
+    else:
+        # Off the map: a rough estimate from the miles ridden so far
+        goal = f"🎯 Estimated miles to Los Angeles: {max(0, 2500 - event.miles)}\n"
+    return (f"\n📊 RIDER STATUS:\n"
+            f"🏍️  Location: {location_name(engine, event.location)}\n"
+            f"🛣️  Miles Traveled: {event.miles}\n"
+            f"📅 Days Survived: {event.days}\n"
+            f"❤️  Health: {event.health}%\n"
+            f"⛽ Fuel: {event.fuel}%\n"
+            f"🔧 Bike Condition: {event.bike}%\n"
+            + goal)
+
+
+@narrates(NearbyListed)
+def nearby_listed(engine: "WastelandEngine", event: NearbyListed) -> str:
+    if not event.places:
+        return f"\n🧭 Nothing on your map within {event.radius} miles.\n"
+    # Places one ride away say which way to ride
+    roads = {target: direction for direction, target in engine.locations[event.location].exits.items()}
+    within = f" WITHIN {event.radius} MILES" if event.radius else ""
+    lines = [f"\n🧭 NEARBY{within}:"]
+    for location_id, miles, bearing in event.places:
+        road = f" - ride {roads[location_id]}" if location_id in roads else ""
+        lines.append(f"   {location_name(engine, location_id)}: {miles} miles {bearing}{road}")
+    return "\n".join(lines) + "\n"
+
+
+@narrates(RoutePlanned)
+def route_planned(engine: "WastelandEngine", event: RoutePlanned) -> str:
+    target = location_name(engine, event.destination)
+    lines = [f"\n🗺️  ROUTE TO {target.upper()}:"]
+    for location_id, direction in zip(event.path, event.directions):
+        lines.append(f"   {location_name(engine, location_id)} → ride {direction}")
+    lines.append(f"   🏁 {target}")
+    lines.append(f"⛽ Fuel needed: {event.fuel_needed}% (tank {engine.rider.fuel}%, "
+                 f"{event.fuel_available}% counting fuel in your pack)")
+    if event.rough_segments:
+        lines.append(f"🔧 Rough terrain: {event.rough_segments} stretch(es), "
+                     f"up to -{event.max_bike_damage} bike condition")
+    if event.dangerous_stops:
+        lines.append(f"⚠️  Dangerous stops along the way: {event.dangerous_stops}")
+    for note in event.notes:
+        lines.append(f"💡 This route {note}.")
+    if not event.fuel_ok:
+        lines.append("❌ You don't have the fuel for this ride. Find more before setting out.")
+    elif not event.bike_ok:
+        lines.append("❌ Your bike might not survive this ride. Find repair supplies first.")
+    else:
+        lines.append("✅ You can make it - if the wasteland lets you.")
+    return "\n".join(lines) + "\n"
+
+
+@narrates(HelpShown)
+def help_shown(engine: "WastelandEngine", event: HelpShown) -> str:
+    return HELP_TEXT
+
+
+@narrates(GameSaved)
+def game_saved(engine: "WastelandEngine", event: GameSaved) -> str:
+    if event.slot == DEFAULT_SLOT:
+        return "💾 Game saved successfully!\n"
+    return f"💾 Game saved to slot '{event.slot}'!\n"
+
+
+@narrates(GameLoaded)
+def game_loaded(engine: "WastelandEngine", event: GameLoaded) -> str:
+    return "💾 Game loaded successfully!\n"
+
+
+@narrates(MetricsReported)
+def metrics_reported(engine: "WastelandEngine", event: MetricsReported) -> str:
+    return engine.metrics.report() + "\n"
@@ -0,0 +1,60 @@
+"""
+Wasteland Rider - Output Sinks
+Where an engine's text goes. Engines call their sink like print(); a buffered
+sink collects one command's text and hands it on in a single write, and the
+null sink lets headless runs skip building text nobody will read.
+"""
+
+import sys
+from typing import List, Optional, TextIO
+
+
+class OutputSink:
+    """print()-compatible text destination.
+    `active` is False for sinks that discard everything, so callers can skip formatting."""
+
+    active = True
+
+    def __call__(self, *args, sep: str = " ", end: str = "\n", **kwargs):
+        self.write(sep.join(map(str, args)) + end)
+
+    def write(self, text: str):
+        raise NotImplementedError
+
+    def flush(self):
+        """Deliver everything written so far"""
+
+
+class NullSink(OutputSink):
+    active = False
+
+    def __call__(self, *args, **kwargs):
+        pass
+
+    def write(self, text: str):
+        pass
+
+
+class BufferedSink(OutputSink):
+    """Collects text until flush(), then writes it to a stream in one call"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+        self.chunks: List[str] = []
+
+    def write(self, text: str):
+        self.chunks.append(text)
+
+    def take(self) -> str:
+        text = "".join(self.chunks)
+        self.chunks.clear()
+        return text
+
+    def flush(self):
+        if self.chunks:
+            stream = self.stream or sys.stdout  # Looked up late, so redirected stdout still works
+            stream.write(self.take())
+            stream.flush()
+
+
+NULL_SINK = NullSink()
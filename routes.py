@@ -0,0 +1,327 @@
+"""
+Wasteland Rider - Route Planner
+Finds the cheapest way to ride between two locations. Fuel is charged on
+leaving a location (its fuel_cost), and leaving rough terrain (fuel_cost > 3)
+can damage the bike by up to 5. Shortest-path trees towards each destination
+are computed once per World and cached, so repeat questions are a walk down
+a precomputed tree. The first question about a destination is answered by
+an A* search between the pair alone, steered by map distance when every
+location has coordinates.
+"""
+
+import heapq
+import math
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from geo import EARTH_RADIUS_MILES, mapped
+
+# Mirrors WastelandEngine.move_rider
+ROUGH_TERRAIN_COST = 3  # Leaving a location that costs more fuel than this is rough riding
+MAX_TERRAIN_DAMAGE = 5  # Worst bike damage from one rough departure
+
+# Tree distances pack (fuel, rough segments, hops) into one int so the heap compares ints
+_SHIFT = 21
+UNREACHABLE = -1
+SEARCH_SHARE = 32  # A single-pair search that settles more than 1/32 of the world gives way to a tree
+MIN_SEARCH = 1024  # ...or more than this many locations, on smaller worlds
+
+
+@dataclass
+class Route:
+    path: List[str]  # Location ids from start to destination
+    directions: List[str]  # Direction to ride out of each location but the last
+    fuel_needed: int
+    rough_segments: int
+    dangerous_stops: int
+    fuel_available: int
+    bike_condition: int
+    repair_available: int
+    can_repair_anywhere: bool = False
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def max_bike_damage(self) -> int:
+        return self.rough_segments * MAX_TERRAIN_DAMAGE
+
+    @property
+    def fuel_ok(self) -> bool:
+        return self.fuel_needed <= self.fuel_available
+
+    @property
+    def bike_ok(self) -> bool:
+        if self.can_repair_anywhere:
+            return True
+        return self.max_bike_damage < self.bike_condition + self.repair_available
+
+    @property
+    def feasible(self) -> bool:
+        return self.fuel_ok and self.bike_ok
+
+
+class RoutePlanner:
+    """Route queries over one World's CompactWorld tables. The cache is dropped along
+    with its World, or when a hot reload patches the world in place."""
+
+    def __init__(self, compact, cache_size: int = 64):
+        self.compact = compact
+        self.cache_size = cache_size
+        self._trees: "OrderedDict[Tuple[int, bool], Tuple[array, array]]" = OrderedDict()
+        self._searched: Set[int] = set()  # Destinations asked about once, without building their tree
+        self._fuel_per_mile: Optional[float] = None
+        self._map: Optional[Tuple[array, array, array]] = None  # See _unit_vectors()
+        predecessors: List[List[int]] = [[] for _ in range(len(compact))]
+        for source, targets in enumerate(compact.adjacency):
+            for target in targets:
+                predecessors[target].append(source)
+        self.predecessors = tuple(tuple(sources) for sources in predecessors)
+
+    def patch(self, old_exits: Dict[int, Tuple[int, ...]]):
+        """Follow a CompactWorld.patch: `old_exits` has the adjacency, before the patch, of every
+        location it changed (empty for added ones). Every cached tree may be stale, so all go."""
+        predecessors = list(self.predecessors)
+        predecessors.extend(() for _ in range(len(self.compact) - len(predecessors)))
+        for source, targets in old_exits.items():
+            for target in targets:
+                predecessors[target] = tuple(other for other in predecessors[target] if other != source)
+            for target in self.compact.adjacency[source]:
+                predecessors[target] += (source,)
+        self.predecessors = tuple(predecessors)
+        self._trees.clear()
+        self._searched.clear()
+        self._fuel_per_mile = self._map = None
+
+    def tree(self, destination: int, fewest_rough: bool = False) -> Tuple[array, array]:
+        """(distance key, next hop) for every location, riding towards `destination`.
+        Keys order by fuel, then rough segments, then hops - or rough segments first."""
+        cache_key = (destination, fewest_rough)
+        cached = self._trees.get(cache_key)
+        if cached is not None:
+            self._trees.move_to_end(cache_key)
+            return cached
+
+        count = len(self.compact)
+        fuel_cost = self.compact.fuel_cost
+        fuel_shift, rough_shift = (_SHIFT, 2 * _SHIFT) if fewest_rough else (2 * _SHIFT, _SHIFT)
+        distance = array("q", [UNREACHABLE]) * count
+        next_hop = array("i", [-1]) * count
+        distance[destination] = 0
+        heap = [(0, destination)]
+        predecessors = self.predecessors
+        while heap:
+            key, location = heapq.heappop(heap)
+            if key != distance[location]:
+                continue
+            for source in predecessors[location]:
+                cost = fuel_cost[source]
+                rough = 1 if cost > ROUGH_TERRAIN_COST else 0
+                candidate = key + (cost << fuel_shift) + (rough << rough_shift) + 1
+                known = distance[source]
+                if known == UNREACHABLE or candidate < known:
+                    distance[source] = candidate
+                    next_hop[source] = location
+                    heapq.heappush(heap, (candidate, source))
+
+        self._trees[cache_key] = (distance, next_hop)
+        if len(self._trees) > self.cache_size:
+            self._trees.popitem(last=False)
+        return distance, next_hop
+
+    def min_fuel(self, source: int, destination: int) -> Optional[int]:
+        key = self.tree(destination)[0][source]
+        return None if key == UNREACHABLE else key >> (2 * _SHIFT)
+
+    def _unit_vectors(self) -> Tuple[array, array, array]:
+        """Every location as a point on the unit sphere. The straight line between two, times the
+        Earth's radius, is never longer than the miles over the surface - and needs no trigonometry."""
+        if self._map is None:
+            latitude = array("d", map(math.radians, self.compact.latitude))
+            longitude = array("d", map(math.radians, self.compact.longitude))
+            cos_latitude = array("d", map(math.cos, latitude))
+            self._map = (array("d", map(lambda cos_lat, lon: cos_lat * math.cos(lon), cos_latitude, longitude)),
+                         array("d", map(lambda cos_lat, lon: cos_lat * math.sin(lon), cos_latitude, longitude)),
+                         array("d", map(math.sin, latitude)))
+        return self._map
+
+    def fuel_per_mile(self) -> float:
+        """The least fuel any road burns per mile of map it crosses, so at least this much times
+        the miles left as the crow flies is still to burn. 0 unless every location is mapped."""
+        if self._fuel_per_mile is None:
+            compact = self.compact
+            least = math.inf
+            if all(map(mapped, compact.latitude)):
+                latitude = array("d", map(math.radians, compact.latitude))
+                longitude = array("d", map(math.radians, compact.longitude))
+                cos_latitude = array("d", map(math.cos, latitude))
+                fuel_cost = compact.fuel_cost
+                for source, targets in enumerate(compact.adjacency):
+                    # Only the longest road out of a location can set the least. Along the parallel
+                    # nearer the pole and then the meridian is never shorter than the great circle,
+                    # and needs no trigonometry
+                    lat, lon, cos_lat = latitude[source], longitude[source], cos_latitude[source]
+                    farthest = 0.0
+                    for target in targets:
+                        cos_target = cos_latitude[target]
+                        span = (abs(latitude[target] - lat)
+                                + (cos_lat if cos_lat < cos_target else cos_target) * abs(longitude[target] - lon))
+                        if span > farthest:
+                            farthest = span
+                    if farthest > 0:
+                        least = min(least, fuel_cost[source] / (farthest * EARTH_RADIUS_MILES))
+            # Shaved a little, so rounding can never make the estimate overshoot
+            self._fuel_per_mile = 0.0 if least == math.inf else least * (1 - 1e-6)
+        return self._fuel_per_mile
+
+    def _search(self, source: int, destination: int, max_settled: int) -> Optional[List[int]]:
+        """Cheapest path between one pair: A* over the trees' packed keys. The estimate of what is
+        left, fuel_per_mile() times the straight-line miles to go, never overshoots and never drops
+        by more than a ride costs, so the first time the destination comes off the heap its path
+        is a cheapest one. Stops there, where a tree would go on to settle every location in the
+        world - or gives up with None after settling `max_settled`, as on maps whose shortcuts
+        reach everywhere."""
+        compact = self.compact
+        fuel_cost, adjacency = compact.fuel_cost, compact.adjacency
+        # The estimate for a location is `scale` times its straight-line distance to the goal
+        scale = self.fuel_per_mile() * EARTH_RADIUS_MILES
+        if scale:
+            x, y, z = self._unit_vectors()
+            goal_x, goal_y, goal_z = x[destination], y[destination], z[destination]
+            start = math.sqrt((x[source] - goal_x) ** 2 + (y[source] - goal_y) ** 2 + (z[source] - goal_z) ** 2)
+            if scale * start < 1:
+                scale = 0.0  # Worth under one fuel from the start; not worth working out
+        heappush, heappop = heapq.heappush, heapq.heappop
+        fuel_shift = 2 * _SHIFT
+        best = array("q", [UNREACHABLE]) * len(compact)
+        parent = array("i", [-1]) * len(compact)
+        best[source] = 0
+        heap = [(0, 0, source)]
+        settled = 0
+        while heap:
+            _, key, location = heappop(heap)
+            if key != best[location]:
+                continue
+            settled += 1
+            if settled > max_settled:
+                return None
+            if location == destination:
+                path = [location]
+                while path[-1] != source:
+                    path.append(parent[path[-1]])
+                return path[::-1]
+            cost = fuel_cost[location]
+            candidate = key + (cost << fuel_shift) + ((1 if cost > ROUGH_TERRAIN_COST else 0) << _SHIFT) + 1
+            for target in adjacency[location]:
+                known = best[target]
+                if known == UNREACHABLE or candidate < known:
+                    best[target] = candidate
+                    parent[target] = location
+                    estimate = 0
+                    if scale:
+                        dx, dy, dz = x[target] - goal_x, y[target] - goal_y, z[target] - goal_z
+                        estimate = int(scale * math.sqrt(dx * dx + dy * dy + dz * dz)) << fuel_shift
+                    heappush(heap, (candidate + estimate, candidate, target))
+        return None
+
+    def _cheapest_path(self, source: int, destination: int) -> Optional[List[int]]:
+        if (destination, False) not in self._trees and destination not in self._searched:
+            # One question about a destination gets a search between the pair; a second
+            # is worth the whole tree, which answers every one after it with a walk
+            if len(self._searched) >= self.cache_size * 16:
+                self._searched.clear()
+            self._searched.add(destination)
+            path = self._search(source, destination, max(MIN_SEARCH, len(self.compact) // SEARCH_SHARE))
+            if path is not None:
+                return path  # Otherwise it gave up, or no road leads there: the tree will tell
+
+        distance, next_hop = self.tree(destination)
+        if distance[source] == UNREACHABLE:
+            return None
+        path = [source]
+        while path[-1] != destination:
+            path.append(next_hop[path[-1]])
+        return path
+
+    def _path_within_rough_budget(self, source: int, destination: int, budget: int,
+                                  max_states: int = 2_000_000) -> Optional[List[int]]:
+        """Least-fuel path using at most `budget` rough departures: A* over (location,
+        rough segments used), guided by the fuel tree and pruned by the fewest-rough tree"""
+        distance = self.tree(destination)[0]
+        fewest_rough = self.tree(destination, fewest_rough=True)[0]
+        if (fewest_rough[source] >> (2 * _SHIFT)) > budget:
+            return None
+        fuel_cost = self.compact.fuel_cost
+        adjacency = self.compact.adjacency
+        best = {(source, 0): 0}
+        parent = {(source, 0): None}
+        heap = [(distance[source] >> (2 * _SHIFT), 0, source, 0)]
+        while heap and len(best) < max_states:
+            _, fuel, location, rough = heapq.heappop(heap)
+            state = (location, rough)
+            if fuel != best[state]:
+                continue
+            if location == destination:
+                path = []
+                while state is not None:
+                    path.append(state[0])
+                    state = parent[state]
+                return path[::-1]
+            cost = fuel_cost[location]
+            next_rough = rough + (1 if cost > ROUGH_TERRAIN_COST else 0)
+            if next_rough > budget:
+                continue
+            for target in adjacency[location]:
+                remaining = distance[target]
+                if remaining == UNREACHABLE or next_rough + (fewest_rough[target] >> (2 * _SHIFT)) > budget:
+                    continue
+                next_state = (target, next_rough)
+                next_fuel = fuel + cost
+                if next_fuel < best.get(next_state, next_fuel + 1):
+                    best[next_state] = next_fuel
+                    parent[next_state] = state
+                    heapq.heappush(heap, (next_fuel + (remaining >> (2 * _SHIFT)), next_fuel, target, next_rough))
+        return None
+
+    def plan(self, source_id: str, destination_id: str, fuel: int, bike_condition: int,
+             fuel_reserve: int = 0, repair_reserve: int = 0, can_repair_anywhere: bool = False) -> Optional[Route]:
+        """Cheapest route, preferring one the bike survives even with worst-case terrain damage.
+        fuel_reserve/repair_reserve are the fuel and repair values of items in the pack."""
+        numbers = self.compact.location_numbers
+        source, destination = numbers[source_id], numbers[destination_id]
+        path = self._cheapest_path(source, destination)
+        if path is None:
+            return None
+
+        route = self._route(path, fuel + fuel_reserve, bike_condition, repair_reserve, can_repair_anywhere)
+        if not route.bike_ok:
+            # Largest number of rough departures the bike survives at 5 damage each
+            budget = (bike_condition + repair_reserve - 1) // MAX_TERRAIN_DAMAGE
+            safer = self._path_within_rough_budget(source, destination, budget)
+            if safer is not None:
+                route = self._route(safer, fuel + fuel_reserve, bike_condition, repair_reserve, can_repair_anywhere)
+                route.notes.append("avoids rough terrain your bike might not survive")
+        return route
+
+    def _route(self, path: List[int], fuel_available: int, bike_condition: int,
+               repair_available: int, can_repair_anywhere: bool) -> Route:
+        compact = self.compact
+        directions = []
+        fuel_needed = rough = 0
+        for location, target in zip(path, path[1:]):
+            cost = compact.fuel_cost[location]
+            fuel_needed += cost
+            rough += cost > ROUGH_TERRAIN_COST
+            directions.append(next(direction for direction, exit_target in compact.exits(location)
+                                   if exit_target == target))
+        return Route(
+            path=[compact.location_ids[location] for location in path],
+            directions=directions,
+            fuel_needed=fuel_needed,
+            rough_segments=rough,
+            dangerous_stops=sum(compact.dangerous[location] for location in path[1:]),
+            fuel_available=fuel_available,
+            bike_condition=bike_condition,
+            repair_available=repair_available,
+            can_repair_anywhere=can_repair_anywhere,
+        )
@@ -0,0 +1,306 @@
+"""
+Wasteland Rider - Save Files
+Saves hold only what a playthrough changed: the rider's stats, pack and
+position, plus the visited flag and items of locations that differ from
+the pristine world. They are pickled and handed to a save backend: files
+in the working directory by default, or a shared SQLite database for servers.
+"""
+
+import io
+import json
+import os
+import pickle
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+SAVE_MAGIC = b"WRSAVE"
+SAVE_VERSION = 1
+DEFAULT_SLOT = "default"
+DEFAULT_PLAYER = "rider"
+LEGACY_SAVE_FILE = "wasteland_save.json"
+
+SLOT_NAME = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+# mkstemp creates files 0600; saves should get the same mode open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Save payloads are plain dicts/lists/strings/numbers - nothing else may be unpickled
+SAFE_BUILTINS = {"dict", "list", "tuple", "str", "int", "float", "bool", "set", "frozenset"}
+
+
+class SaveError(Exception):
+    pass
+
+
+class _SaveUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str):
+        if module == "builtins" and name in SAFE_BUILTINS:
+            return super().find_class(module, name)
+        raise SaveError(f"save file references {module}.{name}")
+
+
+def encode_save(state: Dict[str, Any]) -> bytes:
+    return SAVE_MAGIC + bytes([SAVE_VERSION]) + pickle.dumps(state, protocol=4)
+
+
+def decode_save(blob: bytes) -> Dict[str, Any]:
+    header = len(SAVE_MAGIC) + 1
+    if blob[:len(SAVE_MAGIC)] != SAVE_MAGIC:
+        raise SaveError("not a Wasteland Rider save")
+    if blob[len(SAVE_MAGIC)] > SAVE_VERSION:
+        raise SaveError("save was written by a newer version of the game")
+    return _SaveUnpickler(io.BytesIO(blob[header:])).load()
+
+
+def check_slot(slot: str):
+    if not SLOT_NAME.match(slot):
+        raise SaveError(f"invalid save slot {slot!r} - use letters, numbers, - and _")
+
+
+def slot_path(slot: str = DEFAULT_SLOT, directory: str = ".", player: str = DEFAULT_PLAYER) -> str:
+    check_slot(slot)
+    filename = "wasteland_save.sav" if slot == DEFAULT_SLOT else f"wasteland_save_{slot}.sav"
+    if player != DEFAULT_PLAYER:
+        check_slot(player)
+        filename = f"{player}_{filename}"
+    return os.path.join(directory, filename)
+
+
+def write_atomic(path: str, blob: bytes):
+    """Write to a temp file in the same directory, then rename over the target"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".wasteland_save_", dir=directory)
+    try:
+        os.chmod(temp_path, 0o666 & ~_UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class SaveBackend:
+    """Where save slots live. Backends store opaque encode_save() blobs keyed by
+    player and slot; load() raises FileNotFoundError for a slot never saved."""
+
+    def save(self, player: str, slot: str, blob: bytes):
+        raise NotImplementedError
+
+    def load(self, player: str, slot: str) -> bytes:
+        raise NotImplementedError
+
+    def flush(self):
+        """Block until every save() so far is durable"""
+
+    def close(self):
+        self.flush()
+
+
+class FileSaveBackend(SaveBackend):
+    """One file per slot in a directory - the single-player default"""
+
+    def __init__(self, directory: str = "."):
+        self.directory = directory
+
+    def save(self, player: str, slot: str, blob: bytes):
+        write_atomic(slot_path(slot, self.directory, player), blob)
+
+    def load(self, player: str, slot: str) -> bytes:
+        with open(slot_path(slot, self.directory, player), "rb") as f:
+            return f.read()
+
+
+class DiscardSaveBackend(SaveBackend):
+    """Accepts saves and forgets them - for replays, which must not touch real slots"""
+
+    def save(self, player: str, slot: str, blob: bytes):
+        check_slot(slot)
+
+    def load(self, player: str, slot: str) -> bytes:
+        raise FileNotFoundError(f"no save for {player}/{slot}")
+
+
+class MemorySaveBackend(SaveBackend):
+    """Slots that live as long as the backend - for scripted runs, which must not share files"""
+
+    def __init__(self):
+        self.slots: Dict[Tuple[str, str], bytes] = {}
+
+    def save(self, player: str, slot: str, blob: bytes):
+        check_slot(slot)
+        self.slots[player, slot] = blob
+
+    def load(self, player: str, slot: str) -> bytes:
+        try:
+            return self.slots[player, slot]
+        except KeyError:
+            raise FileNotFoundError(f"no save for {player}/{slot}") from None
+
+
+class ConnectionPool:
+    """A fixed set of SQLite connections shared by threads"""
+
+    def __init__(self, path: str, size: int):
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all = []
+        for _ in range(size):
+            connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._all.append(connection)
+            self._idle.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        for connection in self._all:
+            connection.close()
+
+
+class SQLiteSaveBackend(SaveBackend):
+    """Saves for many players in one WAL-mode database. save() only queues the
+    blob; a writer thread commits everything queued so far in one transaction."""
+
+    def __init__(self, path: str, pool_size: int = 4, batch_size: int = 1000, flush_interval: float = 0.05):
+        self.pool = ConnectionPool(path, pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        with self.pool.connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS saves ("
+                               "player TEXT NOT NULL, slot TEXT NOT NULL, data BLOB NOT NULL, "
+                               "saved_at REAL NOT NULL, PRIMARY KEY (player, slot)) WITHOUT ROWID")
+
+        # Latest blob per (player, slot) not yet committed; a newer save replaces an older one
+        self._pending: Dict[Tuple[str, str], bytes] = {}
+        self._writing: Dict[Tuple[str, str], bytes] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._written = threading.Condition(self._lock)
+        self._closed = False
+        self.batches = 0
+        self.error: Optional[Exception] = None  # Why the last batch failed, until one succeeds
+        self._writer = threading.Thread(target=self._write_behind, name="save-writer", daemon=True)
+        self._writer.start()
+
+    def save(self, player: str, slot: str, blob: bytes):
+        check_slot(slot)
+        with self._lock:
+            if self._closed:
+                raise SaveError("save store is closed")
+            self._pending[(player, slot)] = blob
+            if len(self._pending) >= self.batch_size:
+                self._wake.notify()
+
+    def load(self, player: str, slot: str) -> bytes:
+        check_slot(slot)
+        key = (player, slot)
+        with self._lock:
+            # Read your own writes, even before the writer thread commits them
+            blob = self._pending.get(key) or self._writing.get(key)
+        if blob is not None:
+            return blob
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT data FROM saves WHERE player = ? AND slot = ?", key).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"no save for {player}/{slot}")
+        return row[0]
+
+    def _write_behind(self):
+        while True:
+            with self._lock:
+                if len(self._pending) < self.batch_size and not self._closed:
+                    # Give other sessions a moment to add their saves to this batch
+                    self._wake.wait(self.flush_interval)
+                if not self._pending:
+                    if self._closed:
+                        return
+                    continue
+                self._writing, self._pending = self._pending, {}
+                batch = self._writing
+
+            try:
+                self._commit(batch)
+            except Exception as e:  # Anything escaping would end the thread, and flush() would wait forever
+                with self._lock:
+                    for key, blob in batch.items():
+                        self._pending.setdefault(key, blob)  # Unless a newer save arrived meanwhile
+                    self._writing = {}
+                    self.error = e
+                    self._written.notify_all()
+                    if self._closed:
+                        return  # That was the last try; close() reports the loss
+                time.sleep(self.flush_interval)
+                continue
+
+            with self._lock:
+                self._writing = {}
+                self.batches += 1
+                self.error = None
+                self._written.notify_all()
+
+    def _commit(self, batch: Dict[Tuple[str, str], bytes]):
+        now = time.time()
+        with self.pool.connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                connection.executemany("INSERT OR REPLACE INTO saves (player, slot, data, saved_at) "
+                                       "VALUES (?, ?, ?, ?)",
+                                       [(player, slot, blob, now) for (player, slot), blob in batch.items()])
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def flush(self):
+        with self._lock:
+            while self._pending or self._writing:
+                if self.error is not None:
+                    raise SaveError(f"saves are not being written: {self.error}") from self.error
+                self._wake.notify()
+                self._written.wait()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._writer.join()
+        self.pool.close()
+        if self._pending:
+            raise SaveError(f"{len(self._pending)} saves were never written: {self.error}") from self.error
+
+
+def save_state(state: Dict[str, Any], slot: str = DEFAULT_SLOT, directory: str = ".",
+               backend: Optional[SaveBackend] = None, player: str = DEFAULT_PLAYER):
+    backend = backend or FileSaveBackend(directory)
+    backend.save(player, slot, encode_save(state))
+
+
+def load_state(slot: str = DEFAULT_SLOT, directory: str = ".",
+               backend: Optional[SaveBackend] = None, player: str = DEFAULT_PLAYER) -> Dict[str, Any]:
+    """Read a slot; a single player's default slot falls back to the old full-JSON save file"""
+    if backend is None:
+        backend = FileSaveBackend(directory)
+    try:
+        return decode_save(backend.load(player, slot))
+    except FileNotFoundError:
+        if slot != DEFAULT_SLOT or player != DEFAULT_PLAYER or not isinstance(backend, FileSaveBackend):
+            raise
+    with open(os.path.join(backend.directory, LEGACY_SAVE_FILE), "r") as f:
+        return json.load(f)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Script Runner
+Plays command scripts with no banner and no prompts: every script is a fresh
+seeded session fed one command per line ('#' lines are comments). Prints the
+game's text, or with --jsonl one JSON object per command (--events adds the
+command's typed events, see events.py). Many scripts are
+spread across a process pool and their output is kept in order.
+Usage: python scripts.py qa/*.txt --jsonl --workers 8
+       cat commands.txt | python scripts.py -
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional, Sequence, TextIO, Tuple
+
+import saves
+from events import event_record
+from game import WastelandEngine, World
+from output import BufferedSink
+
+# One encoder for every record; json.dumps() with options builds a new one per call
+encode = json.JSONEncoder(ensure_ascii=False, check_circular=False).encode
+
+
+def read_script(path: str) -> List[str]:
+    """A script's lines, in one read; '-' is stdin"""
+    if path == "-":
+        return sys.stdin.read().splitlines()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def run_script(name: str, commands: Sequence[str], seed: int, world: World, jsonl: bool = False,
+               text: bool = True, events: bool = False) -> Tuple[str, int]:
+    """Play one script; returns its rendered output and how many commands ran.
+    A script stops early when a command ends the game or quits."""
+    sink = BufferedSink() if text else None
+    engine = WastelandEngine(seed=seed, headless=sink is None, world=world, output=sink,
+                             save_backend=saves.MemorySaveBackend(), record_events=events)
+    records = []
+    ran = 0
+    for number, command in enumerate(commands, 1):
+        if command.startswith("#"):
+            continue
+        going = engine.process_command(command)
+        ran += 1
+        if jsonl:
+            rider = engine.rider
+            record = {"script": name, "line": number, "command": command, "state": engine.state.value,
+                      "location": rider.current_location, "fuel": rider.fuel, "bike": rider.bike_condition,
+                      "health": rider.health}
+            if sink is not None:
+                record["output"] = sink.take()
+            if events:
+                record["events"] = [event_record(event) for event in engine.take_events()]
+            records.append(encode(record) + "\n")
+        if not going:
+            break
+    if jsonl:
+        return "".join(records), ran
+    return f"==> {name} <==\n{sink.take()}\n", ran
+
+
+def run_chunk(jobs: Sequence[Tuple[str, int]], jsonl: bool, text: bool,
+              world_file: Optional[str], events: bool = False) -> Tuple[str, int]:
+    """Several scripts in one worker task, so small scripts don't drown in pool overhead"""
+    world = World.load(world_file)
+    rendered = []
+    ran = 0
+    for path, seed in jobs:
+        output, commands = run_script(path, read_script(path), seed, world, jsonl, text, events)
+        rendered.append(output)
+        ran += commands
+    return "".join(rendered), ran
+
+
+def run_scripts(paths: Sequence[str], out: TextIO, seed: int = 0, workers: int = 1, jsonl: bool = False,
+                text: bool = True, world_file: Optional[str] = None, events: bool = False) -> int:
+    """Play every script (script i is seeded seed + i) and write their output to `out`
+    in the order given. Returns the number of commands run."""
+    world = World.load(world_file)  # Parsed here, so forked workers start with it
+    jobs = [(path, seed + number) for number, path in enumerate(paths)]
+    ran = 0
+    if workers == 1 or len(jobs) < 2 or "-" in paths:
+        for path, script_seed in jobs:
+            output, commands = run_script(path, read_script(path), script_seed, world, jsonl, text, events)
+            out.write(output)
+            ran += commands
+        return ran
+
+    # A few chunks per worker keeps the pool busy when some scripts run long
+    size = -(-len(jobs) // (workers * 4))
+    chunks = [jobs[start:start + size] for start in range(0, len(jobs), size)]
+    run = partial(run_chunk, jsonl=jsonl, text=text, world_file=world_file, events=events)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for output, commands in pool.map(run, chunks):
+            out.write(output)
+            ran += commands
+    return ran
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Wasteland Rider command scripts without prompts")
+    parser.add_argument("scripts", nargs="+", help="Script files, one command per line; '-' reads stdin")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first script; the next gets seed + 1...")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--world", help="World file (JSON or packed) to play instead of wasteland.json")
+    parser.add_argument("--jsonl", action="store_true", help="Print one JSON object per command instead of text")
+    parser.add_argument("--no-text", action="store_true", help="With --jsonl, leave out each command's text")
+    parser.add_argument("--events", action="store_true", help="With --jsonl, add each command's typed events")
+    args = parser.parse_args()
+    if (args.no_text or args.events) and not args.jsonl:
+        parser.error("--no-text and --events need --jsonl")
+    if args.scripts.count("-") > 1:
+        parser.error("stdin can only be read once")
+
+    start = time.perf_counter()
+    ran = run_scripts(args.scripts, sys.stdout, args.seed, args.workers, args.jsonl, not args.no_text, args.world,
+                      args.events)
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    print(f"🏍️  {len(args.scripts)} scripts, {ran:,} commands in {elapsed:.2f}s - "
+          f"{len(args.scripts) / elapsed:,.0f} scripts/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Multiplayer Telnet Server
+One asyncio server hosts every rider: each connection gets its own
+WastelandEngine, all of them sharing a single loaded World. With --api,
+connections speak the JSON-lines API of api.py instead of text.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import re
+import signal
+import time
+from typing import Optional, Set
+
+import saves
+from api import ApiSession
+from game import COMMAND_VERBS, WORLD_FILE, GameState, WastelandEngine, World
+from hotreload import WorldReloader
+from journal import Journal
+from metrics import Metrics
+from output import BufferedSink
+
+PROMPT = "\n🏍️ > "
+
+# Telnet clients open with option negotiation (IAC DO/DONT/WILL/WONT x, IAC cmd)
+TELNET_COMMANDS = re.compile(rb"\xff[\xfb-\xfe].|\xff[\xf0-\xfa]", re.DOTALL)
+
+
+class SessionOutput(BufferedSink):
+    """Collects one command's text for the client's socket"""
+
+    def take_bytes(self) -> bytes:
+        return self.take().replace("\n", "\r\n").encode("utf-8")
+
+
+class Session:
+    def __init__(self, world: World, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 save_backend: Optional[saves.SaveBackend] = None, journal: Optional[Journal] = None,
+                 world_file: Optional[str] = None, metrics: Optional[Metrics] = None,
+                 engines: Optional[Set[WastelandEngine]] = None, riders: Optional[Set[str]] = None):
+        self.reader = reader
+        self.writer = writer
+        self.journal = journal
+        self.world_file = world_file
+        self.output = SessionOutput()
+        self.save_backend = save_backend
+        self.engines = engines if engines is not None else set()  # The server's live engines, for hot reloads
+        self.riders = riders if riders is not None else set()  # Names in play, so no two connections share one
+        self.player: Optional[str] = None  # The name this connection claimed
+        # Without a shared store every connection keeps its own slots: the file default would
+        # put every rider in the same files in the server's directory
+        self.engine = self.new_engine(world, save_backend if save_backend is not None else saves.MemorySaveBackend(),
+                                      metrics)
+
+    def new_engine(self, world: World, save_backend: Optional[saves.SaveBackend],
+                   metrics: Optional[Metrics]) -> WastelandEngine:
+        return WastelandEngine(world=world, output=self.output, save_backend=save_backend, metrics=metrics)
+
+    async def send(self, prompt: bool = True):
+        if prompt:
+            self.output(PROMPT, end="")
+        self.writer.write(self.output.take_bytes())
+        await self.writer.drain()
+
+    async def read_command(self, idle_timeout: Optional[float]) -> Optional[str]:
+        """Next line from the client, or None once it hangs up"""
+        line = await asyncio.wait_for(self.reader.readline(), idle_timeout)
+        if not line:
+            return None
+        return TELNET_COMMANDS.sub(b"", line).decode("utf-8", "ignore")
+
+    async def login(self, idle_timeout: Optional[float]) -> bool:
+        """With a shared save store, riders name themselves so their slots find them again"""
+        for _ in range(3):
+            self.output("🏍️  What do they call you, rider? (letters, numbers, - and _)")
+            await self.send()
+            name = await self.read_command(idle_timeout)
+            if name is None:
+                return False
+            name = name.strip().lower()
+            if name in self.riders or name == saves.DEFAULT_PLAYER:
+                self.output("🏍️  Someone is already riding under that name.")
+            elif saves.SLOT_NAME.match(name):
+                self.riders.add(name)
+                self.player = self.engine.player = name
+                return True
+        return False
+
+    async def play(self, idle_timeout: Optional[float]):
+        self.engines.add(self.engine)
+        try:
+            await self.play_session(idle_timeout)
+        finally:
+            self.engines.discard(self.engine)
+            if self.player is not None:
+                self.riders.discard(self.player)
+
+    async def play_session(self, idle_timeout: Optional[float]):
+        if self.save_backend is not None and not await self.login(idle_timeout):
+            return
+        self.engine.show_intro()
+        if self.journal is not None:
+            self.journal.attach(self.engine, self.world_file, self.engine.player)
+        await self.send()
+
+        while self.engine.state == GameState.PLAYING:
+            try:
+                command = await self.read_command(idle_timeout)
+            except asyncio.TimeoutError:
+                self.output("\n🏍️ The wind picks up and you ride on alone... (idle timeout)")
+                break
+            if command is None:
+                return  # Client hung up
+            if not self.engine.process_command(command):
+                break
+            await self.send()
+
+        self.engine.show_ending()
+        await self.send(prompt=False)
+
+
+class ApiConnection(Session):
+    """A bot or front end speaking JSON lines: no prompts and no prose, one reply per line"""
+
+    def __init__(self, *args, compact: bool = False, **kwargs):
+        self.compact = compact
+        super().__init__(*args, **kwargs)
+
+    def new_engine(self, world: World, save_backend: Optional[saves.SaveBackend],
+                   metrics: Optional[Metrics]) -> WastelandEngine:
+        # Names only need claiming when the slots they pick are shared
+        self.api = ApiSession(world, save_backend=save_backend, metrics=metrics, compact=self.compact,
+                              riders=self.riders if self.save_backend is not None else None)
+        return self.api.engine
+
+    async def reply(self, text: str):
+        self.writer.write(text.encode("utf-8"))
+        await self.writer.drain()
+
+    async def play_session(self, idle_timeout: Optional[float]):
+        if self.journal is not None:
+            self.journal.attach(self.engine, self.world_file, self.api.player)  # No name until one is sent
+        await self.reply(self.api.start())
+        going = True
+        while going:
+            try:
+                line = await self.read_command(idle_timeout)
+            except asyncio.TimeoutError:
+                break
+            if line is None:
+                return  # Client hung up
+            reply, going = self.api.handle(line)
+            if self.api.player != self.player:
+                self.player = self.api.player
+                if self.journal is not None:
+                    self.journal.named(self.player)
+            await self.reply(reply)
+
+
+class GameServer:
+    def __init__(self, world: World, idle_timeout: Optional[float] = None,
+                 save_backend: Optional[saves.SaveBackend] = None, journal_dir: Optional[str] = None,
+                 world_file: Optional[str] = None, metrics: Optional[Metrics] = None,
+                 api: bool = False, compact: bool = False):
+        self.world = world
+        self.idle_timeout = idle_timeout
+        self.save_backend = save_backend
+        self.journal_dir = journal_dir
+        self.world_file = world_file
+        self.metrics = metrics  # Shared by every session, so it covers the whole server
+        self.sessions = 0
+        self.session_ids = itertools.count(1)
+        self.engines: Set[WastelandEngine] = set()
+        self.riders: Set[str] = set()
+        self.reloader: Optional[WorldReloader] = None
+        self.api = api  # JSON-lines connections instead of telnet text
+        self.compact = compact
+
+    def new_journal(self) -> Optional[Journal]:
+        if self.journal_dir is None:
+            return None
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self.session_ids)}.journal"
+        return Journal(os.path.join(self.journal_dir, name))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions += 1
+        journal = self.new_journal()
+        try:
+            if self.api:
+                session = ApiConnection(self.world, reader, writer, self.save_backend, journal, self.world_file,
+                                        self.metrics, self.engines, self.riders, compact=self.compact)
+            else:
+                session = Session(self.world, reader, writer, self.save_backend,
+                                  journal, self.world_file, self.metrics, self.engines, self.riders)
+            await session.play(self.idle_timeout)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.sessions -= 1
+            if journal is not None:
+                journal.close()
+            writer.close()
+
+    def watch_world(self, reload_interval: float):
+        """Hot reload the world file into every live session whenever it changes"""
+        self.reloader = WorldReloader(self.world_file or WORLD_FILE, self.world, lambda: self.engines, self.metrics)
+        self.reload_interval = reload_interval
+
+    async def serve(self, host: str, port: int, backlog: int = 1024):
+        server = await asyncio.start_server(self.handle, host, port, backlog=backlog)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"🏍️  Wasteland Rider server listening on {addresses}")
+        watcher = None
+        if self.reloader is not None:
+            watcher = asyncio.ensure_future(self.reloader.watch(self.reload_interval))
+        try:
+            # Stop cleanly on SIGTERM too, so queued saves get written
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, AttributeError):  # Windows
+            pass
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+                self.reloader.close()
+            if self.save_backend is not None:
+                try:
+                    self.save_backend.close()
+                except saves.SaveError as e:
+                    print(f"⚠️  {e}")
+            if self.metrics is not None and self.metrics.textfile:
+                self.metrics.export()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Wasteland Rider over telnet")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=2087)
+    parser.add_argument("--world", help="World file to host, JSON or packed (defaults to wasteland.json)")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="Disconnect riders idle for this many seconds")
+    parser.add_argument("--backlog", type=int, default=1024)
+    parser.add_argument("--save-db", help="SQLite database shared by every rider's save slots; "
+                                          "riders are asked their name on connect")
+    parser.add_argument("--journal-dir", help="Record each session's commands here, for replay with journal.py")
+    parser.add_argument("--metrics-file", help="Time every command and write Prometheus metrics to this file")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="Seconds between metrics writes")
+    parser.add_argument("--reload", action="store_true", help="Watch the world file and patch edits into live "
+                                                              "sessions (JSON worlds only)")
+    parser.add_argument("--reload-interval", type=float, default=2.0, help="Seconds between checks of the world file")
+    parser.add_argument("--api", action="store_true", help="Speak JSON lines (see api.py) instead of text, "
+                                                           "for bots and front ends")
+    parser.add_argument("--compact", action="store_true", help="With --api, events as arrays of fields")
+    args = parser.parse_args()
+    if args.compact and not args.api:
+        parser.error("--compact needs --api")
+
+    # Parsed once; every session copies only the mutable parts
+    world = World.load(args.world)
+    save_backend = saves.SQLiteSaveBackend(args.save_db) if args.save_db else None
+    try:
+        if args.journal_dir:
+            os.makedirs(args.journal_dir, exist_ok=True)
+        metrics = Metrics(COMMAND_VERBS, args.metrics_file, args.metrics_interval) if args.metrics_file else None
+        server = GameServer(world, args.idle_timeout, save_backend, args.journal_dir,
+                            os.path.abspath(args.world) if args.world else None, metrics, args.api, args.compact)
+        if args.reload:
+            server.watch_world(args.reload_interval)
+        asyncio.run(server.serve(args.host, args.port, args.backlog))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n🏍️ Server shutting down. Safe travels!")
+
+
+if __name__ == "__main__":
+    main()
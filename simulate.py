@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Headless Batch Simulator
+Runs many seeded playthroughs of WastelandEngine across a process pool
+and aggregates win/death/fuel statistics for balancing wasteland.json
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from game import GameState, WastelandEngine, World
+
+
+@dataclass
+class BatchStats:
+    runs: int = 0
+    wins: int = 0
+    deaths: int = 0
+    stalled: int = 0  # Still riding when the command budget ran out
+    out_of_fuel: int = 0
+    broken_down: int = 0
+    commands: int = 0
+    fuel_total: int = 0
+    fuel_min: int = 100
+    fuel_max: int = 0
+    win_fuel_total: int = 0
+    fuel_histogram: List[int] = field(default_factory=lambda: [0] * 101)  # Runs ending on each fuel level
+
+    def record(self, engine: WastelandEngine, commands: int):
+        rider = engine.rider
+        self.runs += 1
+        self.commands += commands
+        self.fuel_total += rider.fuel
+        self.fuel_min = min(self.fuel_min, rider.fuel)
+        self.fuel_max = max(self.fuel_max, rider.fuel)
+        self.fuel_histogram[min(100, max(0, rider.fuel))] += 1
+
+        if engine.state == GameState.WON:
+            self.wins += 1
+            self.win_fuel_total += rider.fuel
+        elif engine.state == GameState.GAME_OVER or stranded(engine):
+            self.deaths += 1
+            if rider.fuel > 0 and rider.bike_condition <= 0:
+                self.broken_down += 1
+            else:
+                self.out_of_fuel += 1  # Including riders left without enough to ride on
+        else:
+            self.stalled += 1
+
+    def merge(self, other: "BatchStats"):
+        self.runs += other.runs
+        self.wins += other.wins
+        self.deaths += other.deaths
+        self.stalled += other.stalled
+        self.out_of_fuel += other.out_of_fuel
+        self.broken_down += other.broken_down
+        self.commands += other.commands
+        self.fuel_total += other.fuel_total
+        self.fuel_min = min(self.fuel_min, other.fuel_min)
+        self.fuel_max = max(self.fuel_max, other.fuel_max)
+        self.win_fuel_total += other.win_fuel_total
+        for bucket, count in enumerate(other.fuel_histogram):
+            self.fuel_histogram[bucket] += count
+
+    def fuel_quantile(self, share: float) -> int:
+        """The final fuel that `share` of runs ended at or below"""
+        wanted = max(1, math.ceil(share * self.runs))
+        seen = 0
+        for fuel, count in enumerate(self.fuel_histogram):
+            seen += count
+            if seen >= wanted:
+                return fuel
+        return 0
+
+    def summary(self) -> Dict[str, float]:
+        runs = max(1, self.runs)
+        return {
+            "runs": self.runs,
+            "win_rate": self.wins / runs,
+            "death_rate": self.deaths / runs,
+            "stall_rate": self.stalled / runs,
+            "out_of_fuel": self.out_of_fuel,
+            "broken_down": self.broken_down,
+            "avg_commands": self.commands / runs,
+            "avg_final_fuel": self.fuel_total / runs,
+            "avg_win_fuel": self.win_fuel_total / max(1, self.wins),
+            "min_final_fuel": self.fuel_min if self.runs else 0,
+            "p10_final_fuel": self.fuel_quantile(0.1),
+            "p50_final_fuel": self.fuel_quantile(0.5),
+            "p90_final_fuel": self.fuel_quantile(0.9),
+            "max_final_fuel": self.fuel_max,
+        }
+
+
+def stranded(engine: WastelandEngine) -> bool:
+    """Out of the game for good while still PLAYING: a failed ride never reaches the engine's
+    game-over check, so a rider who can't pay the way out just sits there"""
+    rider = engine.rider
+    if rider.fuel <= 0 or rider.bike_condition <= 0:
+        return True
+    location = engine.get_current_location()
+    if rider.fuel >= location.fuel_cost:
+        return False
+    items = engine.items
+    return not any(items[item_id].fuel_value > 0 for item_id in rider.inventory) and \
+        not any(items[item_id].fuel_value > 0 and items[item_id].takeable for item_id in location.items)
+
+
+def random_policy(engine: WastelandEngine, rng: random.Random) -> str:
+    """Pick a plausible next command the way a cautious new rider would"""
+    rider = engine.rider
+    location = engine.get_current_location()
+
+    if rider.fuel < 20:
+        for item_id in rider.inventory:
+            if engine.items[item_id].fuel_value > 0:
+                return f"refuel {item_id}"
+    if rider.bike_condition < 50:
+        for item_id in rider.inventory:
+            if engine.items[item_id].repair_value > 0:
+                return f"repair {item_id}"
+    if rider.health < 50:
+        for item_id in rider.inventory:
+            if engine.items[item_id].food_value > 0:
+                return f"use {item_id}"
+
+    for item_id in location.items:
+        if engine.items[item_id].takeable:
+            return f"take {item_id}"
+
+    if location.exits:
+        return f"ride {rng.choice(list(location.exits))}"
+    return "rest"
+
+
+def play_once(seed: int, script: Optional[Sequence[str]] = None,
+              max_commands: int = 200, world: Optional[World] = None) -> Tuple[WastelandEngine, int]:
+    """Play one headless game of `world` (wasteland.json by default); follow the script
+    if given, otherwise the random policy. Returns the finished engine and the number of
+    commands played."""
+    engine = WastelandEngine(seed=seed, headless=True, world=world)
+    policy_rng = random.Random(f"policy-{seed}")
+    engine.display_location()
+
+    commands = 0
+    while engine.state == GameState.PLAYING and commands < max_commands:
+        if script is not None:
+            if commands >= len(script):
+                break
+            command = script[commands]
+        else:
+            command = random_policy(engine, policy_rng)
+        commands += 1
+        if not engine.process_command(command) or stranded(engine):
+            break
+
+    return engine, commands
+
+
+def run_shard(seeds: range, script: Optional[Sequence[str]] = None,
+              max_commands: int = 200, world: Optional[World] = None) -> BatchStats:
+    stats = BatchStats()
+    for seed in seeds:
+        engine, commands = play_once(seed, script, max_commands, world)
+        stats.record(engine, commands)
+    return stats
+
+
+def run_batch(runs: int, seed: int = 0, workers: Optional[int] = None,
+              script: Optional[Sequence[str]] = None,
+              max_commands: int = 200) -> BatchStats:
+    """Shard `runs` seeded playthroughs across a process pool and merge the results"""
+    if runs <= 0:
+        return BatchStats()
+    workers = workers or os.cpu_count() or 1
+    # A few shards per worker keeps the pool busy if some runs go long
+    shard_count = min(runs, workers * 4) or 1
+    shard_size = -(-runs // shard_count)
+    shards = [range(start, min(start + shard_size, seed + runs))
+              for start in range(seed, seed + runs, shard_size)]
+
+    total = BatchStats()
+    if workers == 1:
+        for shard in shards:
+            total.merge(run_shard(shard, script, max_commands))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, shard, script, max_commands) for shard in shards]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Wasteland Rider playthroughs")
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-commands", type=int, default=200)
+    parser.add_argument("--script", help="File with one command per line to play instead of the random policy")
+    parser.add_argument("--scaling", action="store_true",
+                        help="Repeat the batch with 1, 2, 4... workers and report runs/sec per core")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    script = None
+    if args.script:
+        with open(args.script, "r") as f:
+            script = [line.strip() for line in f if line.strip()]
+
+    worker_counts = [args.workers]
+    if args.scaling:
+        worker_counts = []
+        count = 1
+        while count < args.workers:
+            worker_counts.append(count)
+            count *= 2
+        worker_counts.append(args.workers)
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        stats = run_batch(args.runs, args.seed, workers, script, args.max_commands)
+        elapsed = time.perf_counter() - start
+        rate = stats.runs / elapsed
+        print(f"\n🏍️  {stats.runs} runs on {workers} worker(s) in {elapsed:.2f}s "
+              f"- {rate:,.0f} runs/sec, {rate / workers:,.0f} runs/sec/core")
+        for key, value in stats.summary().items():
+            print(f"   {key:>16}: {value:.3f}" if isinstance(value, float) else f"   {key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Solver
+Finds the fewest commands that can reach los_angeles and the line most likely
+to get there. A state packs the rider (location, fuel, bike, optionally health)
+and where each useful item is - still on the ground, or how many are in the pack -
+into one int. A* finds the shortest ride that could win; depth-limited expectimax
+scores survival, with rough-terrain damage, encounters and resting as chance
+nodes, memoised in a size-capped transposition table. Root moves are scored
+across a process pool.
+
+A run counts as lost as soon as fuel or bike hits 0 anywhere but los_angeles
+(the engine ends it at the next command that isn't a move or an item use).
+Health can't end a run, so it is left out of the state unless --track-health.
+Timed world events aren't modelled: the solver plays as if the clock never fires.
+Looks at most MAX_HORIZON commands ahead; the search recurses once per command.
+Usage: python solver.py [--world my_world.json] [--horizon 40] [--workers 4] [--memory-mb 512]
+"""
+
+import argparse
+import heapq
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+from game import COMMANDS, GOAL_LOCATION, WastelandEngine, World
+from routes import MAX_TERRAIN_DAMAGE, ROUGH_TERRAIN_COST
+
+TT_ENTRY_BYTES = 112  # A dict slot, an int key and a float, give or take
+_STAT_BITS = 7  # fuel, bike and health are 0-100
+_STEP_BITS = 8  # Transposition entries are (state << _STEP_BITS) | steps left
+MAX_HORIZON = (1 << _STEP_BITS) - 1  # More steps would spill into the state bits
+
+# (probability, fuel lost, bike lost, health lost)
+Outcome = Tuple[float, int, int, int]
+
+
+class GameModel:
+    """The rules of one World, over packed int states. Only items that can help -
+    fuel, repairs, and food when health is tracked - are followed; dropping
+    is never worth a command, so items only go from the ground to the pack to gone."""
+
+    def __init__(self, world: World, track_health: bool = False):
+        compact = world.compact
+        self.world = world
+        self.track_health = track_health
+        self.location_ids = compact.location_ids
+        self.goal = compact.location_numbers[GOAL_LOCATION]
+
+        # Low bits: location, fuel, bike, health; then a bit per item on the ground; then pack counts
+        self.location_bits = max(1, (len(self.location_ids) - 1).bit_length())
+        self.location_mask = (1 << self.location_bits) - 1
+        self.fuel_shift = self.location_bits
+        self.bike_shift = self.fuel_shift + _STAT_BITS
+        self.health_shift = self.bike_shift + _STAT_BITS
+        self.rider_bits = self.health_shift + (_STAT_BITS if track_health else 0)
+
+        useful = [item_id for item_id, item in world.items.items()
+                  if item.fuel_value > 0 or item.repair_value > 0 or (track_health and item.food_value > 0)]
+        self.item_ids = useful
+        self.item_numbers = {item_id: number for number, item_id in enumerate(useful)}
+        self.ground: List[Tuple[int, int]] = []  # (location, item number) per item lying in the world
+        self.ground_at: List[List[int]] = [[] for _ in self.location_ids]
+        for location, location_id in enumerate(self.location_ids):
+            for item_id in world.locations[location_id].items:
+                number = self.item_numbers.get(item_id)
+                if number is not None and world.items[item_id].takeable:
+                    self.ground_at[location].append(len(self.ground))
+                    self.ground.append((location, number))
+        self.take_commands = [f"take {useful[number]}" for _, number in self.ground]
+        self.ground_shift = self.rider_bits
+        self.pack_shift: List[int] = []
+        self.pack_mask: List[int] = []
+        shift = self.ground_shift + len(self.ground)
+        starting = WastelandEngine(seed=0, headless=True, world=world).rider.inventory
+        for number, item_id in enumerate(useful):
+            most = starting.count(item_id) + sum(1 for _, kind in self.ground if kind == number)
+            bits = max(1, most.bit_length())
+            self.pack_shift.append(shift)
+            self.pack_mask.append((1 << bits) - 1)
+            shift += bits
+        self.state_bits = shift
+
+        self.hops = self._hops_to_goal(compact)
+        self.exits: List[List[Tuple[str, int, int, List[Outcome], List[Outcome]]]] = []
+        for location, location_id in enumerate(self.location_ids):
+            exits = []
+            for direction, target_id in world.locations[location_id].exits.items():
+                target = compact.location_numbers.get(target_id)
+                if target is None or self.hops[target] < 0:
+                    continue  # Undefined, or nowhere the goal can be reached from
+                cost = compact.fuel_cost[location]
+                outcomes = self._ride_outcomes(cost, world.locations[target_id])
+                exits.append((direction, target, cost, outcomes, _pareto_best(outcomes)))
+            exits.sort(key=lambda exit: self.hops[exit[1]])  # Towards the goal first
+            self.exits.append(exits)
+
+    def _hops_to_goal(self, compact) -> List[int]:
+        """Fewest moves from each location to the goal (-1: never), the A* heuristic"""
+        reverse: List[List[int]] = [[] for _ in self.location_ids]
+        for source, targets in enumerate(compact.adjacency):
+            for target in targets:
+                reverse[target].append(source)
+        hops = [-1] * len(self.location_ids)
+        hops[self.goal] = 0
+        queue = deque([self.goal])
+        while queue:
+            location = queue.popleft()
+            for source in reverse[location]:
+                if hops[source] < 0:
+                    hops[source] = hops[location] + 1
+                    queue.append(source)
+        return hops
+
+    def _ride_outcomes(self, cost: int, destination) -> List[Outcome]:
+        """Everything a ride can cost beyond its fuel, merged by effect - mirrors
+        WastelandEngine.move_rider and random_encounter"""
+        terrain = range(1, MAX_TERRAIN_DAMAGE + 1) if cost > ROUGH_TERRAIN_COST else (0,)
+        arrival: Dict[Tuple[int, int, int], float] = {(0, 0, 0): 1.0}
+        table = self.world.encounter_table(destination)
+        if table is not None and table.chance > 0:
+            arrival = {(0, 0, 0): 1.0 - table.chance}
+            for encounter, share in zip(table.encounters, table.probabilities):
+                ranges = [(stat, range(least, most + 1)) for stat, least, most in encounter.effects]
+                combinations = list(product(*(values for _, values in ranges)))
+                for losses in combinations:
+                    lost = {"fuel": 0, "bike": 0, "health": 0}
+                    for (stat, _), loss in zip(ranges, losses):
+                        lost[stat] += loss
+                    effect = (lost["fuel"], lost["bike"], lost["health"] if self.track_health else 0)
+                    arrival[effect] = arrival.get(effect, 0.0) + table.chance * share / len(combinations)
+        outcomes: Dict[Tuple[int, int, int], float] = {}
+        for damage in terrain:
+            for (fuel, bike, health), probability in arrival.items():
+                effect = (cost + fuel, damage + bike, health)
+                outcomes[effect] = outcomes.get(effect, 0.0) + probability / len(terrain)
+        return [(probability, *effect) for effect, probability in outcomes.items() if probability > 0]
+
+    # Packed state fields
+
+    def rider(self, key: int) -> Tuple[int, int, int, int]:
+        """(location, fuel, bike, health)"""
+        health = (key >> self.health_shift) & 127 if self.track_health else 100
+        return key & self.location_mask, (key >> self.fuel_shift) & 127, (key >> self.bike_shift) & 127, health
+
+    def with_rider(self, key: int, location: int, fuel: int, bike: int, health: int) -> int:
+        key = key >> self.rider_bits << self.rider_bits
+        key |= location | fuel << self.fuel_shift | bike << self.bike_shift
+        if self.track_health:
+            key |= health << self.health_shift
+        return key
+
+    def carried(self, key: int, number: int) -> int:
+        return (key >> self.pack_shift[number]) & self.pack_mask[number]
+
+    def key_of(self, engine: WastelandEngine) -> int:
+        """The state of a live engine. Items lying anywhere but where the world put them are ignored."""
+        rider = engine.rider
+        key = self.with_rider(0, engine.world.compact.location_numbers[rider.current_location],
+                              rider.fuel, rider.bike_condition, rider.health)
+        seen: Dict[Tuple[int, int], int] = {}
+        for bit, (location, number) in enumerate(self.ground):
+            nth = seen[location, number] = seen.get((location, number), 0) + 1
+            if engine.locations[self.location_ids[location]].items.count(self.item_ids[number]) >= nth:
+                key |= 1 << (self.ground_shift + bit)
+        for number, item_id in enumerate(self.item_ids):
+            key |= min(rider.inventory.count(item_id), self.pack_mask[number]) << self.pack_shift[number]
+        return key
+
+    def outcome(self, key: int) -> Optional[float]:
+        """1.0 won, 0.0 lost, None still riding"""
+        location, fuel, bike, _ = self.rider(key)
+        if location == self.goal:
+            return 1.0
+        if fuel == 0 or bike == 0:
+            return 0.0
+        return None
+
+    def actions(self, key: int, best_case: bool = False) -> List[Tuple[str, List[Tuple[float, int]]]]:
+        """(command, [(probability, next state)]) for every command worth typing here.
+        With best_case, chance nodes keep only their outcomes that nothing else beats."""
+        location, fuel, bike, health = self.rider(key)
+        actions = []
+        for direction, target, cost, outcomes, best in self.exits[location]:
+            if fuel < cost:
+                continue
+            command = direction if direction in COMMANDS else f"go {direction}"
+            actions.append((command, [
+                (probability, self.with_rider(key, target, max(0, fuel - fuel_lost), max(0, bike - bike_lost),
+                                              max(0, health - health_lost)))
+                for probability, fuel_lost, bike_lost, health_lost in (best if best_case else outcomes)]))
+
+        actions.extend((command, [(1.0, after)]) for command, after in self.item_actions(key))
+        if self.track_health and health < 100:
+            rested = self.rest_outcomes(key)
+            if best_case:
+                rested = [max(rested, key=lambda outcome: self.rider(outcome[1])[3])]
+            actions.append(("rest", rested))
+        return actions
+
+    def item_actions(self, key: int) -> List[Tuple[str, int]]:
+        """(command, next state) for taking and using items - none of them left to chance"""
+        location, fuel, bike, health = self.rider(key)
+        seen = {key}
+        actions = []
+        for bit in self.ground_at[location]:
+            if key >> (self.ground_shift + bit) & 1:
+                number = self.ground[bit][1]
+                after = (key & ~(1 << (self.ground_shift + bit))) + (1 << self.pack_shift[number])
+                if after not in seen:
+                    seen.add(after)
+                    actions.append((self.take_commands[bit], after))
+
+        for number, item_id in enumerate(self.item_ids):
+            if not self.carried(key, number):
+                continue
+            item = self.world.items[item_id]
+            spent = key - (1 << self.pack_shift[number])
+            toolkit = item.name == "Motorcycle Toolkit"  # Never used up; mirrors repair_bike_with/use_item
+            choices = []
+            if item.fuel_value > 0:
+                choices.append(("refuel", self.with_rider(spent, location, min(100, fuel + item.fuel_value),
+                                                          bike, health)))
+            if item.repair_value > 0:
+                choices.append(("repair", self.with_rider(key if toolkit else spent, location, fuel,
+                                                          min(100, bike + item.repair_value), health)))
+            if item.useable:
+                consumed = (item.fuel_value > 0 or item.food_value > 0) and not toolkit
+                choices.append(("use", self.with_rider(
+                    spent if consumed else key, location, min(100, fuel + item.fuel_value),
+                    min(100, bike + item.repair_value),
+                    min(100, health + item.food_value) if self.track_health else health)))
+            for verb, after in choices:
+                if after not in seen:
+                    seen.add(after)
+                    actions.append((f"{verb} {item_id}", after))
+        return actions
+
+    def rest_outcomes(self, key: int) -> List[Tuple[float, int]]:
+        """Mirrors WastelandEngine.rest: 10-20 health back for 2 fuel"""
+        location, fuel, bike, health = self.rider(key)
+        rested: Dict[int, float] = {}
+        for gain in range(10, 21):
+            after = self.with_rider(key, location, max(0, fuel - 2), bike, min(100, health + gain))
+            rested[after] = rested.get(after, 0.0) + 1 / 11
+        return [(probability, after) for after, probability in rested.items()]
+
+
+class BudgetExceeded(Exception):
+    """A search needed more memory than --memory-mb allows"""
+
+
+def _pareto_best(outcomes: List[Outcome]) -> List[Outcome]:
+    """The outcomes no other outcome beats on every loss"""
+    losses = {outcome[1:] for outcome in outcomes}
+    return [outcome for outcome in outcomes
+            if not any(other != outcome[1:] and all(a <= b for a, b in zip(other, outcome[1:])) for other in losses)]
+
+
+class Solver:
+    def __init__(self, model: GameModel, memory_bytes: int = 512 * 2**20):
+        self.model = model
+        self.table: Dict[int, float] = {}
+        self.capacity = max(1024, memory_bytes // TT_ENTRY_BYTES)  # Entries, in the table or A*'s dicts
+        self.expanded = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def fewest_commands(self, start: int) -> Optional[List[str]]:
+        """A* with every chance node going the rider's way; hops to the goal never overestimate"""
+        model = self.model
+        best = {start: 0}
+        parents: Dict[int, Tuple[int, str]] = {}
+        frontier = [(model.hops[start & model.location_mask], 0, start)]
+        while frontier:
+            if len(best) + len(parents) > self.capacity:
+                # Unlike the table, these can't be dropped without losing the way back
+                raise BudgetExceeded(f"the shortest ride needs more than {self.capacity:,} states in memory")
+            _, steps, key = heapq.heappop(frontier)
+            if steps > best[key]:
+                continue
+            if model.outcome(key) == 1.0:
+                line = []
+                while key != start:
+                    key, command = parents[key]
+                    line.append(command)
+                return line[::-1]
+            self.expanded += 1
+            for command, outcomes in model.actions(key, best_case=True):
+                for _, after in outcomes:
+                    if model.outcome(after) == 0.0 or best.get(after, steps + 2) <= steps + 1:
+                        continue
+                    best[after] = steps + 1
+                    parents[after] = (key, command)
+                    heapq.heappush(frontier, (steps + 1 + model.hops[after & model.location_mask], steps + 1, after))
+        return None
+
+    def value(self, key: int, steps: int) -> float:
+        """Chance of winning from `key` within `steps` commands, playing the best command each time"""
+        if steps > MAX_HORIZON:
+            raise ValueError(f"can't look more than {MAX_HORIZON} commands ahead")
+        model = self.model
+        result = model.outcome(key)
+        if result is not None:
+            return result
+        if model.hops[key & model.location_mask] > steps:
+            return 0.0
+        return self._value(key, steps)
+
+    def _value(self, key: int, steps: int) -> float:
+        """value() for a state still riding with the goal in reach. The same commands as
+        GameModel.actions, with rides unrolled here: most of the search is spent on them."""
+        entry = key << _STEP_BITS | steps
+        cached = self.table.get(entry)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        model = self.model
+        self.expanded += 1
+        location, fuel, bike, health = model.rider(key)
+        hops, goal, fuel_shift, bike_shift = model.hops, model.goal, model.fuel_shift, model.bike_shift
+        base = key >> model.rider_bits << model.rider_bits
+        health_bits = health << model.health_shift if model.track_health else 0
+        left = steps - 1
+        best = 0.0
+        for _, target, cost, outcomes, _ in model.exits[location]:
+            if hops[target] > left:
+                break  # Sorted by hops, so no later exit gets there in time either
+            if fuel < cost:
+                continue
+            if target == goal:
+                best = 1.0
+                break
+            score = 0.0
+            for probability, fuel_lost, bike_lost, health_lost in outcomes:
+                fuel_left = fuel - fuel_lost
+                bike_left = bike - bike_lost
+                if fuel_left <= 0 or bike_left <= 0:
+                    continue
+                after = base | target | fuel_left << fuel_shift | bike_left << bike_shift
+                if health_bits:
+                    after |= max(0, health - health_lost) << model.health_shift
+                score += probability * self._value(after, left)
+            if score > best:
+                best = score
+                if best > 1 - 1e-12:
+                    break
+
+        if best < 1 - 1e-12 and hops[location] <= left:
+            for _, after in model.item_actions(key):
+                score = self._value(after, left)
+                if score > best:
+                    best = score
+            if model.track_health and health < 100:
+                score = sum(probability * self.value(after, left) for probability, after in model.rest_outcomes(key))
+                best = max(best, score)
+
+        if len(self.table) >= self.capacity:
+            self.table.clear()  # Over the memory budget; start again rather than grow
+            self.evictions += 1
+        self.table[entry] = best
+        return best
+
+    def score(self, key: int, steps: int, command: str) -> float:
+        """Chance of winning within `steps` commands when the first one is `command`"""
+        for action, outcomes in self.model.actions(key):
+            if action == command:
+                return sum(probability * self.value(after, steps - 1) for probability, after in outcomes)
+        raise ValueError(f"'{command}' isn't worth typing here")
+
+    def best_command(self, key: int, steps: int) -> Tuple[Optional[str], float]:
+        best: Tuple[Optional[str], float] = (None, 0.0)
+        for command, _ in self.model.actions(key):
+            score = self.score(key, steps, command)
+            if score > best[1]:
+                best = (command, score)
+        return best
+
+    def principal_line(self, key: int, steps: int, first: Optional[str] = None) -> List[str]:
+        """The best commands, assuming every chance node takes its likeliest outcome"""
+        line = []
+        while self.model.outcome(key) is None and steps > 0:
+            command = first or self.best_command(key, steps)[0]
+            first = None
+            if command is None:
+                break
+            outcomes = dict(self.model.actions(key))[command]
+            key = max(outcomes)[1]
+            line.append(command)
+            steps -= 1
+        return line
+
+
+# One solver per pool worker, kept across horizons so its transposition table stays warm
+_worker: Optional[Solver] = None
+
+
+def _start_worker(world_file: Optional[str], track_health: bool, memory_bytes: int):
+    global _worker
+    _worker = Solver(GameModel(World.load(world_file), track_health), memory_bytes)
+
+
+def _score_root(key: int, steps: int, command: str) -> Tuple[str, float, List[str], int]:
+    expanded = _worker.expanded
+    score = _worker.score(key, steps, command)
+    return command, score, _worker.principal_line(key, steps, command), _worker.expanded - expanded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the shortest and the safest rides to Los Angeles")
+    parser.add_argument("--world", help="World file (JSON or packed); defaults to wasteland.json")
+    parser.add_argument("--horizon", type=int,
+                        help=f"Most commands to look ahead, up to {MAX_HORIZON} (default: shortest win + 10)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--memory-mb", type=int, default=512, help="Search memory budget, shared by workers")
+    parser.add_argument("--track-health", action="store_true", help="Keep health in the state (it never ends a run)")
+    args = parser.parse_args()
+    if args.horizon is not None and not 1 <= args.horizon <= MAX_HORIZON:
+        parser.error(f"--horizon must be 1-{MAX_HORIZON}")
+
+    world = World.load(args.world)
+    model = GameModel(world, args.track_health)
+    start = model.key_of(WastelandEngine(seed=0, headless=True, world=world))
+    print(f"🗺️  {len(model.location_ids)} locations, {len(model.ground)} useful items on the ground, "
+          f"{model.state_bits}-bit states")
+
+    solver = Solver(model, args.memory_mb * 2**20)
+    began = time.perf_counter()
+    try:
+        shortest = solver.fewest_commands(start)
+    except BudgetExceeded as e:
+        print(f"🧠 Out of memory budget: {e}. Try a bigger --memory-mb.")
+        return
+    elapsed = time.perf_counter() - began
+    if shortest is None:
+        print("💀 No ride reaches Los Angeles, however lucky the rider.")
+        return
+    print(f"🏁 Fewest commands: {len(shortest)} ({solver.expanded:,} states, "
+          f"{solver.expanded / max(elapsed, 1e-9):,.0f} states/sec)")
+    print(f"   {', '.join(shortest)}")
+
+    horizon = args.horizon or min(MAX_HORIZON, len(shortest) + 10)
+    if len(shortest) > MAX_HORIZON:
+        print(f"\n🛡️  The shortest ride is over {MAX_HORIZON} commands; too long to weigh the odds of.")
+        return
+    budget = args.memory_mb * 2**20 // args.workers
+    roots = [command for command, _ in model.actions(start)]
+    print(f"\n{'commands':>9} {'P(win)':>8} {'states':>11} {'states/sec':>11}   first command")
+    best_line: Tuple[float, int, List[str]] = (0.0, horizon, [])
+    with ProcessPoolExecutor(args.workers, initializer=_start_worker,
+                             initargs=(args.world, args.track_health, budget)) as pool:
+        for steps in range(len(shortest), horizon + 1):
+            began = time.perf_counter()
+            results = list(pool.map(_score_root, [start] * len(roots), [steps] * len(roots), roots))
+            elapsed = time.perf_counter() - began
+            command, probability, line, _ = max(results, key=lambda result: result[1])
+            expanded = sum(result[3] for result in results)
+            print(f"{steps:>9} {probability:>8.4f} {expanded:>11,} {expanded / max(elapsed, 1e-9):>11,.0f}   {command}")
+            if probability > best_line[0] + 1e-9:
+                best_line = (probability, steps, line)
+            if probability > 1 - 1e-9:
+                break  # A longer horizon can't do better than certain
+    print(f"\n🛡️  Safest ride: {best_line[0]:.2%} within {best_line[1]} commands, if luck runs average")
+    print(f"   {', '.join(best_line[2])}")
+
+
+if __name__ == "__main__":
+    main()
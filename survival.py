@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Route Survival Odds
+Monte Carlo odds of riding a fixed route, a million riders at a time. The
+route is compiled once into per-leg arrays - fuel cost, rough terrain, the
+arrival's encounter table, and the timed events that catch the rider on the
+way - then every rider rides each leg together as a handful of NumPy array
+operations, with no Python loop over riders. Reports how many arrive, die or
+are stranded short of fuel, and the spread of fuel, bike and health on arrival.
+The rules mirror WastelandEngine.move_rider: a rider who can't afford a leg
+is stranded, and reaching los_angeles wins whatever the rider has left. As in
+solver.py, a ride is lost as soon as fuel or bike hits 0 anywhere else (the
+engine ends it at the next command that isn't a move), and health never ends
+it. Riders set off at tick 0, as a new game does; of the timed events, only
+weather (evaporation, storms) and patrols touch their stats.
+NumPy is only needed here - the game itself never imports it.
+Usage: python survival.py [destination] [--from dc_ruins] [--riders 1000000]
+       python survival.py --all            (every location's cheapest route to los_angeles)
+       python survival.py --check 20000    (compare with that many scalar engine rides)
+"""
+
+import argparse
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from clock import TICKS_PER_COMMAND, Scheduler
+from encounters import EFFECTS
+from game import GOAL_LOCATION, TIMED_EVENTS, GameState, Rider, WastelandEngine, World
+from routes import MAX_TERRAIN_DAMAGE, ROUGH_TERRAIN_COST
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only this module needs it
+    np = None
+
+STATS = tuple(EFFECTS)  # Effect columns: bike, health, fuel
+BATCH_SIZE = 1_000_000  # Riders simulated at once; bigger runs are done in batches of this many
+ARRIVED, OUT_OF_FUEL, BROKEN_DOWN, STRANDED = range(4)
+OUTCOMES = ("arrived", "out_of_fuel", "broken_down", "stranded")
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("survival odds need NumPy: pip install numpy")
+
+
+@dataclass
+class CompiledRoute:
+    """One route as arrays, a row per leg"""
+    path: List[str]
+    directions: List[str]
+    fuel_cost: "np.ndarray"  # Of leaving each leg's start
+    rough: "np.ndarray"  # Whether leaving it can damage the bike
+    encounter_chance: "np.ndarray"  # Of an encounter on arrival; 0 where there's no table
+    encounter_keep: List["np.ndarray"]  # The arrival's encounters.AliasTable, as arrays
+    encounter_alias: List["np.ndarray"]
+    encounter_least: List["np.ndarray"]  # (encounter, stat) least lost, columns in STATS order
+    encounter_spread: List["np.ndarray"]  # How many different losses each can roll: most - least + 1
+    timed_effects: List[Tuple[Tuple[str, int, int], ...]]  # Due before each leg, at its start
+    wins: bool  # The route ends at los_angeles, which wins on arrival whatever the rider has left
+
+    @property
+    def legs(self) -> int:
+        return len(self.directions)
+
+
+def leg_directions(world: World, path: Sequence[str]) -> List[str]:
+    directions = []
+    for location_id, target in zip(path, path[1:]):
+        exits = world.locations[location_id].exits
+        direction = next((direction for direction, exit_target in exits.items() if exit_target == target), None)
+        if direction is None:
+            raise ValueError(f"no road from '{location_id}' to '{target}'")
+        directions.append(direction)
+    return directions
+
+
+def timed_effects(world: World, path: Sequence[str]) -> List[Tuple[Tuple[str, int, int], ...]]:
+    """The effects of the weather and patrols that fire as each leg's command starts,
+    found by running a copy of the engine's clock along the route"""
+    events = world.timed_events
+    clock = Scheduler()
+    clock.start(events, 0)
+    due_effects = []
+    for leg, location_id in enumerate(path[:-1]):
+        effects: List[Tuple[str, int, int]] = []
+        for due, event_id, fired in clock.pop_due((leg + 1) * TICKS_PER_COMMAND):
+            event = events[event_id]
+            handler = TIMED_EVENTS.get(event.kind)
+            if handler is WastelandEngine.weather and (not event.locations or location_id in event.locations):
+                effects.extend(event.effects)
+            elif (handler is WastelandEngine.patrol and event.locations
+                  and event.locations[fired % len(event.locations)] == location_id):
+                effects.extend(event.effects)
+            if event.every:
+                clock.schedule(due + event.every, event_id, fired + 1)
+        due_effects.append(tuple(effects))
+    return due_effects
+
+
+def compile_route(world: World, path: Sequence[str]) -> CompiledRoute:
+    """Arrays for riding `path`, a list of location ids each with an exit to the next"""
+    require_numpy()
+    path = list(path)
+    if GOAL_LOCATION in path[1:]:
+        path = path[:path.index(GOAL_LOCATION, 1) + 1]  # The ride is over there
+    if len(path) < 2:
+        raise ValueError("a route needs at least two locations")
+    directions = leg_directions(world, path)
+    departures = [world.locations[location_id] for location_id in path[:-1]]
+    chances, keep, alias, least, spread = [], [], [], [], []
+    for location_id in path[1:]:
+        table = world.encounter_table(world.locations[location_id])
+        encounters = table.encounters if table is not None else []
+        chances.append(table.chance if table is not None else 0.0)
+        keep.append(np.array(table.picker.keep if table is not None else [1.0]))
+        alias.append(np.array(table.picker.alias if table is not None else [0], dtype=np.intp))
+        bounds = np.zeros((2, max(1, len(encounters)), len(STATS)), dtype=np.int32)
+        for row, encounter in enumerate(encounters):
+            for stat, low, high in encounter.effects:
+                bounds[:, row, STATS.index(stat)] = low, high - low + 1
+        least.append(bounds[0])
+        spread.append(bounds[1])
+    return CompiledRoute(
+        path=path,
+        directions=directions,
+        fuel_cost=np.array([location.fuel_cost for location in departures], dtype=np.int32),
+        rough=np.array([location.fuel_cost > ROUGH_TERRAIN_COST for location in departures]),
+        encounter_chance=np.array(chances),
+        encounter_keep=keep,
+        encounter_alias=alias,
+        encounter_least=least,
+        encounter_spread=spread,
+        timed_effects=timed_effects(world, path),
+        wins=path[-1] == GOAL_LOCATION,
+    )
+
+
+@dataclass
+class SurvivalOdds:
+    """How a batch of riders fared on one route. The histograms count arrivals by
+    their fuel, bike condition and health (0-100) at the end of the route."""
+    riders: int = 0
+    outcomes: List[int] = field(default_factory=lambda: [0] * len(OUTCOMES))
+    fuel: List[int] = field(default_factory=lambda: [0] * 101)
+    bike: List[int] = field(default_factory=lambda: [0] * 101)
+    health: List[int] = field(default_factory=lambda: [0] * 101)
+
+    def merge(self, other: "SurvivalOdds"):
+        self.riders += other.riders
+        for mine, theirs in ((self.outcomes, other.outcomes), (self.fuel, other.fuel),
+                             (self.bike, other.bike), (self.health, other.health)):
+            for index, count in enumerate(theirs):
+                mine[index] += count
+
+    def rate(self, outcome: int) -> float:
+        return self.outcomes[outcome] / max(1, self.riders)
+
+    @property
+    def death_rate(self) -> float:
+        return self.rate(OUT_OF_FUEL) + self.rate(BROKEN_DOWN)
+
+    @staticmethod
+    def mean(histogram: Sequence[int]) -> float:
+        return sum(value * count for value, count in enumerate(histogram)) / max(1, sum(histogram))
+
+    @staticmethod
+    def variance(histogram: Sequence[int]) -> float:
+        mean = SurvivalOdds.mean(histogram)
+        return sum(count * (value - mean) ** 2 for value, count in enumerate(histogram)) / max(1, sum(histogram))
+
+    @staticmethod
+    def percentile(histogram: Sequence[int], fraction: float) -> int:
+        wanted, seen = fraction * sum(histogram), 0
+        for value, count in enumerate(histogram):
+            seen += count
+            if count and seen >= wanted:
+                return value
+        return 0
+
+    def summary(self) -> Dict[str, float]:
+        summary = {"riders": self.riders, **{outcome: self.rate(index) for index, outcome in enumerate(OUTCOMES)},
+                   "death_rate": self.death_rate}
+        for stat in ("fuel", "bike", "health"):
+            summary[f"mean_{stat}"] = self.mean(getattr(self, stat))
+        return summary
+
+
+def ride_batch(route: CompiledRoute, riders: int, rng: "np.random.Generator",
+               fuel: int, bike: int, health: int) -> SurvivalOdds:
+    """Ride `riders` riders down the route together. Stats go on being updated for riders
+    who are already out - cheaper than compacting the arrays - but their outcome is kept."""
+    stats = {"fuel": np.full(riders, fuel, dtype=np.int32), "bike": np.full(riders, bike, dtype=np.int32),
+             "health": np.full(riders, health, dtype=np.int32)}
+    outcome = np.full(riders, ARRIVED, dtype=np.int8)
+    zero = np.int32(0)
+
+    def lose(stat: str, loss: "np.ndarray"):
+        values = stats[stat]
+        np.subtract(values, loss, out=values)
+        np.maximum(values, zero, out=values)
+
+    for leg in range(route.legs):
+        riding = outcome == ARRIVED
+        for stat, low, high in route.timed_effects[leg]:
+            lose(stat, rng.integers(low, high + 1, riders, dtype=np.int32))
+
+        cost = route.fuel_cost[leg]
+        stranded = riding & (stats["fuel"] < cost)
+        moving = riding & ~stranded
+        lose("fuel", cost * moving)
+        if route.rough[leg]:
+            lose("bike", rng.integers(1, MAX_TERRAIN_DAMAGE + 1, riders, dtype=np.int32) * moving)
+        chance = route.encounter_chance[leg]
+        if chance > 0:
+            # Only the riders who meet one roll for which, and for its losses
+            met = np.flatnonzero(moving & (rng.random(riders) < chance))
+            keep, alias = route.encounter_keep[leg], route.encounter_alias[leg]
+            pick = rng.random(len(met)) * len(keep)
+            column = pick.astype(np.intp)
+            which = np.where(pick - column < keep[column], column, alias[column])
+            least, spread = route.encounter_least[leg], route.encounter_spread[leg]
+            for stat_column, stat in enumerate(STATS):
+                if spread[:, stat_column].any():
+                    rolled = rng.random(len(met)) * spread[which, stat_column]
+                    loss = least[which, stat_column] + rolled.astype(np.int32)
+                    values = stats[stat]
+                    values[met] = np.maximum(values[met] - loss, zero)
+
+        if route.wins and leg == route.legs - 1:
+            riding = stranded  # Everyone else made it
+        out_of_fuel = riding & (stats["fuel"] <= 0)
+        broken_down = riding & ~out_of_fuel & (stats["bike"] <= 0)
+        stranded &= ~out_of_fuel & ~broken_down
+        for ended, code in ((out_of_fuel, OUT_OF_FUEL), (broken_down, BROKEN_DOWN), (stranded, STRANDED)):
+            if ended.any():  # Usually nobody, and checking is far cheaper than a masked store
+                outcome[ended] = code
+
+    arrived = outcome == ARRIVED
+    return SurvivalOdds(
+        riders=riders,
+        outcomes=np.bincount(outcome, minlength=len(OUTCOMES)).tolist(),
+        **{stat: np.bincount(np.minimum(values[arrived], 100), minlength=101).tolist()
+           for stat, values in stats.items()},
+    )
+
+
+def survival_odds(route: CompiledRoute, riders: int = BATCH_SIZE, seed: Optional[int] = None,
+                  fuel: Optional[int] = None, bike: Optional[int] = None, health: Optional[int] = None,
+                  batch_size: int = BATCH_SIZE) -> SurvivalOdds:
+    """Odds for `riders` riders setting off with a new game's stats unless told otherwise"""
+    require_numpy()
+    start = Rider()
+    fuel = start.fuel if fuel is None else fuel
+    bike = start.bike_condition if bike is None else bike
+    health = start.health if health is None else health
+    rng = np.random.default_rng(seed)
+    total = SurvivalOdds()
+    for first in range(0, riders, batch_size):
+        total.merge(ride_batch(route, min(batch_size, riders - first), rng, fuel, bike, health))
+    return total
+
+
+def scalar_odds(world: World, path: Sequence[str], riders: int, seed: int = 0, fuel: Optional[int] = None,
+                bike: Optional[int] = None, health: Optional[int] = None) -> SurvivalOdds:
+    """The same odds from real headless engines, one ride at a time - the reference
+    the NumPy riders are checked against"""
+    directions = leg_directions(world, path)
+    odds = SurvivalOdds(riders=riders)
+    for number in range(riders):
+        engine = WastelandEngine(seed=seed + number, headless=True, world=world)
+        rider = engine.rider
+        rider.current_location = path[0]
+        rider.fuel = rider.fuel if fuel is None else fuel
+        rider.bike_condition = rider.bike_condition if bike is None else bike
+        rider.health = rider.health if health is None else health
+        outcome = ARRIVED
+        for direction in directions:
+            location = rider.current_location
+            engine.process_command(f"ride {direction}")
+            if engine.state == GameState.WON:
+                break
+            if rider.fuel <= 0 or rider.bike_condition <= 0:
+                outcome = OUT_OF_FUEL if rider.fuel <= 0 else BROKEN_DOWN
+                break
+            if rider.current_location == location:
+                outcome = STRANDED
+                break
+        odds.outcomes[outcome] += 1
+        if outcome == ARRIVED:
+            odds.fuel[rider.fuel] += 1
+            odds.bike[rider.bike_condition] += 1
+            odds.health[rider.health] += 1
+    return odds
+
+
+def z_scores(odds: SurvivalOdds, reference: SurvivalOdds) -> Dict[str, float]:
+    """How many standard errors apart two sets of odds are, per outcome rate and mean
+    arrival stat; independent samples of the same rides stay within a few"""
+    scores = {}
+    for index, outcome in enumerate(OUTCOMES):
+        pooled = (odds.outcomes[index] + reference.outcomes[index]) / max(1, odds.riders + reference.riders)
+        error = math.sqrt(pooled * (1 - pooled) * (1 / max(1, odds.riders) + 1 / max(1, reference.riders)))
+        scores[outcome] = abs(odds.rate(index) - reference.rate(index)) / error if error else 0.0
+    for stat in ("fuel", "bike", "health"):
+        mine, theirs = getattr(odds, stat), getattr(reference, stat)
+        error = math.sqrt(odds.variance(mine) / max(1, sum(mine)) + odds.variance(theirs) / max(1, sum(theirs)))
+        difference = abs(odds.mean(mine) - odds.mean(theirs))
+        scores[f"mean_{stat}"] = difference / error if error else (0.0 if difference == 0 else math.inf)
+    return scores
+
+
+def print_odds(route: CompiledRoute, odds: SurvivalOdds, elapsed: float):
+    print(f"🏍️  {route.path[0]} → {route.path[-1]}: {route.legs} legs, {int(route.fuel_cost.sum())} fuel, "
+          f"{int(route.rough.sum())} rough, {int((route.encounter_chance > 0).sum())} with encounters, "
+          f"{sum(map(bool, route.timed_effects))} hit by timed events")
+    print(f"   {odds.riders:,} riders in {elapsed:.2f}s ({odds.riders / max(elapsed, 1e-9):,.0f} riders/sec)")
+    print(f"   arrived {odds.rate(ARRIVED):.2%}   died {odds.death_rate:.2%} "
+          f"(out of fuel {odds.rate(OUT_OF_FUEL):.2%}, broken down {odds.rate(BROKEN_DOWN):.2%})   "
+          f"stranded {odds.rate(STRANDED):.2%}")
+    print(f"   {'on arrival':<10} {'mean':>6} {'p5':>4} {'p50':>4} {'p95':>4}")
+    for label, stat in (("⛽ fuel", "fuel"), ("🔧 bike", "bike"), ("❤️  health", "health")):
+        histogram = getattr(odds, stat)
+        print(f"   {label:<10} {odds.mean(histogram):>6.1f} " +
+              " ".join(f"{odds.percentile(histogram, fraction):>4}" for fraction in (0.05, 0.5, 0.95)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo survival odds of riding a route")
+    parser.add_argument("destination", nargs="?", default=GOAL_LOCATION)
+    parser.add_argument("--from", dest="source", default=Rider().current_location, help="Where riders set off")
+    parser.add_argument("--all", action="store_true", help="Odds of every location's cheapest route to the destination")
+    parser.add_argument("--world", help="World file (JSON or packed); defaults to wasteland.json")
+    parser.add_argument("--riders", type=int, default=BATCH_SIZE)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--fuel", type=int, help="Starting fuel (default: a new game's)")
+    parser.add_argument("--bike", type=int, help="Starting bike condition")
+    parser.add_argument("--health", type=int, help="Starting health")
+    parser.add_argument("--check", type=int, metavar="RIDES", help="Also ride this many scalar engines and compare")
+    args = parser.parse_args()
+    if np is None:
+        parser.error("survival odds need NumPy: pip install numpy")
+
+    world = World.load(args.world)
+    for location_id in (args.destination, args.source):
+        if location_id not in world.locations:
+            parser.error(f"no location '{location_id}' in the world")
+    start = Rider()
+    fuel = start.fuel if args.fuel is None else args.fuel
+    bike = start.bike_condition if args.bike is None else args.bike
+    sources = [location_id for location_id in world.locations if location_id != args.destination] \
+        if args.all else [args.source]
+    rows = []
+    for source in sources:
+        route = world.routes.plan(source, args.destination, fuel, bike)
+        if route is None:
+            if not args.all:
+                print(f"💀 No road from {source} reaches {args.destination}.")
+            continue
+        compiled = compile_route(world, route.path)
+        began = time.perf_counter()
+        odds = survival_odds(compiled, args.riders, args.seed, args.fuel, args.bike, args.health)
+        elapsed = time.perf_counter() - began
+        if args.all:
+            rows.append((source, compiled, odds))
+            continue
+        print_odds(compiled, odds, elapsed)
+        if args.check:
+            began = time.perf_counter()
+            reference = scalar_odds(world, route.path, args.check, args.seed or 0, args.fuel, args.bike, args.health)
+            elapsed = time.perf_counter() - began
+            print(f"\n🎲 {args.check:,} scalar engine rides in {elapsed:.2f}s "
+                  f"({args.check / max(elapsed, 1e-9):,.0f} riders/sec); standard errors apart:")
+            print("   " + "  ".join(f"{name} {score:.2f}" for name, score in z_scores(odds, reference).items()))
+
+    if args.all:
+        print(f"{'from':<24} {'legs':>4} {'arrived':>8} {'died':>7} {'stranded':>9} {'fuel':>6} {'bike':>6}")
+        for source, compiled, odds in sorted(rows, key=lambda row: row[2].death_rate + row[2].rate(STRANDED)):
+            print(f"{source:<24} {compiled.legs:>4} {odds.rate(ARRIVED):>8.2%} {odds.death_rate:>7.2%} "
+                  f"{odds.rate(STRANDED):>9.2%} {odds.mean(odds.fuel):>6.1f} {odds.mean(odds.bike):>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Balance Sweeps
+How win and death rates move as item and location numbers change. A grid of
+parameters - say a gas can's fuel_value against every location's fuel_cost -
+is expanded into world variants, and each variant gets the same seeded
+simulate.py playthroughs, so the differences between variants are down to the
+parameters rather than luck. Variants are built in memory from the parsed base
+world, swapping in only the records they change; pool workers parse the base
+world once and build each variant from it. A CSV row is appended as each
+variant finishes, so an interrupted sweep picks up where it stopped when run
+again. --npz also writes every column as an array shaped like the grid, ready
+for a heatmap (needs NumPy).
+Usage: python sweep.py --vary items.gas_can.fuel_value=10,20,40 --vary 'locations.*.fuel_cost=x0.5,x1,x2'
+                       --runs 2000 --out sweep.csv [--npz sweep.npz]
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from game import World, freeze_location
+from simulate import BatchStats, run_shard
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only --npz needs it
+    np = None
+
+# What a sweep can change, by world file section
+SWEEPABLE = {"items": ("fuel_value", "repair_value", "food_value"), "locations": ("fuel_cost", "dangerous")}
+ALL_RECORDS = "*"
+METRICS = tuple(BatchStats().summary())
+SHARD_SIZE = 500  # Playthroughs per pool task; a variant with more runs is split across workers
+
+
+@dataclass(frozen=True)
+class Parameter:
+    section: str  # items or locations
+    record: str  # A record id, or * for every record in the section
+    field: str
+    values: Tuple[str, ...]  # As given: a number, x1.5 (times the record's own value), true or false
+
+    @property
+    def name(self) -> str:
+        return f"{self.section}.{self.record}.{self.field}"
+
+
+def setting(field_name: str, value: str, current):
+    """What a parameter value sets a field to, given the field's current value"""
+    if field_name == "dangerous":
+        if value not in ("true", "false"):
+            raise ValueError(f"dangerous is true or false, not '{value}'")
+        return value == "true"
+    number = round(current * float(value[1:])) if value.startswith("x") else int(value)
+    if number < 0:
+        raise ValueError(f"{field_name} can't be negative: {value}")
+    return number
+
+
+def parse_parameter(spec: str, world: World) -> Parameter:
+    """section.id.field=value,value,... - e.g. items.gas_can.fuel_value=10,20 or locations.*.fuel_cost=x0.5,x2"""
+    name, _, values = spec.partition("=")
+    parts = name.strip().split(".")
+    if len(parts) != 3 or not values:
+        raise ValueError(f"expected section.id.field=value,value,...: '{spec}'")
+    section, record, field_name = parts
+    if field_name not in SWEEPABLE.get(section, ()):
+        choices = ", ".join(f"{section}.{field}" for section, fields in SWEEPABLE.items() for field in fields)
+        raise ValueError(f"can't sweep {section}.{field_name}; choose from {choices}")
+    records = getattr(world, section)
+    if not isinstance(records, dict):
+        raise ValueError("sweeps need a JSON world; packed worlds can't be varied in memory")
+    if record != ALL_RECORDS and record not in records:
+        raise ValueError(f"no {section[:-1]} '{record}' in the world")
+    parameter = Parameter(section, record, field_name, tuple(value.strip().lower() for value in values.split(",")))
+    for value in parameter.values:
+        setting(field_name, value, 1)
+    return parameter
+
+
+def build_variant(world: World, parameters: Sequence[Parameter], values: Sequence[str]) -> World:
+    """`world` with each parameter set to its value, in order. Records no parameter
+    touches are the base world's own objects, shared rather than copied."""
+    changed: Dict[str, Dict[str, object]] = {"locations": {}, "items": {}}
+    for parameter, value in zip(parameters, values):
+        records = getattr(world, parameter.section)
+        for record_id in records if parameter.record == ALL_RECORDS else (parameter.record,):
+            record = changed[parameter.section].get(record_id) or records[record_id]
+            changed[parameter.section][record_id] = replace(
+                record, **{parameter.field: setting(parameter.field, value, getattr(record, parameter.field))})
+    locations = dict(world.locations)
+    locations.update((location_id, freeze_location(location)) for location_id, location in changed["locations"].items())
+    return World(locations, {**world.items, **changed["items"]}, frozen=True,
+                 encounters=world.encounter_data, timed_events=world.timed_event_data)
+
+
+# Each pool worker's base world, and the variant its last task played
+_base: Optional[World] = None
+_parameters: Tuple[Parameter, ...] = ()
+_variant: Tuple[Optional[Tuple[str, ...]], Optional[World]] = (None, None)
+
+
+def _start_worker(world_file: Optional[str], parameters: Tuple[Parameter, ...]):
+    global _base, _parameters, _variant
+    _base, _parameters, _variant = World.load(world_file), parameters, (None, None)
+
+
+def _play_shard(variant: int, values: Tuple[str, ...], seeds: range, max_commands: int) -> Tuple[int, BatchStats]:
+    global _variant
+    if _variant[0] != values:  # Shards are handed out in variant order, so this is usually a hit
+        _variant = (values, build_variant(_base, _parameters, values))
+    return variant, run_shard(seeds, None, max_commands, _variant[1])
+
+
+def csv_header(parameters: Sequence[Parameter]) -> List[str]:
+    return ["variant", "seed", *(parameter.name for parameter in parameters), *METRICS]
+
+
+def read_checkpoint(path: str, header: List[str]) -> Dict[int, List[str]]:
+    """Rows already in the output file, by variant. A line torn by an interrupted run is cut off."""
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return {}
+    with f:
+        data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            f.truncate(len(complete))
+    rows = list(csv.reader(io.StringIO(complete.decode("utf-8"))))
+    if not rows:
+        return {}
+    if rows[0] != header:
+        raise ValueError(f"{path} holds a different sweep; pass another --out")
+    return {int(row[0]): row for row in rows[1:]}
+
+
+class Sweep:
+    """A grid of world variants and the playthroughs each one gets"""
+
+    def __init__(self, parameters: Sequence[Parameter], runs: int, seed: int = 0, max_commands: int = 200,
+                 world_file: Optional[str] = None):
+        self.parameters = tuple(parameters)
+        self.grid = list(itertools.product(*(parameter.values for parameter in self.parameters)))
+        self.runs = runs
+        self.seed = seed
+        self.max_commands = max_commands
+        self.world_file = world_file
+        self.header = csv_header(self.parameters)
+
+    def row(self, variant: int, stats: BatchStats) -> List[str]:
+        summary = stats.summary()
+        return [str(variant), str(self.seed), *self.grid[variant],
+                *(str(round(summary[metric], 6)) for metric in METRICS)]
+
+    def check_rows(self, rows: Dict[int, List[str]]):
+        """Make sure a checkpoint was written by this same sweep before adding to it"""
+        for variant, row in rows.items():
+            if variant >= len(self.grid) or tuple(row[2:2 + len(self.parameters)]) != self.grid[variant]:
+                raise ValueError(f"row for variant {variant} doesn't match this grid; pass another --out")
+            if row[1] != str(self.seed) or int(row[self.header.index("runs")]) != self.runs:
+                raise ValueError("the output file was written with other --seed/--runs; pass another --out")
+
+    def shards(self, variants: Sequence[int]) -> Iterator[Tuple[int, Tuple[str, ...], range]]:
+        """Every variant plays the same seeds, so they are compared over the same rides"""
+        for variant in variants:
+            for start in range(self.seed, self.seed + self.runs, SHARD_SIZE):
+                yield variant, self.grid[variant], range(start, min(start + SHARD_SIZE, self.seed + self.runs))
+
+    def play(self, variants: Sequence[int], workers: int) -> Iterator[Tuple[int, BatchStats]]:
+        """(variant, stats) as each variant's last shard comes in"""
+        shards = list(self.shards(variants))
+        per_variant = len(range(self.seed, self.seed + self.runs, SHARD_SIZE))
+        pending = {variant: [BatchStats(), per_variant] for variant in variants}  # Stats so far, shards to come
+
+        def finished(variant: int, stats: BatchStats) -> bool:
+            total = pending[variant]
+            total[0].merge(stats)
+            total[1] -= 1
+            return total[1] == 0
+
+        if workers == 1:
+            _start_worker(self.world_file, self.parameters)
+            for variant, values, seeds in shards:
+                _, stats = _play_shard(variant, values, seeds, self.max_commands)
+                if finished(variant, stats):
+                    yield variant, pending.pop(variant)[0]
+            return
+
+        with ProcessPoolExecutor(workers, initializer=_start_worker,
+                                 initargs=(self.world_file, self.parameters)) as pool:
+            futures = [pool.submit(_play_shard, variant, values, seeds, self.max_commands)
+                       for variant, values, seeds in shards]
+            try:
+                for future in as_completed(futures):
+                    variant, stats = future.result()
+                    if finished(variant, stats):
+                        yield variant, pending.pop(variant)[0]
+            finally:
+                for future in futures:
+                    future.cancel()  # Interrupted: don't wait for shards nobody will record
+
+    def run(self, out: str, workers: int, report=print) -> Dict[int, List[str]]:
+        """Play every variant not already in `out`, appending a row as each finishes;
+        returns all the rows, old and new, by variant"""
+        rows = read_checkpoint(out, self.header)
+        self.check_rows(rows)
+        variants = [variant for variant in range(len(self.grid)) if variant not in rows]
+        if rows:
+            report(f"⏯️  Resuming: {len(rows)} of {len(self.grid)} variants already in {out}")
+        started = time.perf_counter()
+        with open(out, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if not rows:
+                writer.writerow(self.header)
+            for variant, stats in self.play(variants, workers):
+                rows[variant] = self.row(variant, stats)
+                writer.writerow(rows[variant])
+                f.flush()
+                settings = " ".join(f"{parameter.name}={value}"
+                                    for parameter, value in zip(self.parameters, self.grid[variant]))
+                report(f"   [{len(rows)}/{len(self.grid)}] {settings}: win {stats.wins / max(1, stats.runs):.1%}, "
+                       f"died {stats.deaths / max(1, stats.runs):.1%} ({time.perf_counter() - started:.1f}s)")
+        return rows
+
+    def write_npz(self, path: str, rows: Dict[int, List[str]]):
+        """Each metric as an array with one axis per parameter, plus the values along each axis"""
+        if np is None:
+            raise RuntimeError("--npz needs NumPy: pip install numpy")
+        shape = tuple(len(parameter.values) for parameter in self.parameters)
+        columns = {metric: self.header.index(metric) for metric in METRICS}
+        arrays = {metric: np.array([float(rows[variant][column]) for variant in range(len(self.grid))]).reshape(shape)
+                  for metric, column in columns.items()}
+        np.savez_compressed(path, parameters=np.array([parameter.name for parameter in self.parameters]),
+                            **{f"axis{number}": np.array(parameter.values)
+                               for number, parameter in enumerate(self.parameters)}, **arrays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep world parameters and record win rates")
+    parser.add_argument("--vary", action="append", required=True, metavar="SECTION.ID.FIELD=V1,V2,...",
+                        help="A grid axis, e.g. items.gas_can.fuel_value=10,20 or 'locations.*.fuel_cost=x0.5,x2'. "
+                             "Repeat for more axes.")
+    parser.add_argument("--world", help="Base world file; defaults to wasteland.json")
+    parser.add_argument("--runs", type=int, default=1000, help="Seeded playthroughs of each variant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-commands", type=int, default=200)
+    parser.add_argument("--out", default="sweep.csv", help="CSV of results; an unfinished one is resumed")
+    parser.add_argument("--npz", help="Also write the results as arrays shaped like the grid")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    if args.npz and np is None:
+        parser.error("--npz needs NumPy: pip install numpy")
+
+    world = World.load(args.world)
+    try:
+        parameters = [parse_parameter(spec, world) for spec in args.vary]
+    except ValueError as e:
+        parser.error(str(e))
+    sweep = Sweep(parameters, args.runs, args.seed, args.max_commands, args.world)
+    print(f"🎛️  {len(sweep.grid)} variants x {args.runs:,} runs on {args.workers} worker(s)")
+    started = time.perf_counter()
+    try:
+        rows = sweep.run(args.out, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted. Finished variants are in {args.out}; run the same command to resume.")
+        return
+    elapsed = time.perf_counter() - started
+    print(f"🏁 Sweep done in {elapsed:.1f}s; results in {args.out}")
+    if args.npz:
+        sweep.write_npz(args.npz, rows)
+        print(f"   and as arrays in {args.npz}")
+
+
+if __name__ == "__main__":
+    main()
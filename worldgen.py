@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - World Generator
+Builds seeded worlds of any size in the wasteland.json schema: a main road
+from dc_ruins west to los_angeles, its stops placed on the map along the
+way, side roads between random stops, loot scattered along the way, the
+rider's starting gear and the default encounter tables.
+Usage: python worldgen.py --locations 10000 --items 2000 -o big_world.json
+"""
+
+import argparse
+import json
+import random
+from typing import Any, Dict, List
+
+import worldpack
+from encounters import DEFAULT_ENCOUNTER_TABLES, DEFAULT_ENCOUNTERS
+
+WORDS = ["rusted", "fuel", "can", "tire", "jerky", "canteen", "rad", "pills", "map", "scope",
+         "wrench", "battery", "spark", "plug", "chain", "helmet", "goggles", "rope", "flare",
+         "ammo", "knife", "water", "beans", "radio", "filter", "hose", "barrel", "gear"]
+
+PLACES = ["Ruins", "Crossing", "Outpost", "Flats", "Overpass", "Junkyard", "Camp", "Depot",
+          "Canyon", "Mesa", "Bridge", "Truck Stop", "Settlement", "Dust Bowl", "Crater"]
+
+# Where the main road starts and ends on the map: dc_ruins and los_angeles, as in wasteland.json
+ROAD_ENDS = ((38.8977, -77.0365), (34.0522, -118.2437))
+MAX_WANDER = 0.5  # Most degrees a stop strays from its even spacing along a straight road
+
+# Side roads pair a direction with its way back
+SIDE_ROADS = [("north", "south"), ("south", "north"), ("up", "down"), ("down", "up")]
+
+# The Rider always starts carrying these, so every world has to define them
+STARTING_GEAR = {
+    "toolkit": {"name": "Motorcycle Toolkit", "description": "A well-worn set of tools for your bike.",
+                "takeable": False, "useable": True, "use_message": "You perform basic maintenance on your bike.",
+                "aliases": ["tools", "wrench", "kit"], "repair_value": 15},
+    "water_bottle": {"name": "Water Bottle", "description": "A dented metal water bottle.",
+                     "useable": True, "use_message": "You drink deeply.",
+                     "aliases": ["water", "bottle", "drink"], "food_value": 10},
+    "jerky": {"name": "Beef Jerky", "description": "Dried meat that's seen better days.",
+              "useable": True, "use_message": "The salty meat gives you energy.",
+              "aliases": ["meat", "food", "beef"], "food_value": 15},
+}
+
+
+def generate_items(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """`count` loot items; about a third of them are fuel, food or repair supplies"""
+    rng = random.Random(seed)
+    items = {}
+    for number in range(count):
+        words = rng.sample(WORDS, 3)
+        item = {
+            "name": " ".join(word.title() for word in words),
+            "description": "Scavenged from the wasteland.",
+            "aliases": [f"{words[0]}{number}", f"{words[1]}-{words[2]}"],
+        }
+        kind = rng.randrange(9)
+        if kind < 3:
+            value = ("fuel_value", "food_value", "repair_value")[kind]
+            item.update({"useable": True, "use_message": "It'll do.", value: rng.randint(5, 40)})
+        items[f"item_{number}"] = item
+    return items
+
+
+def generate_world(locations: int = 1000, items: int = 200, branching: float = 0.1, danger: float = 0.2,
+                   seed: int = 0, description_words: int = 40) -> Dict[str, Any]:
+    """A seeded world with `locations` stops (at least 2) and `items` loot items plus the starting gear.
+    `branching` is the average number of two-way side roads per location and
+    `danger` the share of locations marked dangerous."""
+    rng = random.Random(seed)
+    loot = generate_items(items, seed)
+    item_ids = list(loot)
+    loot.update(STARTING_GEAR)
+
+    location_ids: List[str] = (["dc_ruins"] + [f"stop_{number}" for number in range(1, locations - 1)]
+                               + ["los_angeles"])
+    world_locations = {}
+    for number, location_id in enumerate(location_ids):
+        exits = {}
+        if number > 0:
+            exits["east"] = location_ids[number - 1]
+        if number < len(location_ids) - 1:
+            exits["west"] = location_ids[number + 1]
+        world_locations[location_id] = {
+            "name": f"{rng.choice(WORDS).title()} {rng.choice(PLACES)} {number}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(description_words)),
+            "exits": exits,
+            "items": [rng.choice(item_ids) for _ in range(rng.randint(0, 3))] if item_ids else [],
+            "visited": False,
+            "dangerous": rng.random() < danger,
+            "fuel_cost": rng.randint(1, 5),
+        }
+    world_locations["dc_ruins"]["dangerous"] = False
+
+    # Coordinates roll their own dice, so everything else a seed makes is as it was before them
+    spots = random.Random(f"coordinates-{seed}")
+    (start_lat, start_lon), (end_lat, end_lon) = ROAD_ENDS
+    last = len(location_ids) - 1
+    wander = min(MAX_WANDER, max(abs(end_lat - start_lat), abs(end_lon - start_lon)) / last)
+    for number, location_id in enumerate(location_ids):
+        latitude = start_lat + (end_lat - start_lat) * number / last
+        longitude = start_lon + (end_lon - start_lon) * number / last
+        if 0 < number < last:
+            latitude += spots.uniform(-wander, wander)
+            longitude += spots.uniform(-wander, wander)
+        world_locations[location_id]["coordinates"] = [round(latitude, 5), round(longitude, 5)]
+
+    for _ in range(int(branching * len(location_ids))):
+        source, target = rng.sample(location_ids, 2)
+        there, back = rng.choice(SIDE_ROADS)
+        source_exits = world_locations[source]["exits"]
+        target_exits = world_locations[target]["exits"]
+        if there not in source_exits and back not in target_exits:
+            source_exits[there] = target
+            target_exits[back] = source
+    return {"locations": world_locations, "items": loot,
+            "encounters": DEFAULT_ENCOUNTERS, "encounter_tables": DEFAULT_ENCOUNTER_TABLES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded Wasteland Rider world")
+    parser.add_argument("--locations", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--branching", type=float, default=0.1, help="Side roads per location")
+    parser.add_argument("--danger", type=float, default=0.2, help="Share of dangerous locations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="generated_world.json",
+                        help="World file to write; a .wrpack name writes a packed world")
+    args = parser.parse_args()
+    if args.locations < 2:
+        parser.error("a world needs at least 2 locations")
+
+    data = generate_world(args.locations, args.items, args.branching, args.danger, args.seed)
+    if args.output.endswith(".wrpack"):
+        worldpack.write_pack(data, args.output)
+    else:
+        with open(args.output, "w") as f:
+            json.dump(data, f)
+    print(f"🗺️  Generated {len(data['locations'])} locations and {len(data['items'])} items into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Wasteland Rider - Packed World Files
+An indexed alternative to wasteland.json for very large maps. Each location
+and item is stored as its own JSON record, with a sorted id list and an
+offset table per kind. Reading memory-maps the file and decodes a record
+only when something asks for it, keeping a bounded number of them resident.
+Usage: python worldpack.py wasteland.json wasteland.wrpack
+"""
+
+import argparse
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, TypeVar
+
+PACK_MAGIC = b"WRPACK\x01\n"
+TABLES = ("locations", "items")
+EXTRA_KEYS = ("encounters", "encounter_tables", "timed_events")  # Stored whole in the directory
+DEFAULT_RESIDENT = 4096  # Decoded records kept per table
+
+# Footer: offset and length of the JSON table directory, as the file's last 16 bytes
+_FOOTER = struct.Struct("<QQ")
+
+T = TypeVar("T")
+
+
+def _pad(f, alignment: int = 8):
+    f.write(b"\0" * (-f.tell() % alignment))
+
+
+def write_pack(data: Dict[str, Any], path: str):
+    """Write world data (the wasteland.json layout) as a packed world file"""
+    directory = {}
+    with open(path, "wb") as f:
+        f.write(PACK_MAGIC)
+        for table in TABLES:
+            records = data.get(table, {})
+            ids = sorted(records)
+            offsets = array("Q")
+            start = f.tell()
+            for record_id in ids:
+                offsets.append(f.tell() - start)
+                f.write(json.dumps(records[record_id], separators=(",", ":")).encode("utf-8"))
+            offsets.append(f.tell() - start)
+
+            id_blob = "\n".join(ids).encode("utf-8")
+            ids_at = f.tell()
+            f.write(id_blob)
+            _pad(f)
+            offsets_at = f.tell()
+            f.write(offsets.tobytes())
+            directory[table] = {"records": start, "ids": [ids_at, len(id_blob)],
+                                "offsets": offsets_at, "count": len(ids)}
+        # Encounter data is small and needed whole; it rides along in the directory
+        for key in EXTRA_KEYS:
+            if key in data:
+                directory[key] = data[key]
+        directory_blob = json.dumps(directory).encode("utf-8")
+        directory_at = f.tell()
+        f.write(directory_blob)
+        f.write(_FOOTER.pack(directory_at, len(directory_blob)))
+
+
+class PackedTable(Mapping[str, T]):
+    """Read-only id -> object mapping over one table of a mapped pack file.
+    `build` turns a decoded record into the object handed out; the most recently
+    used `resident` objects are kept, the rest are rebuilt on demand."""
+
+    def __init__(self, buffer: mmap.mmap, entry: Dict[str, Any], build: Callable[[Dict[str, Any]], T],
+                 resident: int = DEFAULT_RESIDENT):
+        self.buffer = buffer
+        self.build = build
+        self.resident = resident
+        self.records = entry["records"]
+        ids_at, ids_length = entry["ids"]
+        id_blob = buffer[ids_at:ids_at + ids_length].decode("utf-8")
+        self.ids: List[str] = id_blob.split("\n") if entry["count"] else []
+        self.offsets = memoryview(buffer)[entry["offsets"]:entry["offsets"] + 8 * (entry["count"] + 1)].cast("Q")
+        self._cache: "OrderedDict[str, T]" = OrderedDict()
+        self.loads = 0
+
+    def _position(self, record_id: str) -> Optional[int]:
+        position = bisect_left(self.ids, record_id)
+        if position < len(self.ids) and self.ids[position] == record_id:
+            return position
+        return None
+
+    def __getitem__(self, record_id: str) -> T:
+        cache = self._cache
+        value = cache.get(record_id)
+        if value is not None:
+            cache.move_to_end(record_id)
+            return value
+        position = self._position(record_id)
+        if position is None:
+            raise KeyError(record_id)
+        start = self.records + self.offsets[position]
+        end = self.records + self.offsets[position + 1]
+        value = self.build(json.loads(self.buffer[start:end]))
+        self.loads += 1
+        cache[self.ids[position]] = value
+        if len(cache) > self.resident:
+            cache.popitem(last=False)
+        return value
+
+    def __contains__(self, record_id: object) -> bool:
+        return isinstance(record_id, str) and self._position(record_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class WorldPack:
+    """An open, memory-mapped pack file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise ValueError(f"{path} is not a packed Wasteland Rider world")
+        directory_at, directory_length = _FOOTER.unpack(self.buffer[-_FOOTER.size:])
+        self.directory = json.loads(self.buffer[directory_at:directory_at + directory_length])
+
+    def table(self, name: str, build: Callable[[Dict[str, Any]], T], resident: int = DEFAULT_RESIDENT) -> PackedTable:
+        return PackedTable(self.buffer, self.directory[name], build, resident)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a JSON world file to a packed world file")
+    parser.add_argument("source", help="World JSON, e.g. wasteland.json")
+    parser.add_argument("target", help="Packed world to write, e.g. wasteland.wrpack")
+    args = parser.parse_args()
+    with open(args.source, "r") as f:
+        data = json.load(f)
+    write_pack(data, args.target)
+    print(f"🗺️  Packed {len(data.get('locations', {}))} locations and "
+          f"{len(data.get('items', {}))} items into {args.target}")
+
+
+if __name__ == "__main__":
+    main()